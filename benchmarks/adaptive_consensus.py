@@ -0,0 +1,55 @@
+"""
+Compare full and adaptive consensus on clear-cut and ambiguous
+submissions, counting model calls and estimated spend.
+
+Run from the repository root:
+    python -m benchmarks.adaptive_consensus
+"""
+import json
+from src.grading.criteria import GradingCriterion
+from src.models.ai_models import AIGrader, ConsensusGrader, AdaptiveConsensusGrader
+from src.models.tokens import UsageLedger
+from benchmarks.fake_llm import FakeLLM
+
+MODEL_NAMES = ["gpt-4", "gpt-3.5-turbo", "gpt-4o-mini"]
+SUBMISSIONS = 50
+# Every fifth submission is borderline: points between two rubric levels
+AMBIGUOUS_EVERY = 5
+
+def answer(messages):
+    ambiguous = "borderline" in messages[-1].content
+    return json.dumps({
+        "points": 35 if ambiguous else 30,
+        "explanation": "Canned answer",
+        "confidence": 0.75 if ambiguous else 0.92
+    })
+
+def run(grader_class):
+    usage = UsageLedger()
+    models = [
+        AIGrader(model_name=name, llm=FakeLLM(latency=0, responder=answer), usage=usage)
+        for name in MODEL_NAMES
+    ]
+    grader = grader_class(models)
+    criterion = GradingCriterion(
+        name="Understanding",
+        description="Demonstrates understanding of core concepts",
+        max_points=40,
+        rubric={"40": "Excellent", "30": "Good", "20": "Fair", "10": "Limited", "0": "None"}
+    )
+    for i in range(SUBMISSIONS):
+        kind = "borderline" if i % AMBIGUOUS_EVERY == 0 else "clear"
+        grader.grade_with_consensus(f"Submission {i} ({kind})", criterion)
+    return usage.totals, getattr(grader, "stats", None)
+
+def main():
+    full, _ = run(ConsensusGrader)
+    adaptive, stats = run(AdaptiveConsensusGrader)
+
+    print(f"{SUBMISSIONS} submissions, 1 in {AMBIGUOUS_EVERY} borderline, models {MODEL_NAMES}")
+    print(f"Full consensus:     {full['calls']} calls, ${full['cost']:.4f}")
+    print(f"Adaptive consensus: {adaptive['calls']} calls, ${adaptive['cost']:.4f} "
+          f"({stats['saved_fraction']:.0%} of calls saved)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Compare per-criterion and batched grading on a long fake submission.
+
+Run from the repository root:
+    python -m benchmarks.batched_grading
+"""
+import json
+import re
+import time
+from src.grading.criteria import GradingCriterion, GradingSchema, PER_CRITERION, BATCHED
+from src.grading.grader import AssignmentGrader
+from src.models.ai_models import AIGrader, ConsensusGrader
+from benchmarks.fake_llm import FakeLLM
+
+NUM_CRITERIA = 10
+SUBMISSION = "This paragraph stands in for a long PDF submission. " * 2000
+
+def respond(messages) -> str:
+    """Answer both prompt styles with full marks for every criterion asked."""
+    text = messages[-1].content
+    names = re.findall(r"Criterion: (.+)", text)
+    grade = {"points": 10, "explanation": "Canned answer", "confidence": 0.9}
+    if "Criteria:" in text:
+        return json.dumps({"grades": [dict(grade, criterion_name=n.strip()) for n in names]})
+    return json.dumps(grade)
+
+def build_schema(mode: str) -> GradingSchema:
+    schema = GradingSchema("Benchmark", NUM_CRITERIA * 10, grading_mode=mode)
+    for i in range(NUM_CRITERIA):
+        schema.add_criterion(GradingCriterion(
+            name=f"Criterion {i + 1}",
+            description=f"Aspect {i + 1} of the work",
+            max_points=10,
+            rubric={"10": "Excellent", "5": "Adequate", "0": "Missing"}
+        ))
+    return schema
+
+def run(mode: str):
+    llms = [FakeLLM(latency=0.3, responder=respond) for _ in range(2)]
+    grader = AssignmentGrader(ConsensusGrader([
+        AIGrader(model_name=f"fake-{i}", llm=llm) for i, llm in enumerate(llms)
+    ]))
+    started = time.perf_counter()
+    grade = grader.grade_assignment(SUBMISSION, build_schema(mode))
+    elapsed = time.perf_counter() - started
+    calls = sum(llm.calls for llm in llms)
+    chars = sum(llm.prompt_chars for llm in llms)
+    print(f"{mode:>14}: {calls:3d} calls, {chars:>10,d} prompt chars, "
+          f"{elapsed:.2f}s, total {grade.total_points}")
+
+def main():
+    run(PER_CRITERION)
+    run(BATCHED)
+
+if __name__ == "__main__":
+    main()
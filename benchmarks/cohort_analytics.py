@@ -0,0 +1,85 @@
+"""
+Compare cohort analytics computed by looping over AssignmentGrade objects
+with the columnar CohortResults store.
+
+Run from the repository root:
+    python -m benchmarks.cohort_analytics
+"""
+import random
+import statistics
+import time
+from src.grading.analytics import CohortResults
+from src.grading.grader import AssignmentGrade
+from src.models.ai_models import ConsensusResult
+
+SUBMISSIONS = 5000
+CRITERIA = {"Understanding": 40, "Implementation": 60, "Style": 20, "Testing": 30}
+MODELS = ["gpt-4", "gpt-3.5-turbo"]
+
+def build_grades():
+    rng = random.Random(0)
+    grades = {}
+    for i in range(SUBMISSIONS):
+        criterion_grades = {}
+        for name, max_points in CRITERIA.items():
+            points = min(max_points, max(0.0, rng.gauss(0.7 * max_points, 0.1 * max_points)))
+            criterion_grades[name] = ConsensusResult(
+                points=points,
+                explanation="Model 1 (0.90 confidence): ...",
+                confidence=rng.uniform(0.6, 1.0),
+                model_points={model: points + rng.gauss(0, 2) for model in MODELS}
+            )
+        grades[f"submission-{i}"] = AssignmentGrade(
+            total_points=sum(r.points for r in criterion_grades.values()),
+            criterion_grades=criterion_grades,
+            overall_confidence=0.8,
+            needs_review=False
+        )
+    return grades
+
+def loop_report(grades):
+    """What a report takes without the columnar store."""
+    report = {}
+    for name in CRITERIA:
+        points = [g.criterion_grades[name].points for g in grades.values()]
+        quartiles = statistics.quantiles(points, n=4)
+        median = statistics.median(points)
+        mad = statistics.median(abs(p - median) for p in points)
+        report[name] = {
+            "mean": statistics.fmean(points),
+            "std": statistics.pstdev(points),
+            "quartiles": quartiles,
+            "outliers": [p for p in points if mad and abs(0.6745 * (p - median) / mad) > 3.5]
+        }
+    for model in MODELS:
+        deviations = [
+            r.model_points[model] - r.points
+            for g in grades.values() for r in g.criterion_grades.values()
+        ]
+        report[model] = statistics.fmean(deviations)
+    return report
+
+def best_of(runs, fn):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main():
+    grades = build_grades()
+
+    loop_seconds = best_of(5, lambda: loop_report(grades))
+    started = time.perf_counter()
+    cohort = CohortResults.from_grades(grades)
+    build_seconds = time.perf_counter() - started
+    report_seconds = best_of(5, cohort.report)
+
+    print(f"{SUBMISSIONS} submissions x {len(CRITERIA)} criteria x {len(MODELS)} models")
+    print(f"Python loops over grades: {loop_seconds * 1000:.1f} ms per report")
+    print(f"Columnar store:           {report_seconds * 1000:.1f} ms per report "
+          f"(built once in {build_seconds * 1000:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Compare sequential and concurrent consensus grading against fake models.
+
+Run from the repository root:
+    python -m benchmarks.consensus_fanout
+"""
+import time
+from src.grading.criteria import GradingCriterion
+from src.models.ai_models import AIGrader, ConsensusGrader
+from benchmarks.fake_llm import FakeLLM
+
+LATENCIES = [0.4, 0.8, 1.2]
+
+def build_models():
+    return [
+        AIGrader(model_name=f"fake-{i}", llm=FakeLLM(latency=latency))
+        for i, latency in enumerate(LATENCIES)
+    ]
+
+def time_consensus(max_in_flight: int, criterion: GradingCriterion) -> float:
+    grader = ConsensusGrader(build_models(), max_in_flight=max_in_flight)
+    started = time.perf_counter()
+    grader.grade_with_consensus("Sample submission", criterion)
+    return time.perf_counter() - started
+
+def main():
+    criterion = GradingCriterion(
+        name="Understanding",
+        description="Demonstrates understanding of core concepts",
+        max_points=40,
+        rubric={"40": "Excellent", "0": "None"}
+    )
+    sequential = time_consensus(1, criterion)
+    concurrent = time_consensus(len(LATENCIES), criterion)
+    
+    print(f"Model latencies:      {LATENCIES}")
+    print(f"Sequential consensus: {sequential:.2f}s (sum {sum(LATENCIES):.2f}s)")
+    print(f"Concurrent consensus: {concurrent:.2f}s (slowest {max(LATENCIES):.2f}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import json
+import threading
+import time
+from typing import Callable, List, Optional
+from langchain_core.messages import AIMessage, BaseMessage
+
+class FakeLLM:
+    """Stand-in for ChatOpenAI that sleeps instead of calling the API."""
+    
+    def __init__(
+        self,
+        latency: float = 0.5,
+        points: float = 10,
+        confidence: float = 0.9,
+        responder: Optional[Callable[[List[BaseMessage]], str]] = None
+    ):
+        """
+        Args:
+            latency: Seconds each call blocks for
+            points: Points reported in the canned answer
+            confidence: Confidence reported in the canned answer
+            responder: Optional function building the reply from the prompt
+        """
+        self.latency = latency
+        self.points = points
+        self.confidence = confidence
+        self.responder = responder
+        self.calls = 0
+        self.prompt_chars = 0
+        self._lock = threading.Lock()
+        
+    def invoke(self, messages: List[BaseMessage]) -> AIMessage:
+        with self._lock:
+            self.calls += 1
+            self.prompt_chars += sum(len(m.content) for m in messages)
+        time.sleep(self.latency)
+        
+        if self.responder is not None:
+            return AIMessage(content=self.responder(messages))
+        return AIMessage(content=json.dumps({
+            "points": self.points,
+            "explanation": "Canned answer from FakeLLM",
+            "confidence": self.confidence
+        }))
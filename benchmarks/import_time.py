@@ -0,0 +1,52 @@
+"""
+Measure the cold import time of the entry points, and which heavy
+dependencies each one loads before serving anything.
+
+Every measurement runs in a fresh interpreter, so nothing is already
+imported. Each entry point is measured as deployed and with warm-up
+turned off; the API warms up its grader when the server starts, so both
+should match. Run from
+the repository root:
+    python -m benchmarks.import_time
+"""
+import json
+import os
+import subprocess
+import sys
+
+RUNS = 5
+ENTRY_POINTS = ["src.web.api", "src.grading.grader", "src.input.file_processor"]
+HEAVY_MODULES = [
+    "langchain_openai", "langchain_core", "openai", "pypdf", "docx", "nbformat", "numpy", "pyarrow"
+]
+# GRADING_WARM_UP values measured: the default, then warm-up off
+WARM_UP_SETTINGS = {"default": "1", "no warm-up": "0"}
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - started
+print(json.dumps({{"seconds": seconds, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def measure(module: str, warm_up: str):
+    env = dict(os.environ, OPENAI_API_KEY=os.getenv("OPENAI_API_KEY", "benchmark"), GRADING_WARM_UP=warm_up)
+    results = []
+    for _ in range(RUNS):
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD.format(module=module, heavy=HEAVY_MODULES)],
+            capture_output=True, text=True, check=True, env=env
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return min(r["seconds"] for r in results), results[0]["loaded"]
+
+def main():
+    print(f"Best of {RUNS} cold imports")
+    for module in ENTRY_POINTS:
+        for setting, warm_up in WARM_UP_SETTINGS.items():
+            seconds, loaded = measure(module, warm_up)
+            print(f"{module:26s} {setting:10s} {seconds * 1000:7.0f} ms  loads: {', '.join(loaded) or '-'}")
+
+if __name__ == "__main__":
+    main()
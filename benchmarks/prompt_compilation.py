@@ -0,0 +1,61 @@
+"""
+Compare building the grading prompt from scratch on every call with
+rendering a compiled prompt, and report the prefix tokens reused.
+
+Run from the repository root:
+    python -m benchmarks.prompt_compilation
+"""
+import time
+from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from src.grading.criteria import GradingCriterion
+from src.models.ai_models import GradingResult
+from src.models.prompts import PromptCompiler, SINGLE_PREFIX, SINGLE_SYSTEM, rubric_text
+
+CALLS = 2000
+CRITERION = GradingCriterion(
+    name="Implementation",
+    description="Correctness and completeness of the implementation",
+    max_points=40,
+    rubric={"40": "Complete and correct", "25": "Mostly working", "10": "Partial", "0": "Missing"}
+)
+SUBMISSIONS = [f"Submission {i}: " + "The student implemented the algorithm. " * 50 for i in range(50)]
+
+def build_each_time(parser, submission):
+    """What every call did before prompts were compiled."""
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", SINGLE_SYSTEM),
+        ("user", "{prefix}{submission}")
+    ])
+    prefix = SINGLE_PREFIX.format(
+        criterion_name=CRITERION.name,
+        criterion_description=CRITERION.description,
+        max_points=CRITERION.max_points,
+        rubric=rubric_text(CRITERION),
+        format_instructions=parser.get_format_instructions()
+    )
+    return prompt.format_messages(prefix=prefix, submission=submission)
+
+def main():
+    parser = PydanticOutputParser(pydantic_object=GradingResult)
+    compiler = PromptCompiler()
+
+    started = time.perf_counter()
+    for i in range(CALLS):
+        build_each_time(parser, SUBMISSIONS[i % len(SUBMISSIONS)])
+    rebuild_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for i in range(CALLS):
+        compiler.single(CRITERION, parser, "gpt-4").render(SUBMISSIONS[i % len(SUBMISSIONS)])
+    compiled_seconds = time.perf_counter() - started
+
+    stats = compiler.stats
+    print(f"{CALLS} prompts for one criterion")
+    print(f"Rebuilt every call: {rebuild_seconds / CALLS * 1e6:.0f} us per prompt")
+    print(f"Compiled once:      {compiled_seconds / CALLS * 1e6:.0f} us per prompt")
+    print(f"Prefix reused {stats['reused']} times, "
+          f"{stats['prefix_tokens_reused']:,} prefix tokens in total")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Compare unpaced and rate-limited grading against a fake provider that
+enforces a requests-per-minute limit with a token bucket (refilled
+continuously, holding a second's worth) and answers 429 above it.
+
+Run from the repository root:
+    python -m benchmarks.rate_limiting
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.grading.criteria import GradingCriterion
+from src.models.ai_models import AIGrader
+from src.models.rate_limit import RateLimiter, TokenBucket
+from benchmarks.fake_llm import FakeLLM
+
+# Scaled-down provider limit so the benchmark finishes in seconds
+REQUESTS_PER_MINUTE = 1200
+CALLS = 120
+WORKERS = 16
+
+class RateLimitError(Exception):
+    status_code = 429
+
+class LimitedLLM(FakeLLM):
+    """Fake model rejecting calls beyond REQUESTS_PER_MINUTE."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.rejected = 0
+        self._bucket = TokenBucket(REQUESTS_PER_MINUTE / 60, REQUESTS_PER_MINUTE / 60)
+        self._bucket_lock = threading.Lock()
+
+    def invoke(self, messages):
+        with self._bucket_lock:
+            self._bucket.refill(time.monotonic())
+            if self._bucket.level < 1:
+                self.rejected += 1
+                raise RateLimitError()
+            self._bucket.level -= 1
+        return super().invoke(messages)
+
+def run(rate_limiter):
+    llm = LimitedLLM(latency=0.05)
+    grader = AIGrader(
+        model_name="fake",
+        llm=llm,
+        rate_limiter=rate_limiter,
+        max_rate_limit_retries=10
+    )
+    criterion = GradingCriterion(
+        name="Understanding",
+        description="Demonstrates understanding of core concepts",
+        max_points=40,
+        rubric={"40": "Excellent", "0": "None"}
+    )
+
+    def call(i):
+        try:
+            grader.grade_submission(f"Submission {i}", criterion)
+            return True
+        except RateLimitError:
+            return False
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        succeeded = sum(pool.map(call, range(CALLS)))
+    return succeeded, llm.rejected, time.perf_counter() - started
+
+def main():
+    unpaced = run(None)
+    paced = run(RateLimiter(REQUESTS_PER_MINUTE, 10_000_000))
+
+    print(f"Provider limit: {REQUESTS_PER_MINUTE} RPM, {CALLS} calls from {WORKERS} workers")
+    for label, (succeeded, rejected, elapsed) in (("Unpaced", unpaced), ("Rate limited", paced)):
+        print(f"{label:13} {succeeded}/{CALLS} graded, {rejected} calls rejected with 429, {elapsed:.2f}s")
+
+if __name__ == "__main__":
+    main()
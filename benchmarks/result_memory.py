@@ -0,0 +1,70 @@
+"""
+Measure the memory a large grading run takes as AssignmentGrade objects
+and as CompactResults.
+
+Run from the repository root:
+    python -m benchmarks.result_memory
+"""
+import random
+import tracemalloc
+from src.grading.compact import CompactResults
+from src.grading.grader import AssignmentGrade
+from src.models.ai_models import ConsensusResult
+
+SUBMISSIONS = 5000
+CRITERIA = {"Understanding": 40, "Implementation": 60, "Style": 20, "Testing": 30}
+MODELS = ["gpt-4", "gpt-3.5-turbo"]
+
+def build_grade(rng: random.Random) -> AssignmentGrade:
+    criterion_grades = {}
+    for name, max_points in CRITERIA.items():
+        explanation = "\n".join(
+            f"Model {i + 1} (0.90 confidence): " + " ".join(
+                rng.choice(["clear", "thorough", "partial", "missing", "correct", "weak"])
+                for _ in range(60)
+            )
+            for i in range(len(MODELS))
+        )
+        criterion_grades[name] = ConsensusResult(
+            points=rng.uniform(0, max_points),
+            explanation=explanation,
+            confidence=rng.uniform(0.6, 1.0),
+            model_points={model: rng.uniform(0, max_points) for model in MODELS}
+        )
+    return AssignmentGrade(
+        total_points=sum(r.points for r in criterion_grades.values()),
+        criterion_grades=criterion_grades,
+        overall_confidence=0.8,
+        needs_review=False
+    )
+
+def measure(keep) -> int:
+    """Bytes still allocated after building and keeping the whole run."""
+    rng = random.Random(0)
+    tracemalloc.start()
+    kept = keep((f"submission-{i}", build_grade(rng)) for i in range(SUBMISSIONS))
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return size
+
+def keep_objects(grades):
+    return dict(grades)
+
+def keep_compact(grades):
+    results = CompactResults()
+    for submission_id, grade in grades:
+        results.add(submission_id, grade)
+    return results
+
+def main():
+    objects = measure(keep_objects)
+    compact = measure(keep_compact)
+
+    print(f"{SUBMISSIONS} submissions x {len(CRITERIA)} criteria")
+    print(f"AssignmentGrade objects: {objects / SUBMISSIONS:,.0f} bytes per submission")
+    print(f"CompactResults:          {compact / SUBMISSIONS:,.0f} bytes per submission "
+          "(explanations on disk)")
+
+if __name__ == "__main__":
+    main()
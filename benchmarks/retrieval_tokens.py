@@ -0,0 +1,47 @@
+"""
+Compare prompt tokens per call with and without retrieval on a long submission.
+
+Run from the repository root:
+    python -m benchmarks.retrieval_tokens
+"""
+from src.grading.schema_loader import load_grading_schema
+from src.models.ai_models import AIGrader
+from benchmarks.fake_llm import FakeLLM
+
+TOPICS = [
+    "The implementation uses a hash map to cache intermediate results and "
+    "handles edge cases such as empty input and duplicate keys.",
+    "Background reading on the history of the field, unrelated anecdotes "
+    "and acknowledgements to friends and family.",
+    "The student explains the core concepts clearly and shows good "
+    "understanding of recursion, invariants and complexity analysis.",
+    "Appendix tables of raw measurements copied from the lab notebook.",
+]
+
+def build_submission(sections: int = 400) -> str:
+    return "\n\n".join(
+        f"## Section {i + 1}\n" + (TOPICS[i % len(TOPICS)] + " ") * 3
+        for i in range(sections)
+    )
+
+def prompt_tokens_per_call(retrieval_top_k) -> float:
+    grader = AIGrader(
+        model_name="gpt-4",
+        llm=FakeLLM(latency=0),
+        retrieval_top_k=retrieval_top_k
+    )
+    submission = build_submission()
+    for criterion in load_grading_schema("1").criteria:
+        grader.grade_submission(submission, criterion)
+    totals = grader.usage.totals
+    return totals["prompt_tokens"] / totals["calls"]
+
+def main():
+    full = prompt_tokens_per_call(None)
+    retrieved = prompt_tokens_per_call(8)
+    print(f"Full submission:   {full:>9,.0f} prompt tokens per call")
+    print(f"Top-8 passages:    {retrieved:>9,.0f} prompt tokens per call")
+    print(f"Reduction:         {full / retrieved:9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+from typing import Dict, List, Optional, TextIO
+import csv
+import io
+import numpy as np
+from src.grading.grader import AssignmentGrade
+
+# pyarrow is optional and slow to import, so it is loaded only for export
+
+# Modified z-score above which a grade is reported as an outlier
+DEFAULT_OUTLIER_THRESHOLD = 3.5
+
+# Percentiles included in distribution summaries
+PERCENTILES = (10, 25, 50, 75, 90)
+
+class _Column:
+    """Growable typed array; appends are amortised O(1)."""
+
+    def __init__(self, dtype, capacity: int):
+        self._data = np.empty(capacity, dtype=dtype)
+        self._size = 0
+
+    def append(self, value) -> None:
+        if self._size == len(self._data):
+            grown = np.empty(max(16, 2 * len(self._data)), dtype=self._data.dtype)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size] = value
+        self._size += 1
+
+    @property
+    def values(self) -> np.ndarray:
+        """View of the filled part of the column (no copy)."""
+        return self._data[:self._size]
+
+class _Codes:
+    """Maps names to small integer codes, like a categorical column."""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def code(self, name: str) -> int:
+        code = self._codes.get(name)
+        if code is None:
+            code = self._codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+class CohortResults:
+    """
+    Columnar store of a cohort's grades for fast batch analytics.
+
+    Grades are flattened into three tables of NumPy columns: one row per
+    submission, one per graded criterion and one per model answer (from
+    the consensus model_points). Names are stored once and referenced by
+    integer codes, so summaries run as vectorised array operations rather
+    than loops over AssignmentGrade objects.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        """
+        Args:
+            capacity: Initial rows reserved per table
+        """
+        self.submission_ids: List[str] = []
+        self.criteria = _Codes()
+        self.models = _Codes()
+        # Submission table
+        self._total = _Column(np.float32, capacity)
+        self._confidence = _Column(np.float32, capacity)
+        self._needs_review = _Column(np.bool_, capacity)
+        # Criterion table
+        self._row_submission = _Column(np.int32, capacity)
+        self._row_criterion = _Column(np.int16, capacity)
+        self._row_points = _Column(np.float32, capacity)
+        self._row_confidence = _Column(np.float32, capacity)
+        # Model answer table, referencing criterion rows
+        self._answer_row = _Column(np.int32, capacity)
+        self._answer_model = _Column(np.int16, capacity)
+        self._answer_points = _Column(np.float32, capacity)
+
+    def __len__(self) -> int:
+        return len(self.submission_ids)
+
+    def add(self, submission_id: str, grade: AssignmentGrade) -> None:
+        """Append one graded submission."""
+        submission = len(self.submission_ids)
+        self.submission_ids.append(submission_id)
+        self._total.append(grade.total_points)
+        self._confidence.append(grade.overall_confidence)
+        self._needs_review.append(grade.needs_review)
+
+        for criterion_name, result in grade.criterion_grades.items():
+            row = len(self._row_points.values)
+            self._row_submission.append(submission)
+            self._row_criterion.append(self.criteria.code(criterion_name))
+            self._row_points.append(result.points)
+            self._row_confidence.append(result.confidence)
+            for model_name, points in getattr(result, "model_points", {}).items():
+                self._answer_row.append(row)
+                self._answer_model.append(self.models.code(model_name))
+                self._answer_points.append(points)
+
+    @staticmethod
+    def _distribution(values: np.ndarray) -> Dict[str, float]:
+        if not len(values):
+            return {"count": 0}
+        percentiles = np.percentile(values, PERCENTILES)
+        summary = {
+            "count": int(len(values)),
+            "mean": float(values.mean()),
+            "std": float(values.std()),
+            "min": float(values.min()),
+            "max": float(values.max())
+        }
+        summary.update({f"p{p}": float(v) for p, v in zip(PERCENTILES, percentiles)})
+        return summary
+
+    def total_summary(self) -> Dict[str, float]:
+        """Distribution of total points, plus the share flagged for review."""
+        summary = self._distribution(self._total.values)
+        summary["review_rate"] = float(self._needs_review.values.mean()) if len(self) else 0.0
+        return summary
+
+    def criterion_summary(self) -> Dict[str, Dict[str, float]]:
+        """Distribution of points and mean confidence per criterion."""
+        codes = self._row_criterion.values
+        points = self._row_points.values
+        confidence = self._row_confidence.values
+        # Sorting once groups each criterion's rows into a contiguous slice
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(self.criteria.names) + 1))
+        summary = {}
+        for code, name in enumerate(self.criteria.names):
+            rows = order[bounds[code]:bounds[code + 1]]
+            summary[name] = self._distribution(points[rows])
+            summary[name]["mean_confidence"] = float(confidence[rows].mean()) if len(rows) else 0.0
+        return summary
+
+    def histogram(self, bins: int = 10) -> Dict[str, List[float]]:
+        """Histogram of total points."""
+        counts, edges = np.histogram(self._total.values, bins=bins)
+        return {"counts": counts.tolist(), "edges": edges.tolist()}
+
+    def _model_matrix(self) -> np.ndarray:
+        """Criterion rows x models matrix of model points, NaN where a model gave none."""
+        matrix = np.full((len(self._row_points.values), len(self.models.names)), np.nan, dtype=np.float32)
+        matrix[self._answer_row.values, self._answer_model.values] = self._answer_points.values
+        return matrix
+
+    def model_bias(self) -> Dict[str, Dict[str, float]]:
+        """
+        How each model's points differ from the consensus and from each other.
+
+        Returns:
+            Per model: mean deviation from consensus points, number of
+            answers, and mean difference to every other model on the
+            criteria both answered
+        """
+        matrix = self._model_matrix()
+        answered = ~np.isnan(matrix)
+        deviation = np.where(answered, matrix - self._row_points.values[:, None], 0.0)
+        counts = answered.sum(axis=0)
+        mean_deviation = deviation.sum(axis=0) / np.maximum(counts, 1)
+
+        bias = {}
+        for i, name in enumerate(self.models.names):
+            both = answered[:, i:i + 1] & answered
+            differences = np.where(both, matrix[:, i:i + 1] - matrix, 0.0).sum(axis=0)
+            pairs = both.sum(axis=0)
+            bias[name] = {
+                "answers": int(counts[i]),
+                "mean_deviation": float(mean_deviation[i]),
+                "versus": {
+                    other: float(differences[j] / pairs[j])
+                    for j, other in enumerate(self.models.names)
+                    if j != i and pairs[j]
+                }
+            }
+        return bias
+
+    def outliers(self, threshold: float = DEFAULT_OUTLIER_THRESHOLD) -> List[Dict]:
+        """
+        Criterion grades far from the rest of the cohort on that criterion.
+
+        Uses the modified z-score (distance from the median in units of the
+        median absolute deviation), which a few extreme grades can't mask.
+
+        Returns:
+            One entry per outlying grade, most extreme first
+        """
+        codes = self._row_criterion.values
+        points = self._row_points.values
+        medians = np.zeros(len(self.criteria.names))
+        mads = np.zeros(len(self.criteria.names))
+        for code in range(len(self.criteria.names)):
+            values = points[codes == code]
+            if len(values):
+                medians[code] = np.median(values)
+                mads[code] = np.median(np.abs(values - medians[code]))
+
+        scale = mads[codes]
+        deviation = points - medians[codes]
+        z = np.divide(
+            0.6745 * deviation, scale,
+            out=np.zeros_like(deviation, dtype=float), where=scale > 0
+        )
+        flagged = np.flatnonzero(np.abs(z) > threshold)
+        flagged = flagged[np.argsort(-np.abs(z[flagged]))]
+        submissions = self._row_submission.values
+        return [
+            {
+                "submission_id": self.submission_ids[submissions[row]],
+                "criterion": self.criteria.names[codes[row]],
+                "points": float(points[row]),
+                "median": float(medians[codes[row]]),
+                "z_score": float(z[row])
+            }
+            for row in flagged
+        ]
+
+    def report(self, outlier_threshold: float = DEFAULT_OUTLIER_THRESHOLD) -> Dict:
+        """All cohort analytics in one dictionary."""
+        return {
+            "submissions": len(self),
+            "totals": self.total_summary(),
+            "criteria": self.criterion_summary(),
+            "model_bias": self.model_bias(),
+            "outliers": self.outliers(outlier_threshold)
+        }
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """The criterion table as flat columns, one entry per graded criterion."""
+        submissions = self._row_submission.values
+        criteria = self._row_criterion.values
+        columns = {
+            "submission_id": np.array(self.submission_ids, dtype=object)[submissions],
+            "criterion": np.array(self.criteria.names, dtype=object)[criteria],
+            "points": self._row_points.values,
+            "confidence": self._row_confidence.values,
+            "total_points": self._total.values[submissions],
+            "needs_review": self._needs_review.values[submissions]
+        }
+        matrix = self._model_matrix()
+        for i, name in enumerate(self.models.names):
+            columns[f"points_{name}"] = matrix[:, i]
+        return columns
+
+    def to_arrow(self):
+        """The criterion table as a pyarrow Table."""
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("pyarrow is required for Arrow and Parquet export") from None
+        return pa.table({name: values.tolist() if values.dtype == object else values
+                         for name, values in self.columns().items()})
+
+    def to_parquet(self, path: str) -> None:
+        """Write the criterion table to a Parquet file."""
+        table = self.to_arrow()
+        import pyarrow.parquet as pq
+        pq.write_table(table, path)
+
+    def to_csv(self, path: str) -> None:
+        """Write the criterion table to a CSV file."""
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            self._write_csv(f)
+
+    def csv_bytes(self) -> bytes:
+        """The criterion table as UTF-8 CSV, e.g. for a download button."""
+        buffer = io.StringIO(newline="")
+        self._write_csv(buffer)
+        return buffer.getvalue().encode("utf-8")
+
+    def _write_csv(self, f: TextIO) -> None:
+        columns = self.columns()
+        writer = csv.writer(f)
+        writer.writerow(columns.keys())
+        # Round float32 columns so CSV shows 31.5, not 31.500000953674316
+        writer.writerows(zip(*(
+            np.round(values.astype(float), 4).tolist() if values.dtype.kind == "f" else values.tolist()
+            for values in columns.values()
+        )))
+
+    @classmethod
+    def from_grades(cls, grades: Dict[str, Optional[AssignmentGrade]]) -> "CohortResults":
+        """Build a store from submission IDs mapped to grades; None grades are skipped."""
+        cohort = cls(capacity=max(16, len(grades) * 4))
+        for submission_id, grade in grades.items():
+            if grade is not None:
+                cohort.add(submission_id, grade)
+        return cohort
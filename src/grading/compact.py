@@ -0,0 +1,207 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+from array import array
+from collections import OrderedDict
+import hashlib
+import sqlite3
+import sys
+import threading
+import zlib
+from src.grading.grader import AssignmentGrade
+
+class ExplanationStore:
+    """
+    Interned explanation texts, kept on disk until someone reads them.
+
+    Identical texts are stored once. The default path is SQLite's private
+    temporary database, which lives in a file rather than in memory.
+    """
+
+    def __init__(self, path: str = "", max_cached: int = 256):
+        """
+        Args:
+            path: SQLite database file ("" = temporary file)
+            max_cached: Recently read explanations kept in memory
+        """
+        self.max_cached = max_cached
+        self._ids: Dict[bytes, int] = {}
+        self._cached: "OrderedDict[int, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS explanations (id INTEGER PRIMARY KEY, text BLOB NOT NULL)"
+        )
+
+    def put(self, text: str) -> int:
+        """Store text (once) and return its ID."""
+        encoded = text.encode("utf-8")
+        digest = hashlib.blake2b(encoded, digest_size=16).digest()
+        with self._lock:
+            explanation_id = self._ids.get(digest)
+            if explanation_id is None:
+                cursor = self._conn.execute(
+                    "INSERT INTO explanations (text) VALUES (?)", (zlib.compress(encoded),)
+                )
+                explanation_id = self._ids[digest] = cursor.lastrowid
+            return explanation_id
+
+    def get(self, explanation_id: int) -> str:
+        """Load an explanation by ID."""
+        with self._lock:
+            text = self._cached.get(explanation_id)
+            if text is not None:
+                self._cached.move_to_end(explanation_id)
+                return text
+            row = self._conn.execute(
+                "SELECT text FROM explanations WHERE id = ?", (explanation_id,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(explanation_id)
+            text = zlib.decompress(row[0]).decode("utf-8")
+            self._cached[explanation_id] = text
+            if len(self._cached) > self.max_cached:
+                self._cached.popitem(last=False)
+            return text
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def nbytes(self) -> int:
+        """Approximate bytes held in memory: the digest to ID map and the read cache."""
+        with self._lock:
+            return (
+                sys.getsizeof(self._ids)
+                + sum(sys.getsizeof(digest) + sys.getsizeof(i) for digest, i in self._ids.items())
+                + sys.getsizeof(self._cached)
+                + sum(sys.getsizeof(text) for text in self._cached.values())
+            )
+
+class CompactCriterionGrade:
+    """Read-only view of one criterion's grade; the explanation loads on access."""
+    __slots__ = ("points", "confidence", "_explanation_id", "_store")
+
+    def __init__(self, points: float, confidence: float, explanation_id: int, store: ExplanationStore):
+        self.points = points
+        self.confidence = confidence
+        self._explanation_id = explanation_id
+        self._store = store
+
+    @property
+    def explanation(self) -> str:
+        return self._store.get(self._explanation_id)
+
+class CompactGrade:
+    """
+    Memory-light form of an AssignmentGrade.
+
+    Per-criterion numbers live in typed arrays, criterion names are shared
+    interned tuples and explanations are IDs into an ExplanationStore.
+    """
+    __slots__ = (
+        "submission_id", "total_points", "overall_confidence", "needs_review",
+        "criterion_names", "_points", "_confidences", "_explanation_ids", "_store"
+    )
+
+    def __init__(
+        self,
+        submission_id: str,
+        total_points: float,
+        overall_confidence: float,
+        needs_review: bool,
+        criterion_names: Tuple[str, ...],
+        points: array,
+        confidences: array,
+        explanation_ids: array,
+        store: ExplanationStore
+    ):
+        self.submission_id = submission_id
+        self.total_points = total_points
+        self.overall_confidence = overall_confidence
+        self.needs_review = needs_review
+        self.criterion_names = criterion_names
+        self._points = points
+        self._confidences = confidences
+        self._explanation_ids = explanation_ids
+        self._store = store
+
+    @property
+    def criterion_grades(self) -> Dict[str, CompactCriterionGrade]:
+        """Criterion grades by name, in the same shape as AssignmentGrade's."""
+        return {
+            name: CompactCriterionGrade(
+                self._points[i], self._confidences[i], self._explanation_ids[i], self._store
+            )
+            for i, name in enumerate(self.criterion_names)
+        }
+
+    def explanation(self, criterion_name: str) -> str:
+        """Load one criterion's explanation, e.g. when a reviewer opens it."""
+        return self._store.get(self._explanation_ids[self.criterion_names.index(criterion_name)])
+
+    def nbytes(self) -> int:
+        """Approximate bytes held by this grade, excluding shared names and stored text."""
+        return (
+            sys.getsizeof(self)
+            + sys.getsizeof(self._points)
+            + sys.getsizeof(self._confidences)
+            + sys.getsizeof(self._explanation_ids)
+        )
+
+class CompactResults:
+    """
+    A large grading run held compactly, e.g. in Streamlit session state.
+
+    Explanations are written to an ExplanationStore as grades are added,
+    so only numbers and IDs stay in memory.
+    """
+
+    def __init__(self, store: Optional[ExplanationStore] = None):
+        """
+        Args:
+            store: Where explanations go (defaults to a temporary file)
+        """
+        self.store = store if store is not None else ExplanationStore()
+        self.grades: List[CompactGrade] = []
+        self._name_tuples: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+    def add(self, submission_id: str, grade: AssignmentGrade) -> CompactGrade:
+        """Store a grade compactly and return the compact form."""
+        names = tuple(sys.intern(name) for name in grade.criterion_grades)
+        # Every submission of an assignment shares the same names tuple
+        names = self._name_tuples.setdefault(names, names)
+        results = list(grade.criterion_grades.values())
+        compact = CompactGrade(
+            submission_id=submission_id,
+            total_points=float(grade.total_points),
+            overall_confidence=float(grade.overall_confidence),
+            needs_review=bool(grade.needs_review),
+            criterion_names=names,
+            points=array("f", (r.points for r in results)),
+            confidences=array("f", (r.confidence for r in results)),
+            explanation_ids=array("q", (self.store.put(r.explanation) for r in results)),
+            store=self.store
+        )
+        self.grades.append(compact)
+        return compact
+
+    def __len__(self) -> int:
+        return len(self.grades)
+
+    def __iter__(self) -> Iterator[CompactGrade]:
+        return iter(self.grades)
+
+    def memory_per_submission(self) -> float:
+        """
+        Approximate in-memory bytes per stored grade, including its share of
+        the explanation store's ID map and of the interned criterion names.
+        """
+        if not self.grades:
+            return 0.0
+        total = sys.getsizeof(self.grades) + sum(
+            g.nbytes() + sys.getsizeof(g.submission_id) for g in self.grades
+        )
+        total += self.store.nbytes() + sys.getsizeof(self._name_tuples)
+        total += sum(
+            sys.getsizeof(names) + sum(sys.getsizeof(name) for name in names)
+            for names in self._name_tuples
+        )
+        return total / len(self.grades)
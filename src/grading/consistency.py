@@ -0,0 +1,292 @@
+from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import logging
+import threading
+import warnings
+import numpy as np
+from src.grading.criteria import BATCHED, GradingCriterion, GradingSchema
+from src.models.ai_models import (
+    ConsensusGrader, ConsensusResult, GradingResult, result_within, submit_timed
+)
+
+logger = logging.getLogger(__name__)
+
+# Default gradings per criterion, and how many always run before stopping early
+DEFAULT_ITERATIONS = 5
+DEFAULT_MIN_ITERATIONS = 3
+
+# Change in the spread estimate, as a share of max points, treated as stable
+DEFAULT_STABILITY_TOLERANCE = 0.02
+
+@dataclass
+class CriterionConsistency:
+    """How much repeated gradings of one criterion disagree."""
+    criterion_name: str
+    iterations: int
+    # The statistics are None when no grading produced an answer to measure
+    mean_points: Optional[float]
+    std_points: Optional[float]
+    range_points: Optional[float]
+    model_agreement: Optional[float]  # 1.0 when every model gave the same points
+    consistent: bool
+
+@dataclass
+class ConsistencyReport:
+    """Per-criterion spread and averaged grades from repeated gradings."""
+    criteria: Dict[str, CriterionConsistency]
+    grades: Dict[str, Optional[GradingResult]]
+
+    @property
+    def needs_review(self) -> bool:
+        return any(not c.consistent for c in self.criteria.values())
+
+class ConsistencyEngine:
+    """
+    Grades every criterion several times and measures the spread.
+
+    Each iteration asks every model afresh (bypassing the result cache) and
+    combines the answers into a consensus grade. Iterations run in rounds,
+    concurrently across criteria, models and iterations; after each round a
+    criterion stops once its spread estimate has stabilised. Batched
+    schemas send one request per model and iteration covering every
+    criterion still running, rather than one per criterion.
+    """
+
+    def __init__(
+        self,
+        consensus_grader: ConsensusGrader,
+        iterations: int = DEFAULT_ITERATIONS,
+        consistency_threshold: float = 0.2,
+        min_iterations: int = DEFAULT_MIN_ITERATIONS,
+        stability_tolerance: float = DEFAULT_STABILITY_TOLERANCE,
+        max_workers: Optional[int] = None
+    ):
+        """
+        Args:
+            consensus_grader: Supplies the models and the consensus rule
+            iterations: Maximum gradings per criterion
+            consistency_threshold: Largest standard deviation across
+                iterations, and mean spread between models, as a share of
+                the criterion's max points, before review is needed
+            min_iterations: Gradings always run before stopping early
+            stability_tolerance: Stop once the standard deviation moves by
+                less than this share of max points between rounds
+            max_workers: Model calls running at once (defaults to the
+                consensus grader's max_in_flight)
+        """
+        self.consensus_grader = consensus_grader
+        self.iterations = iterations
+        self.consistency_threshold = consistency_threshold
+        self.min_iterations = min(min_iterations, iterations)
+        self.stability_tolerance = stability_tolerance
+        self.max_workers = max_workers or consensus_grader.max_in_flight
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Worker pool running the repeated model calls."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="consistency"
+                )
+        return self._executor
+
+    def close(self) -> None:
+        """Shut down the worker pool; a later evaluation starts a new one."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def evaluate(
+        self,
+        submission_text: str,
+        schema: GradingSchema,
+        min_confidence: float = 0.7
+    ) -> ConsistencyReport:
+        """
+        Grade the submission repeatedly and report each criterion's spread.
+
+        Args:
+            submission_text: The submission to grade
+            schema: The grading schema to apply
+            min_confidence: Minimum confidence for a model's answer to count
+
+        Returns:
+            ConsistencyReport with spread statistics and averaged grades
+        """
+        criteria = schema.criteria
+        models = self.consensus_grader.models
+        shape = (len(criteria), self.iterations)
+        # points[c, i, m]: model m's points for criterion c in iteration i
+        points = np.full(shape + (len(models),), np.nan)
+        consensus = np.full(shape, np.nan)
+        confidence = np.full(shape, np.nan)
+        explanations: Dict[int, str] = {}
+        max_points = np.array([c.max_points for c in criteria], dtype=float)
+
+        active = np.ones(len(criteria), dtype=bool)
+        completed = np.zeros(len(criteria), dtype=int)
+        previous_std = None
+        done = 0
+        while done < self.iterations and active.any():
+            size = self.min_iterations if done == 0 else 1
+            rounds = range(done, done + size)
+            running = np.flatnonzero(active)
+            if schema.grading_mode == BATCHED:
+                answers = self._ask_batched(submission_text, criteria, running, rounds)
+            else:
+                answers = self._ask(submission_text, criteria, running, rounds)
+            for (c, i, m), answer in answers.items():
+                if answer is not None:
+                    points[c, i, m] = answer.points
+
+            for c in running:
+                for i in rounds:
+                    result = self.consensus_grader.combine_results(
+                        [answers[c, i, m] for m in range(len(models))], min_confidence
+                    )
+                    if result is not None:
+                        consensus[c, i] = result.points
+                        confidence[c, i] = result.confidence
+                        explanations.setdefault(c, result.explanation)
+
+            done += size
+            completed[running] = done
+            std = self._nan_stat(np.nanstd, consensus, axis=1)
+            if previous_std is not None:
+                stable = np.abs(std - previous_std) <= self.stability_tolerance * max_points
+                active &= ~stable
+            previous_std = std
+
+        return self._report(
+            criteria, [model.model_name for model in models], completed, points,
+            consensus, confidence, explanations, max_points
+        )
+
+    def _ask(
+        self,
+        submission_text: str,
+        criteria: List[GradingCriterion],
+        running: np.ndarray,
+        rounds: range
+    ) -> Dict[tuple, Optional[GradingResult]]:
+        """
+        Every model's answer per (criterion, iteration, model), one call each.
+
+        Each model's timeout is counted from when its call starts, as in
+        ConsensusGrader, so the wait is bounded by the slowest call rather
+        than the sum of all of them; a call that fails or times out counts
+        as no answer.
+        """
+        models = self.consensus_grader.models
+        futures = {
+            (c, i, m): submit_timed(
+                self.executor,
+                lambda model=model, c=c: model.grade_submission(submission_text, criteria[c], False)
+            )
+            for c in running for i in rounds for m, model in enumerate(models)
+        }
+        answers: Dict[tuple, Optional[GradingResult]] = {}
+        for (c, i, m), (future, started) in futures.items():
+            try:
+                answers[c, i, m] = result_within(future, started, models[m].timeout)
+            except Exception as e:
+                future.cancel()
+                logger.warning("Model %s failed a consistency run: %s", models[m].model_name, e)
+                answers[c, i, m] = None
+        return answers
+
+    def _ask_batched(
+        self,
+        submission_text: str,
+        criteria: List[GradingCriterion],
+        running: np.ndarray,
+        rounds: range
+    ) -> Dict[tuple, Optional[GradingResult]]:
+        """As _ask, but with one batched call per (iteration, model)."""
+        models = self.consensus_grader.models
+        batch = [criteria[c] for c in running]
+        futures = {
+            (i, m): submit_timed(
+                self.executor,
+                lambda model=model: model.grade_criteria(submission_text, batch, use_cache=False)
+            )
+            for i in rounds for m, model in enumerate(models)
+        }
+        answers: Dict[tuple, Optional[GradingResult]] = {}
+        for (i, m), (future, started) in futures.items():
+            try:
+                results = result_within(future, started, models[m].timeout)
+            except Exception as e:
+                future.cancel()
+                logger.warning("Model %s failed a consistency run: %s", models[m].model_name, e)
+                results = [None] * len(batch)
+            for c, result in zip(running, results):
+                answers[c, i, m] = result
+        return answers
+
+    @staticmethod
+    def _optional(value: float) -> Optional[float]:
+        """A statistic as a float, or None where it is undefined (NaN)."""
+        return None if np.isnan(value) else float(value)
+
+    @staticmethod
+    def _nan_stat(stat, values: np.ndarray, axis: int) -> np.ndarray:
+        """Apply a NaN-ignoring statistic, giving NaN for all-missing slices quietly."""
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            return stat(values, axis=axis)
+
+    def _report(
+        self,
+        criteria: List[GradingCriterion],
+        model_names: List[str],
+        completed: np.ndarray,
+        points: np.ndarray,
+        consensus: np.ndarray,
+        confidence: np.ndarray,
+        explanations: Dict[int, str],
+        max_points: np.ndarray
+    ) -> ConsistencyReport:
+        mean = self._nan_stat(np.nanmean, consensus, axis=1)
+        std = self._nan_stat(np.nanstd, consensus, axis=1)
+        spread = self._nan_stat(np.nanmax, consensus, axis=1) - self._nan_stat(np.nanmin, consensus, axis=1)
+        mean_confidence = self._nan_stat(np.nanmean, confidence, axis=1)
+        model_spread = self._nan_stat(np.nanstd, points, axis=2)
+        model_mean = self._nan_stat(np.nanmean, points, axis=1)
+        agreement = 1 - self._nan_stat(np.nanmean, model_spread, axis=1) / max_points
+        # Comparisons with NaN are False, so criteria nobody graded are inconsistent
+        consistent = (
+            (std / max_points <= self.consistency_threshold)
+            & (1 - agreement <= self.consistency_threshold)
+            & ~np.isnan(mean)
+        )
+
+        report = ConsistencyReport(criteria={}, grades={})
+        for c, criterion in enumerate(criteria):
+            report.criteria[criterion.name] = CriterionConsistency(
+                criterion_name=criterion.name,
+                iterations=int(completed[c]),
+                # NaN isn't valid JSON, so criteria without answers report None
+                mean_points=self._optional(mean[c]),
+                std_points=self._optional(std[c]),
+                range_points=self._optional(spread[c]),
+                model_agreement=self._optional(agreement[c]),
+                consistent=bool(consistent[c])
+            )
+            report.grades[criterion.name] = None if np.isnan(mean[c]) else ConsensusResult(
+                points=round(float(mean[c]), 2),
+                explanation=explanations[c],
+                confidence=float(mean_confidence[c]),
+                # Each model's average over the iterations it answered
+                model_points={
+                    name: round(float(model_mean[c, m]), 2)
+                    for m, name in enumerate(model_names) if not np.isnan(model_mean[c, m])
+                }
+            )
+        return report
@@ -8,21 +8,37 @@ class GradingCriterion:
     description: str
     max_points: float
     rubric: Dict[str, str]  # Maps point values to descriptions
+
+# Supported values for GradingSchema.grading_mode
+PER_CRITERION = "per_criterion"  # One model call per criterion
+BATCHED = "batched"              # One model call scores every criterion
+GRADING_MODES = {PER_CRITERION, BATCHED}
     
 class GradingSchema:
     """Defines the complete grading schema for an assignment."""
     
-    def __init__(self, name: str, total_points: float):
+    def __init__(
+        self,
+        name: str,
+        total_points: float,
+        grading_mode: str = PER_CRITERION,
+        version: str = "1"
+    ):
+        if grading_mode not in GRADING_MODES:
+            raise ValueError(f"Unknown grading mode: {grading_mode}")
         self.name = name
         self.total_points = total_points
+        self.grading_mode = grading_mode
+        self.version = version
         self.criteria: List[GradingCriterion] = []
+        self.allocated_points = 0.0  # Running total of criterion max points
         
     def add_criterion(self, criterion: GradingCriterion) -> None:
         """Add a grading criterion to the schema."""
-        current_total = sum(c.max_points for c in self.criteria)
-        if current_total + criterion.max_points > self.total_points:
+        if self.allocated_points + criterion.max_points > self.total_points:
             raise ValueError("Total points would exceed maximum")
         self.criteria.append(criterion)
+        self.allocated_points += criterion.max_points
         
     def validate(self) -> bool:
         """
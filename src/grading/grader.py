@@ -1,8 +1,19 @@
-from typing import Dict, List, Optional
-from src.grading.criteria import GradingCriterion, GradingSchema
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import queue
+import threading
+from src.grading.criteria import GradingCriterion, GradingSchema, BATCHED
 from src.models.ai_models import ConsensusGrader, GradingResult
+from src.models.streaming import stream_tokens
 from dataclasses import dataclass
 
+if TYPE_CHECKING:  # The consistency engine (and NumPy) load only when enabled
+    from src.grading.consistency import CriterionConsistency
+
+# Default number of criteria graded at the same time
+DEFAULT_MAX_CONCURRENT_CRITERIA = 8
+
 @dataclass
 class AssignmentGrade:
     """Represents the complete grade for an assignment."""
@@ -10,6 +21,24 @@ class AssignmentGrade:
     criterion_grades: Dict[str, GradingResult]
     overall_confidence: float
     needs_review: bool
+    consistency: Optional[Dict[str, "CriterionConsistency"]] = None
+
+@dataclass
+class CriterionGraded:
+    """One criterion's grade, yielded as soon as it is known."""
+    criterion_name: str
+    result: Optional[GradingResult]  # None if no model produced a usable grade
+    completed: int
+    total: int
+    grade: Optional[AssignmentGrade] = None  # Set on the update completing the schema
+
+@dataclass
+class TokenChunk:
+    """A piece of a model's answer while a criterion is being graded."""
+    criterion_name: str
+    model_name: str
+    text: str
+    attempt: int  # A new attempt restarts the model's answer
     
 class AssignmentGrader:
     """Handles the complete grading process for assignments."""
@@ -18,11 +47,105 @@ class AssignmentGrader:
         self,
         consensus_grader: ConsensusGrader,
         confidence_threshold: float = 0.7,
-        consistency_threshold: float = 0.2
+        consistency_threshold: float = 0.2,
+        max_concurrent_criteria: Optional[int] = None,
+        consistency_iterations: int = 1
     ):
+        """
+        Args:
+            consensus_grader: Grader used for each criterion
+            confidence_threshold: Minimum confidence before flagging for review
+            consistency_threshold: Maximum allowed spread between gradings
+            max_concurrent_criteria: Criteria graded at once (1 = sequential).
+                Model calls across all criteria are additionally capped by
+                consensus_grader.max_in_flight.
+            consistency_iterations: Gradings per criterion; above 1 each
+                criterion is graded repeatedly, the grades are averaged and
+                inconsistent criteria are flagged for review
+        """
         self.consensus_grader = consensus_grader
         self.confidence_threshold = confidence_threshold
         self.consistency_threshold = consistency_threshold
+        self.max_concurrent_criteria = (
+            max_concurrent_criteria or DEFAULT_MAX_CONCURRENT_CRITERIA
+        )
+        self.consistency_engine = None
+        if consistency_iterations > 1:
+            from src.grading.consistency import ConsistencyEngine
+            self.consistency_engine = ConsistencyEngine(
+                consensus_grader,
+                iterations=consistency_iterations,
+                consistency_threshold=consistency_threshold
+            )
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Shared worker pool used to grade criteria concurrently."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrent_criteria,
+                    thread_name_prefix="criteria"
+                )
+        return self._executor
+        
+    def close(self) -> None:
+        """
+        Shut down the criteria pool and every pool the models use.
+
+        Running calls finish; a grader used again afterwards starts new
+        pools.
+        """
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+        if self.consistency_engine is not None:
+            self.consistency_engine.close()
+        self.consensus_grader.close()
+        
+    def _grade_criteria(
+        self,
+        submission_text: str,
+        schema: GradingSchema
+    ) -> List[Optional[GradingResult]]:
+        """
+        Grade every criterion of the schema, concurrently when allowed.
+        
+        Results are returned in schema order regardless of which call
+        finishes first, so the assembled grade matches the sequential path.
+        Batched schemas are graded with a single request per model.
+        """
+        if schema.grading_mode == BATCHED:
+            return self.consensus_grader.grade_criteria_with_consensus(
+                submission_text,
+                schema.criteria,
+                self.confidence_threshold
+            )
+            
+        if self.max_concurrent_criteria == 1 or len(schema.criteria) <= 1:
+            return [
+                self.consensus_grader.grade_with_consensus(
+                    submission_text,
+                    criterion,
+                    self.confidence_threshold
+                )
+                for criterion in schema.criteria
+            ]
+            
+        futures = [
+            self.executor.submit(
+                contextvars.copy_context().run,
+                self.consensus_grader.grade_with_consensus,
+                submission_text,
+                criterion,
+                self.confidence_threshold
+            )
+            for criterion in schema.criteria
+        ]
+        return [future.result() for future in futures]
         
     def grade_assignment(
         self,
@@ -39,18 +162,105 @@ class AssignmentGrader:
         Returns:
             AssignmentGrade containing complete grading results
         """
+        if self.consistency_engine is not None:
+            report = self.consistency_engine.evaluate(
+                submission_text, schema, self.confidence_threshold
+            )
+            results = [report.grades[criterion.name] for criterion in schema.criteria]
+            return self._assemble(schema, results, report.needs_review, report.criteria)
+        return self._assemble(schema, self._grade_criteria(submission_text, schema))
+        
+    def iter_grade_assignment(
+        self,
+        submission_text: str,
+        schema: GradingSchema,
+        stream: bool = False
+    ) -> Iterator[Union[CriterionGraded, TokenChunk]]:
+        """
+        Grade an assignment, yielding each criterion as soon as it completes.
+        
+        Criteria are graded concurrently as in grade_assignment and arrive
+        in completion order; the last CriterionGraded carries the complete
+        AssignmentGrade. Everything is yielded on the caller's thread, so
+        UIs that can only be updated from that thread can render directly.
+        Batched and consistency-checked schemas are graded as a whole and
+        their criteria yielded together once done.
+        
+        Args:
+            submission_text: The submission to grade
+            schema: The grading schema to apply
+            stream: Also yield TokenChunks of the model answers as they arrive
+            
+        Yields:
+            CriterionGraded per criterion, interleaved with TokenChunks if stream
+        """
+        total = len(schema.criteria)
+        if self.consistency_engine is not None or schema.grading_mode == BATCHED:
+            grade = self.grade_assignment(submission_text, schema)
+            for i, criterion in enumerate(schema.criteria):
+                yield CriterionGraded(
+                    criterion_name=criterion.name,
+                    result=grade.criterion_grades.get(criterion.name),
+                    completed=i + 1,
+                    total=total,
+                    grade=grade if i == total - 1 else None
+                )
+            return
+            
+        updates: "queue.Queue" = queue.Queue()
+        
+        def grade_criterion(criterion: GradingCriterion) -> Optional[GradingResult]:
+            listener = None
+            if stream:
+                listener = lambda model_name, text, attempt: updates.put(
+                    TokenChunk(criterion.name, model_name, text, attempt)
+                )
+            with stream_tokens(listener):
+                return self.consensus_grader.grade_with_consensus(
+                    submission_text, criterion, self.confidence_threshold
+                )
+                
+        futures = []
+        for i, criterion in enumerate(schema.criteria):
+            future = self.executor.submit(contextvars.copy_context().run, grade_criterion, criterion)
+            future.add_done_callback(lambda _, i=i: updates.put(i))
+            futures.append(future)
+            
+        results: List[Optional[GradingResult]] = [None] * total
+        completed = 0
+        try:
+            while completed < total:
+                update = updates.get()
+                if isinstance(update, TokenChunk):
+                    yield update
+                    continue
+                results[update] = futures[update].result()
+                completed += 1
+                yield CriterionGraded(
+                    criterion_name=schema.criteria[update].name,
+                    result=results[update],
+                    completed=completed,
+                    total=total,
+                    grade=self._assemble(schema, results) if completed == total else None
+                )
+        finally:
+            # The caller stopped early: don't start criteria nobody will read
+            for future in futures:
+                future.cancel()
+        
+    def _assemble(
+        self,
+        schema: GradingSchema,
+        results: List[Optional[GradingResult]],
+        needs_review: bool = False,
+        consistency: Optional[Dict[str, "CriterionConsistency"]] = None
+    ) -> AssignmentGrade:
+        """Combine per-criterion results, in schema order, into an AssignmentGrade."""
         criterion_grades: Dict[str, GradingResult] = {}
         total_points = 0
         confidences = []
-        needs_review = False
         
-        for criterion in schema.criteria:
-            result = self.consensus_grader.grade_with_consensus(
-                submission_text,
-                criterion,
-                self.confidence_threshold
-            )
-            
+        for criterion, result in zip(schema.criteria, results):
             if result is None:
                 needs_review = True
                 continue
@@ -70,5 +280,6 @@ class AssignmentGrader:
             total_points=total_points,
             criterion_grades=criterion_grades,
             overall_confidence=overall_confidence,
-            needs_review=needs_review
+            needs_review=needs_review,
+            consistency=consistency
         ) 
\ No newline at end of file
@@ -1,12 +1,32 @@
-from typing import Dict
+from typing import Dict, Optional
+from functools import lru_cache
 from src.grading.criteria import GradingSchema, GradingCriterion
+from src.grading.schema_registry import default_registry
 
-def load_grading_schema(assignment_id: str) -> GradingSchema:
+def load_grading_schema(assignment_id: str, version: Optional[str] = None) -> GradingSchema:
     """
-    Load grading schema for an assignment (temporary mock implementation).
-    In production, this would load from a database.
+    Look up the grading schema for an assignment in the schema registry.
+
+    Assignments without a registered schema get the mock schema. The
+    returned schema is shared between callers and must not be modified.
+
+    Args:
+        assignment_id: Assignment to grade
+        version: Schema version (None = latest)
+
+    Raises:
+        KeyError: If a specific version was asked for and isn't registered
     """
-    # Mock schema for testing
+    schema = default_registry().get(assignment_id, version)
+    if schema is not None:
+        return schema
+    if version is not None:
+        raise KeyError(f"No schema version {version} for assignment {assignment_id}")
+    return _mock_schema(assignment_id)
+
+@lru_cache(maxsize=1024)
+def _mock_schema(assignment_id: str) -> GradingSchema:
+    """Mock schema used until an assignment's rubric is registered (built once)."""
     schema = GradingSchema(name=f"Assignment {assignment_id}", total_points=100)
     
     # Add some sample criteria
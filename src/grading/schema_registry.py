@@ -0,0 +1,319 @@
+from typing import Callable, Dict, List, Optional, Tuple
+import json
+import logging
+import os
+import threading
+from src.grading.criteria import GradingCriterion, GradingSchema, PER_CRITERION
+
+try:
+    import yaml
+except ImportError:  # Only JSON schema files can be read without PyYAML
+    yaml = None
+
+logger = logging.getLogger(__name__)
+
+# File extensions read as schema definitions
+SCHEMA_EXTENSIONS = (".json", ".yaml", ".yml")
+
+# Seconds between checks for changed schema files
+DEFAULT_RELOAD_INTERVAL = 2.0
+
+# Version given to definitions that don't declare one
+DEFAULT_VERSION = "1"
+
+# Called with (old, new) when a schema is replaced by a different
+# definition of the same assignment and version
+SchemaListener = Callable[[GradingSchema, GradingSchema], None]
+
+class SchemaError(ValueError):
+    """A schema definition is malformed or inconsistent."""
+
+def _version_key(version: str) -> Tuple:
+    """Order versions naturally, so "10" comes after "9"."""
+    return tuple((0, int(part), "") if part.isdigit() else (1, 0, part) for part in version.split("."))
+
+def parse_schema(data: Dict, source: str = "<memory>") -> Tuple[str, GradingSchema]:
+    """
+    Validate a schema definition and build the GradingSchema.
+
+    A definition has name, total_points, criteria (each with name,
+    description, max_points and rubric) and optionally assignment_id,
+    version and grading_mode.
+
+    Args:
+        data: Parsed YAML/JSON definition
+        source: Where the definition came from, for error messages
+
+    Returns:
+        The assignment ID (None if not declared) and the schema
+
+    Raises:
+        SchemaError: If the definition is invalid
+    """
+    def fail(message: str):
+        raise SchemaError(f"{source}: {message}")
+
+    if not isinstance(data, dict):
+        fail("schema must be a mapping")
+    for field in ("name", "total_points", "criteria"):
+        if field not in data:
+            fail(f"missing '{field}'")
+    if not isinstance(data["criteria"], list) or not data["criteria"]:
+        fail("'criteria' must be a non-empty list")
+
+    try:
+        schema = GradingSchema(
+            name=str(data["name"]),
+            total_points=float(data["total_points"]),
+            grading_mode=data.get("grading_mode", PER_CRITERION),
+            version=str(data.get("version", DEFAULT_VERSION))
+        )
+    except (TypeError, ValueError) as e:
+        fail(str(e))
+
+    names = set()
+    for i, item in enumerate(data["criteria"]):
+        if not isinstance(item, dict) or not item.get("name"):
+            fail(f"criterion {i + 1} must be a mapping with a name")
+        name = str(item["name"])
+        if name in names:
+            fail(f"duplicate criterion '{name}'")
+        names.add(name)
+        try:
+            max_points = float(item["max_points"])
+        except (KeyError, TypeError, ValueError):
+            fail(f"criterion '{name}' needs numeric max_points")
+        if max_points <= 0:
+            fail(f"criterion '{name}' max_points must be positive")
+        rubric = item.get("rubric")
+        if not isinstance(rubric, dict) or not rubric:
+            fail(f"criterion '{name}' needs a non-empty rubric")
+        for points in rubric:
+            # YAML reads unquoted rubric keys like 40 as numbers
+            try:
+                value = float(points)
+            except (TypeError, ValueError):
+                fail(f"criterion '{name}' rubric level '{points}' is not a number")
+            if not 0 <= value <= max_points:
+                fail(f"criterion '{name}' rubric level {points} is outside 0-{max_points:g}")
+        try:
+            schema.add_criterion(GradingCriterion(
+                name=name,
+                description=str(item.get("description", "")),
+                max_points=max_points,
+                rubric={str(points): str(desc) for points, desc in rubric.items()}
+            ))
+        except ValueError as e:
+            fail(str(e))
+
+    try:
+        schema.validate()
+    except ValueError as e:
+        fail(str(e))
+    assignment_id = data.get("assignment_id")
+    return (str(assignment_id) if assignment_id is not None else None), schema
+
+def read_schema_file(path: str) -> Tuple[str, GradingSchema]:
+    """Load and validate one schema file; the assignment ID defaults to the file name."""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            data = json.load(f)
+        elif yaml is None:
+            raise SchemaError(f"{path}: PyYAML is required to load YAML schemas")
+        else:
+            data = yaml.safe_load(f)
+    assignment_id, schema = parse_schema(data, path)
+    if assignment_id is None:
+        assignment_id = os.path.splitext(os.path.basename(path))[0]
+    return assignment_id, schema
+
+class SchemaRegistry:
+    """
+    Parsed grading schemas, keyed by assignment and version.
+
+    Definitions are read from a directory of YAML/JSON files (one schema
+    per file) or registered directly, e.g. from rows of a database table.
+    Each is validated once when loaded. Lookups are plain dictionary reads
+    of an index that refresh() swaps in whole, so serving a schema never
+    touches the disk or takes a lock. Schemas are shared between requests
+    and must be treated as read-only.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Args:
+            directory: Folder of schema files (None = registered schemas only)
+        """
+        self.directory = directory
+        # (assignment_id, version) -> schema, and assignment_id -> latest version
+        self._index: Tuple[Dict[Tuple[str, str], GradingSchema], Dict[str, str]] = ({}, {})
+        self._files: Dict[str, Tuple[int, List[Tuple[str, GradingSchema]]]] = {}
+        self._registered: List[Tuple[str, GradingSchema]] = []
+        self._listeners: List[SchemaListener] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    def get(self, assignment_id: str, version: Optional[str] = None) -> Optional[GradingSchema]:
+        """The schema for an assignment, at a given version or the latest; None if unknown."""
+        schemas, latest = self._index
+        if version is None:
+            version = latest.get(assignment_id)
+        return schemas.get((assignment_id, version))
+
+    def available(self) -> Dict[str, List[str]]:
+        """Known versions of every assignment's schema."""
+        versions: Dict[str, List[str]] = {}
+        for assignment_id, version in self._index[0]:
+            versions.setdefault(assignment_id, []).append(version)
+        return {a: sorted(v, key=_version_key) for a, v in versions.items()}
+
+    def add_listener(self, listener: SchemaListener) -> None:
+        """Call listener whenever a schema is replaced, e.g. to drop cached grades."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def register(self, data: Dict, assignment_id: Optional[str] = None, source: str = "<memory>") -> GradingSchema:
+        """
+        Validate and add a definition that doesn't come from a file.
+
+        Args:
+            data: Parsed definition, as in a schema file
+            assignment_id: Assignment it applies to, unless data declares it
+            source: Where it came from, for error messages
+
+        Returns:
+            The registered schema
+        """
+        declared, schema = parse_schema(data, source)
+        assignment_id = declared or assignment_id
+        if assignment_id is None:
+            raise SchemaError(f"{source}: no assignment_id given")
+        with self._lock:
+            # Registering the same assignment and version again replaces it
+            self._registered = [
+                (registered_id, registered) for registered_id, registered in self._registered
+                if (registered_id, registered.version) != (assignment_id, schema.version)
+            ]
+            self._registered.append((assignment_id, schema))
+            self._rebuild()
+        return schema
+
+    def refresh(self) -> bool:
+        """
+        Reload schema files that changed since the last refresh.
+
+        A file that fails to load keeps serving its last valid schemas, so a
+        half-saved edit doesn't take an assignment offline.
+
+        Returns:
+            Whether any schema was added, changed or removed
+        """
+        if self.directory is None:
+            return False
+        try:
+            paths = sorted(
+                os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                if name.endswith(SCHEMA_EXTENSIONS)
+            )
+        except FileNotFoundError:
+            paths = []
+
+        with self._lock:
+            files = {}
+            changed = set(self._files) != set(paths)
+            for path in paths:
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                except FileNotFoundError:
+                    continue
+                previous = self._files.get(path)
+                if previous is not None and previous[0] == mtime:
+                    files[path] = previous
+                    continue
+                try:
+                    files[path] = (mtime, [read_schema_file(path)])
+                    logger.info("Loaded grading schema %s", path)
+                except (OSError, ValueError) as e:
+                    # ValueError covers SchemaError and malformed JSON/YAML
+                    logger.error("Could not load grading schema %s: %s", path, e)
+                    # Remember the mtime so the file is retried only once it changes again
+                    files[path] = (mtime, previous[1] if previous is not None else [])
+                    continue
+                changed = True
+            self._files = files
+            if changed:
+                self._rebuild()
+            return changed
+
+    def _rebuild(self) -> None:
+        """Swap in a new index built from files and registered schemas (lock held)."""
+        schemas: Dict[Tuple[str, str], GradingSchema] = {}
+        latest: Dict[str, str] = {}
+        entries = [entry for _, loaded in self._files.values() for entry in loaded]
+        for assignment_id, schema in entries + self._registered:
+            key = (assignment_id, schema.version)
+            if key in schemas and schemas[key] is not schema:
+                logger.warning(
+                    "Grading schema %s version %s is defined more than once; keeping the last",
+                    assignment_id, schema.version
+                )
+            schemas[key] = schema
+            if assignment_id not in latest or _version_key(schema.version) > _version_key(latest[assignment_id]):
+                latest[assignment_id] = schema.version
+        previous = self._index[0]
+        self._index = (schemas, latest)
+
+        for key, schema in schemas.items():
+            old = previous.get(key)
+            if old is None or old is schema:
+                continue
+            for listener in self._listeners:
+                try:
+                    listener(old, schema)
+                except Exception:
+                    logger.exception("Grading schema listener failed for %s version %s", *key)
+
+    def watch(self, interval: float = DEFAULT_RELOAD_INTERVAL) -> None:
+        """Reload changed files in a background thread every interval seconds."""
+        if self._watcher is not None or self.directory is None:
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh()
+                except Exception:
+                    logger.exception("Grading schema reload failed")
+
+        self._watcher = threading.Thread(target=loop, name="schema-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        """Stop the background reloader."""
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+# Created on first use, from GRADING_SCHEMA_DIR
+_default_registry: Optional[SchemaRegistry] = None
+_default_lock = threading.Lock()
+
+def default_registry() -> SchemaRegistry:
+    """
+    The process-wide registry, loading GRADING_SCHEMA_DIR (default
+    "schemas") and watching it for changes if the directory exists.
+    """
+    global _default_registry
+    if _default_registry is not None:
+        return _default_registry
+    with _default_lock:
+        if _default_registry is None:
+            registry = SchemaRegistry(os.getenv("GRADING_SCHEMA_DIR", "schemas"))
+            registry.refresh()
+            if os.path.isdir(registry.directory):
+                registry.watch(float(os.getenv("GRADING_SCHEMA_RELOAD_SECONDS", DEFAULT_RELOAD_INTERVAL)))
+            _default_registry = registry
+    return _default_registry
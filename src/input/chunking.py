@@ -0,0 +1,93 @@
+from typing import Callable, List, Optional
+import re
+from src.models.tokens import CHARS_PER_TOKEN, count_tokens
+
+# Fenced code blocks (notebook code cells) are kept whole where possible
+_CODE_BLOCK = re.compile(r"(```.*?```)", re.DOTALL)
+# Page breaks, markdown headings and blank lines delimit prose sections
+_SECTION_BREAK = re.compile(r"\f|\n(?=#{1,6} )|\n[ \t]*\n")
+
+def split_sections(text: str) -> List[str]:
+    """Split text into structural units: code cells, headed sections, paragraphs."""
+    sections = []
+    for part in _CODE_BLOCK.split(text):
+        if part.startswith("```"):
+            sections.append(part)
+        else:
+            sections.extend(s.strip() for s in _SECTION_BREAK.split(part) if s.strip())
+    return sections
+
+def _split_line(line: str, max_tokens: int, counter: Callable[[str], int]) -> List[str]:
+    """Cut a line into slices of at most max_tokens tokens."""
+    slices, start = [], 0
+    while start < len(line):
+        length = min(max_tokens * CHARS_PER_TOKEN, len(line) - start)
+        tokens = counter(line[start:start + length])
+        # Dense text has fewer characters per token; shrink until the slice fits
+        while tokens > max_tokens and length > 1:
+            length = max(1, min(length - 1, length * max_tokens // tokens))
+            tokens = counter(line[start:start + length])
+        slices.append(line[start:start + length])
+        start += length
+    return slices
+
+def _split_oversized(section: str, max_tokens: int, counter: Callable[[str], int]) -> List[str]:
+    """Break a section that alone exceeds the budget on lines, then characters."""
+    pieces, current = [], []
+    for line in section.split("\n"):
+        if counter(line) > max_tokens:
+            if current:
+                pieces.append("\n".join(current))
+                current = []
+            pieces.extend(_split_line(line, max_tokens, counter))
+            continue
+        if current and counter("\n".join(current + [line])) > max_tokens:
+            pieces.append("\n".join(current))
+            current = []
+        current.append(line)
+    if current:
+        pieces.append("\n".join(current))
+    return pieces
+
+def chunk_text(
+    text: str,
+    max_tokens: int,
+    counter: Optional[Callable[[str], int]] = None
+) -> List[str]:
+    """
+    Split a submission into chunks of at most max_tokens tokens.
+
+    Chunks follow section, cell and page boundaries; consecutive small
+    sections are packed together, and only sections that are too large on
+    their own are split further.
+
+    Args:
+        text: Submission text
+        max_tokens: Token budget per chunk
+        counter: Token counting function (defaults to count_tokens)
+
+    Returns:
+        Chunks in document order
+    """
+    counter = counter or count_tokens
+    chunks, current, current_tokens = [], [], 0
+
+    for section in split_sections(text):
+        tokens = counter(section)
+        if tokens > max_tokens:
+            parts = _split_oversized(section, max_tokens, counter)
+        else:
+            parts = [section]
+
+        for part in parts:
+            part_tokens = tokens if len(parts) == 1 else counter(part)
+            # Two tokens allow for the blank line joining sections
+            if current and current_tokens + part_tokens + 2 > max_tokens:
+                chunks.append("\n\n".join(current))
+                current, current_tokens = [], 0
+            current.append(part)
+            current_tokens += part_tokens + 2
+
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
@@ -0,0 +1,121 @@
+from typing import Dict, Optional
+import hashlib
+import sqlite3
+import threading
+import time
+import zipfile
+
+# Bump whenever extraction output changes so stale text is not reused
+EXTRACTOR_VERSION = "2"
+
+# Extractions kept on disk before the oldest are dropped
+DEFAULT_MAX_ENTRIES = 50_000
+
+# Bytes of a member hashed at a time
+HASH_BLOCK_SIZE = 1024 * 1024
+
+class ExtractionCache:
+    """
+    On-disk cache of extracted text for zip archive members.
+
+    Members are identified by the SHA-256 of their contents and their
+    extension, so an unchanged file is recognised whichever archive or
+    filename it arrives under. Hashing decompresses the member but is far
+    cheaper than parsing it. Past max_entries rows the oldest are dropped.
+    """
+
+    def __init__(self, path: str = ":memory:", max_entries: Optional[int] = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            path: SQLite database file
+            max_entries: Extractions kept (None = unbounded)
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "seconds_saved": 0.0, "evictions": 0}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS extracted_text (
+                key TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                parse_seconds REAL NOT NULL,
+                created_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_extracted_text_created "
+            "ON extracted_text (created_at)"
+        )
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM extracted_text").fetchone()[0]
+
+    @staticmethod
+    def member_key(
+        zip_ref: zipfile.ZipFile,
+        info: zipfile.ZipInfo,
+        max_chars: Optional[int] = None
+    ) -> str:
+        """Identify an archive member by a hash of its contents."""
+        digest = hashlib.sha256()
+        with zip_ref.open(info) as member:
+            for block in iter(lambda: member.read(HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+        ext = info.filename.rsplit(".", 1)[-1].lower()
+        budget = "" if max_chars is None else max_chars
+        return f"{EXTRACTOR_VERSION}:{digest.hexdigest()}:{ext}:{budget}"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached text for a member_key, or None if it must be parsed."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, parse_seconds FROM extracted_text WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+            self._stats["seconds_saved"] += row[1]
+            return row[0]
+
+    def set(self, key: str, text: str, parse_seconds: float) -> None:
+        """Store a member's text along with how long it took to parse."""
+        with self._lock:
+            row = (text, parse_seconds, time.time(), key)
+            cursor = self._conn.execute(
+                "UPDATE extracted_text SET text = ?, parse_seconds = ?, created_at = ? WHERE key = ?",
+                row
+            )
+            if cursor.rowcount == 0:
+                self._conn.execute(
+                    "INSERT INTO extracted_text (text, parse_seconds, created_at, key) VALUES (?, ?, ?, ?)",
+                    row
+                )
+                self._count += 1
+            if self.max_entries is not None and self._count > self.max_entries:
+                self._evict(self._count - self.max_entries)
+            self._conn.commit()
+
+    def _evict(self, count: int) -> None:
+        cursor = self._conn.execute(
+            "DELETE FROM extracted_text WHERE key IN ("
+            "SELECT key FROM extracted_text ORDER BY created_at LIMIT ?)",
+            (count,)
+        )
+        self._count -= cursor.rowcount
+        self._stats["evictions"] += cursor.rowcount
+
+    def clear(self) -> None:
+        """Remove every cached extraction."""
+        with self._lock:
+            self._conn.execute("DELETE FROM extracted_text")
+            self._conn.commit()
+            self._count = 0
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counts and the parsing time skipped thanks to hits."""
+        with self._lock:
+            return dict(self._stats)
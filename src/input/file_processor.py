@@ -1,9 +1,29 @@
 import os
-from typing import Dict, List, Union
-from docx import Document
-from pypdf import PdfReader
-import nbformat
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import multiprocessing
+import time
 import zipfile
+from src.input.extraction_cache import ExtractionCache
+
+# Extraction processes start from a clean interpreter instead of a fork:
+# forking a multi-threaded host (uvicorn, Streamlit) copies locks held by
+# its other threads, which can deadlock the child
+PROCESS_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# The format parsers (pypdf, python-docx, nbformat) are imported where they
+# are used, so processes that only see .txt files never load them
+
+def _extract_member_at(
+    zip_path: str,
+    file_name: str,
+    max_chars: Optional[int] = None
+) -> Tuple[str, float]:
+    """Process-pool entry point: extract one member from the archive on disk."""
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        return FileProcessor._timed_extract(zip_ref, file_name, max_chars)
 
 class FileProcessor:
     """Handles the processing of different file formats for grading."""
@@ -11,54 +31,234 @@ class FileProcessor:
     SUPPORTED_EXTENSIONS = {'.txt', '.pdf', '.docx', '.ipynb'}
     
     @staticmethod
-    def extract_from_zip(zip_path: str) -> Dict[str, str]:
+    def extract_from_zip(
+        zip_path: str,
+        max_workers: Optional[int] = None,
+        cache: Optional[ExtractionCache] = None,
+        max_chars: Optional[int] = None
+    ) -> Dict[str, str]:
         """
         Extract content from a zip file containing assignments.
         
         Args:
             zip_path: Path to the zip file
+            max_workers: Extraction processes (see iter_from_zip)
+            cache: Optional cache of previously extracted members
+            max_chars: Stop extracting each file after this many characters
             
         Returns:
-            Dictionary mapping filenames to their content
+            Dictionary mapping filenames to their content, in archive order
+        """
+        contents = dict(FileProcessor.iter_from_zip(
+            zip_path, max_workers, cache=cache, max_chars=max_chars
+        ))
+        
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            return {
+                file_name: contents[file_name]
+                for file_name in FileProcessor.list_submissions(zip_ref)
+            }
+    
+    @staticmethod
+    def iter_from_zip(
+        zip_path: str,
+        max_workers: Optional[int] = None,
+        on_error: Optional[Callable[[str, Exception], None]] = None,
+        cache: Optional[ExtractionCache] = None,
+        max_chars: Optional[int] = None
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        Extract a zip file lazily, yielding each member as soon as it is parsed.
+        
+        Parsing runs in a process pool because the PDF/DOCX parsers are
+        CPU-bound. At most two files per worker are in flight, so memory
+        use follows the pool size rather than the archive size.
+        
+        Args:
+            zip_path: Path to the zip file
+            max_workers: Extraction processes; None uses every core and 1
+                parses in the calling process
+            on_error: Called with (filename, exception) for files that fail
+                to parse; those files are skipped. Without it the error is
+                raised.
+            cache: Optional cache; members it already holds are not parsed
+            max_chars: Stop extracting each file after this many characters
+                
+        Yields:
+            (filename, text) tuples in completion order (cached ones first)
         """
-        contents = {}
+        to_parse: List[zipfile.ZipInfo] = []
+        keys: Dict[str, str] = {}
         
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            for file_name in zip_ref.namelist():
-                _, ext = os.path.splitext(file_name)
-                if ext not in FileProcessor.SUPPORTED_EXTENSIONS:
-                    continue
-                    
-                with zip_ref.open(file_name) as file:
-                    if ext == '.pdf':
-                        contents[file_name] = FileProcessor._process_pdf(file)
-                    elif ext == '.docx':
-                        contents[file_name] = FileProcessor._process_docx(file)
-                    elif ext == '.ipynb':
-                        contents[file_name] = FileProcessor._process_notebook(file)
-                    else:  # .txt
-                        contents[file_name] = file.read().decode('utf-8')
-                        
-        return contents
+            for file_name in FileProcessor.list_submissions(zip_ref):
+                info = zip_ref.getinfo(file_name)
+                text = None
+                if cache is not None:
+                    keys[file_name] = cache.member_key(zip_ref, info, max_chars)
+                    text = cache.get(keys[file_name])
+                if text is None:
+                    to_parse.append(info)
+                else:
+                    yield file_name, text
+            
+            if max_workers == 1 or len(to_parse) <= 1:
+                for info in to_parse:
+                    try:
+                        text, seconds = FileProcessor._timed_extract(
+                            zip_ref, info.filename, max_chars
+                        )
+                    except Exception as e:
+                        if on_error is None:
+                            raise
+                        on_error(info.filename, e)
+                        continue
+                    if cache is not None:
+                        cache.set(keys[info.filename], text, seconds)
+                    yield info.filename, text
+                return
+        
+        max_workers = min(max_workers or os.cpu_count() or 1, len(to_parse))
+        pending = iter(to_parse)
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context(PROCESS_START_METHOD)
+        ) as executor:
+            in_flight = {}
+            
+            def refill():
+                while len(in_flight) < max_workers * 2:
+                    info = next(pending, None)
+                    if info is None:
+                        return
+                    future = executor.submit(
+                        _extract_member_at, zip_path, info.filename, max_chars
+                    )
+                    in_flight[future] = info
+            
+            refill()
+            try:
+                while in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        info = in_flight.pop(future)
+                        try:
+                            text, seconds = future.result()
+                        except Exception as e:
+                            if on_error is None:
+                                raise
+                            on_error(info.filename, e)
+                            continue
+                        if cache is not None:
+                            cache.set(keys[info.filename], text, seconds)
+                        yield info.filename, text
+                    refill()
+            finally:
+                for future in in_flight:
+                    future.cancel()
+    
+    @staticmethod
+    def list_submissions(zip_ref: zipfile.ZipFile) -> List[str]:
+        """Return the archive members with a supported extension, in archive order."""
+        return [
+            file_name for file_name in zip_ref.namelist()
+            if os.path.splitext(file_name)[1] in FileProcessor.SUPPORTED_EXTENSIONS
+        ]
     
     @staticmethod
-    def _process_pdf(file) -> str:
-        """Extract text from PDF file."""
+    def extract_member(
+        zip_ref: zipfile.ZipFile,
+        file_name: str,
+        max_chars: Optional[int] = None
+    ) -> str:
+        """
+        Extract the text of a single archive member.
+        
+        Args:
+            zip_ref: Open zip archive
+            file_name: Name of a member with a supported extension
+            max_chars: Truncate the text to this many characters; PDFs stop
+                parsing pages once the budget is reached
+            
+        Returns:
+            Extracted text content
+        """
+        _, ext = os.path.splitext(file_name)
+        with zip_ref.open(file_name) as file:
+            if ext == '.pdf':
+                return FileProcessor._process_pdf(file, max_chars=max_chars)
+            elif ext == '.docx':
+                text = FileProcessor._process_docx(file)
+            elif ext == '.ipynb':
+                text = FileProcessor._process_notebook(file)
+            else:  # .txt
+                text = file.read().decode('utf-8')
+        return text[:max_chars] if max_chars is not None else text
+    
+    @staticmethod
+    def _timed_extract(
+        zip_ref: zipfile.ZipFile,
+        file_name: str,
+        max_chars: Optional[int] = None
+    ) -> Tuple[str, float]:
+        """Extract a member and report how many seconds parsing took."""
+        started = time.perf_counter()
+        text = FileProcessor.extract_member(zip_ref, file_name, max_chars)
+        return text, time.perf_counter() - started
+    
+    @staticmethod
+    def _process_pdf(
+        file,
+        max_pages: Optional[int] = None,
+        max_chars: Optional[int] = None
+    ) -> str:
+        """
+        Extract text from PDF file.
+        
+        Pages are read lazily and extraction stops as soon as max_pages or
+        max_chars is reached, so long documents are only parsed as far as
+        the grading context can use.
+        """
+        parts = []
+        length = 0
+        for page_text in FileProcessor.iter_pdf_pages(file, stop=max_pages):
+            parts.append(page_text + "\n")
+            length += len(parts[-1])
+            if max_chars is not None and length >= max_chars:
+                break
+        # Joined once, and only sliced when over budget, to copy the text
+        # as few times as possible
+        text = "".join(parts)
+        return text[:max_chars] if max_chars is not None and length > max_chars else text
+    
+    @staticmethod
+    def iter_pdf_pages(file, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+        """
+        Yield the text of each PDF page in [start, stop) one page at a time.
+        
+        Args:
+            file: Path or binary file object of the PDF
+            start: Index of the first page
+            stop: Index after the last page (None = end of document)
+        """
+        from pypdf import PdfReader
         reader = PdfReader(file)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-        return text
+        num_pages = len(reader.pages)
+        stop = num_pages if stop is None else min(stop, num_pages)
+        for index in range(start, stop):
+            yield reader.pages[index].extract_text()
     
     @staticmethod
     def _process_docx(file) -> str:
         """Extract text from DOCX file."""
+        from docx import Document
         doc = Document(file)
         return "\n".join([paragraph.text for paragraph in doc.paragraphs])
     
     @staticmethod
     def _process_notebook(file) -> str:
         """Extract text and code from Jupyter notebook."""
+        import nbformat
         nb = nbformat.read(file, as_version=4)
         content = []
         
@@ -0,0 +1,91 @@
+from typing import Dict, List, Tuple
+from collections import Counter
+from functools import lru_cache
+import math
+import re
+from src.grading.criteria import GradingCriterion
+from src.input.chunking import chunk_text
+
+# Default token size of indexed passages
+DEFAULT_PASSAGE_TOKENS = 300
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the
+this to was were will with not no shown
+""".split())
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with common stopwords removed."""
+    return [w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS]
+
+def criterion_query(criterion: GradingCriterion) -> str:
+    """Text describing what a criterion looks for, used as a search query."""
+    return " ".join([criterion.name, criterion.description, *criterion.rubric.values()])
+
+class SubmissionIndex:
+    """
+    BM25 index over the passages of a single submission.
+
+    Purely lexical, so it works offline with no model downloads.
+    """
+
+    def __init__(self, passages: List[str], k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            passages: Passages in document order
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalisation
+        """
+        self.passages = passages
+        self.k1 = k1
+        self.b = b
+        self._term_counts = [Counter(tokenize(p)) for p in passages]
+        self._lengths = [sum(c.values()) for c in self._term_counts]
+        self._avg_length = sum(self._lengths) / len(passages) if passages else 0.0
+
+        document_frequency: Counter = Counter()
+        for counts in self._term_counts:
+            document_frequency.update(counts.keys())
+        n = len(passages)
+        self._idf: Dict[str, float] = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+
+    @classmethod
+    def from_text(cls, text: str, passage_tokens: int = DEFAULT_PASSAGE_TOKENS) -> "SubmissionIndex":
+        """Split a submission into passages along its structure and index them."""
+        return cls(chunk_text(text, passage_tokens))
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[int, float]]:
+        """
+        Rank passages against a query.
+
+        Returns:
+            Up to k (passage index, score) pairs, best first
+        """
+        # Terms repeated in the query (e.g. across rubric levels) weigh more
+        terms = Counter(t for t in tokenize(query) if t in self._idf)
+        scores = []
+        for i, counts in enumerate(self._term_counts):
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[i] / (self._avg_length or 1))
+            score = 0.0
+            for term, query_tf in terms.items():
+                tf = counts.get(term)
+                if tf:
+                    score += query_tf * self._idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            if score > 0:
+                scores.append((i, score))
+        scores.sort(key=lambda item: (-item[1], item[0]))
+        return scores[:k]
+
+    def top_passages(self, query: str, k: int = 5) -> List[str]:
+        """The k best-matching passages, returned in document order."""
+        hits = sorted(i for i, _ in self.search(query, k))
+        return [self.passages[i] for i in hits]
+
+@lru_cache(maxsize=64)
+def index_for(text: str, passage_tokens: int = DEFAULT_PASSAGE_TOKENS) -> SubmissionIndex:
+    """Build (or reuse) the index of a submission shared by all criteria and models."""
+    return SubmissionIndex.from_text(text, passage_tokens)
@@ -1,30 +1,320 @@
-from typing import Dict, List, Optional
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import PydanticOutputParser
-from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import lru_cache
+import contextvars
+from pydantic import BaseModel, Field, ValidationError
 import os
+import time
+import logging
+import threading
 from src.grading.criteria import GradingCriterion, GradingSchema
+from src.models.cache import GradingCache, make_cache_key
+from src.models.tokens import MODEL_PRICING, UsageLedger, UsageRecord, count_tokens, estimate_cost
+from src.models.resilience import Resilience
+from src.models.streaming import token_stream
+from src.models.prompts import (
+    BATCH_PROMPT_VERSION, PROMPT_VERSION, PromptCompiler, shared_compiler
+)
+from src.models.rate_limit import (
+    DEFAULT_BACKOFF_SECONDS, EXPECTED_COMPLETION_TOKENS, RateLimiter, is_rate_limit_error,
+    retry_after_seconds
+)
+from src.input.chunking import chunk_text
+from src.input.retrieval import DEFAULT_PASSAGE_TOKENS, criterion_query, index_for
+
+logger = logging.getLogger(__name__)
+
+# Default cap on model calls a ConsensusGrader keeps in flight at once
+DEFAULT_MAX_IN_FLIGHT = 8
+
+# Seconds between checks on model calls still queued for a worker; their
+# timeout only starts once a worker picks them up
+QUEUED_CALL_POLL_SECONDS = 0.05
+
+# Default token size of the chunks long submissions are split into
+DEFAULT_CHUNK_TOKENS = 3000
+
+# Adaptive consensus defaults: confidence at which one model's answer is
+# trusted alone, and the share of a rubric band around its edges counted
+# as ambiguous
+DEFAULT_STOP_CONFIDENCE = 0.85
+DEFAULT_AMBIGUITY_MARGIN = 0.25
 
 class GradingResult(BaseModel):
     points: float = Field(description="Points awarded for this criterion")
     explanation: str = Field(description="Detailed explanation for the points awarded")
     confidence: float = Field(description="Confidence score between 0 and 1")
 
+class CriterionGrade(GradingResult):
+    criterion_name: str = Field(description="Name of the criterion being graded")
+
+class ConsensusResult(GradingResult):
+    model_points: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Points each model that answered awarded, by model name"
+    )
+
+class BatchGradingResult(BaseModel):
+    grades: List[CriterionGrade] = Field(description="One grade per criterion")
+
+@lru_cache(maxsize=None)
+def output_parser_for(pydantic_object: type):
+    """Shared parser for a reply model; langchain is imported on first use."""
+    from langchain_core.output_parsers import PydanticOutputParser
+    return PydanticOutputParser(pydantic_object=pydantic_object)
+
+def submit_timed(executor: ThreadPoolExecutor, call) -> Tuple[Future, List[float]]:
+    """
+    Submit call() in the caller's context, noting when a worker starts it.
+
+    Returns:
+        The future, and a list receiving the start time; pass both to
+        result_within
+    """
+    started: List[float] = []
+
+    def run():
+        started.append(time.monotonic())
+        return call()
+
+    # Carry the caller's request priority into the worker thread
+    return executor.submit(contextvars.copy_context().run, run), started
+
+def result_within(future: Future, started: List[float], timeout: Optional[float]):
+    """
+    The result of a call from submit_timed, waiting at most timeout seconds
+    counted from when the call started rather than from now, so calls
+    queued behind others are not timed out before they are sent.
+
+    Raises:
+        TimeoutError: If the call runs longer than timeout
+    """
+    if timeout is None:
+        return future.result()
+    while not started and not future.done():
+        wait([future], timeout=QUEUED_CALL_POLL_SECONDS)
+    if not started:
+        return future.result()
+    return future.result(timeout=max(0.0, started[0] + timeout - time.monotonic()))
+
 class AIGrader:
     """Handles the AI-based grading using multiple LLM models."""
     
-    def __init__(self, model_name: str = "gpt-4", temperature: float = 0.0):
-        self.llm = ChatOpenAI(
-            model_name=model_name,
-            temperature=temperature
+    def __init__(
+        self,
+        model_name: str = "gpt-4",
+        temperature: float = 0.0,
+        timeout: Optional[float] = None,
+        llm=None,
+        cache: Optional[GradingCache] = None,
+        max_submission_tokens: Optional[int] = None,
+        chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+        max_chunk_workers: int = 4,
+        usage: Optional[UsageLedger] = None,
+        retrieval_top_k: Optional[int] = None,
+        passage_tokens: int = DEFAULT_PASSAGE_TOKENS,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_rate_limit_retries: int = 3,
+        resilience: Optional[Resilience] = None,
+        prompt_compiler: Optional[PromptCompiler] = None,
+        api_key: Optional[str] = None,
+        http_client=None
+    ):
+        """
+        Args:
+            model_name: Name of the OpenAI chat model
+            temperature: Sampling temperature
+            timeout: Seconds to wait for this model before giving up on it
+            llm: Pre-built chat model to use instead of creating a ChatOpenAI
+            cache: Optional result cache consulted before calling the model
+            max_submission_tokens: Submissions longer than this are graded
+                with map-reduce over chunks (None = always in one prompt)
+            chunk_tokens: Token budget of each chunk in map-reduce mode
+            max_chunk_workers: Chunks analysed at the same time
+            usage: Ledger recording token usage and cost of every call
+            retrieval_top_k: When set, only the k passages most relevant to
+                each criterion are sent instead of the whole submission
+            passage_tokens: Token size of the passages used for retrieval
+            rate_limiter: Limiter pacing calls to this model, usually the
+                shared one from rate_limiter_for(model_name)
+            max_rate_limit_retries: Times a call rejected with 429 is retried
+                after backing off
+            resilience: Retries, hedging and circuit breaking applied to
+                each model call and the parsing of its answer
+            prompt_compiler: Cache of compiled prompt prefixes (defaults to
+                the process-wide one)
+            api_key: OpenAI API key (defaults to OPENAI_API_KEY)
+            http_client: httpx.Client to send requests through, so graders
+                can share one pool of keep-alive connections
+        
+        Each failure is retried by one layer only: this grader retries 429s,
+        resilience retries transport errors, timeouts and 5xx answers, and
+        the OpenAI client's own retries are turned off. A call therefore
+        sends at most resilience.retry.max_attempts *
+        (max_rate_limit_retries + 1) requests, twice that if it is hedged.
+        Without resilience, transient errors are not retried.
+        """
+        self.model_name = model_name
+        self.temperature = temperature
+        self.timeout = timeout
+        self.cache = cache
+        self.max_submission_tokens = max_submission_tokens
+        self.chunk_tokens = chunk_tokens
+        self.max_chunk_workers = max_chunk_workers
+        self.usage = usage if usage is not None else UsageLedger()
+        self.retrieval_top_k = retrieval_top_k
+        self.passage_tokens = passage_tokens
+        self.rate_limiter = rate_limiter
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.resilience = resilience
+        self.prompt_compiler = prompt_compiler if prompt_compiler is not None else shared_compiler()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._llm = llm
+        self._api_key = api_key
+        self._http_client = http_client
+        self._llm_lock = threading.Lock()
+        
+    @property
+    def llm(self):
+        """The chat model, created on first use so building graders stays cheap."""
+        if self._llm is None:
+            with self._llm_lock:
+                if self._llm is None:
+                    # langchain_openai takes seconds to import; load it only when needed
+                    from langchain_openai import ChatOpenAI
+                    self._llm = ChatOpenAI(
+                        model_name=self.model_name,
+                        temperature=self.temperature,
+                        request_timeout=self.timeout,
+                        # Retries are made by _invoke_paced and resilience instead
+                        max_retries=0,
+                        api_key=self._api_key,
+                        http_client=self._http_client
+                    )
+        return self._llm
+        
+    @llm.setter
+    def llm(self, llm) -> None:
+        self._llm = llm
+        
+    def preload(self) -> None:
+        """Import the model backend and build the client now instead of on the first call."""
+        self.llm
+        self.output_parser
+        self.batch_output_parser
+        
+    @property
+    def output_parser(self):
+        return output_parser_for(GradingResult)
+        
+    @property
+    def batch_output_parser(self):
+        return output_parser_for(BatchGradingResult)
+        
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Worker pool used to analyse chunks of long submissions."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_chunk_workers,
+                    thread_name_prefix=f"chunks-{self.model_name}"
+                )
+        return self._executor
+        
+    def close(self) -> None:
+        """Shut down the chunk and hedging pools; later calls start new ones."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+        if self.resilience is not None:
+            self.resilience.close()
+        
+    def _invoke(self, messages, kind: str):
+        """Call the model and record the call's token usage and cost."""
+        estimated_prompt_tokens = sum(count_tokens(m.content, self.model_name) for m in messages)
+        response = self._invoke_paced(messages, estimated_prompt_tokens)
+        
+        usage = getattr(response, "usage_metadata", None) or {}
+        prompt_tokens = usage.get("input_tokens") or estimated_prompt_tokens
+        completion_tokens = usage.get("output_tokens") or count_tokens(
+            response.content, self.model_name
         )
-        self.output_parser = PydanticOutputParser(pydantic_object=GradingResult)
+        if self.rate_limiter is not None:
+            self.rate_limiter.reconcile(
+                estimated_prompt_tokens + EXPECTED_COMPLETION_TOKENS,
+                prompt_tokens + completion_tokens
+            )
+        self.usage.record(UsageRecord(
+            model_name=self.model_name,
+            kind=kind,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cost=estimate_cost(self.model_name, prompt_tokens, completion_tokens),
+            cached_prompt_tokens=(usage.get("input_token_details") or {}).get("cache_read", 0)
+        ))
+        return response
+        
+    def _call(self, kind: str, fn):
+        """Run a model call (and its parsing) through the resilience layer, if any."""
+        if self.resilience is None:
+            return fn()
+        return self.resilience.call(kind, fn)
+        
+    def _invoke_paced(self, messages, estimated_prompt_tokens: int):
+        """Call the model once the rate limiter allows, backing off on 429s."""
+        for attempt in range(self.max_rate_limit_retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(estimated_prompt_tokens + EXPECTED_COMPLETION_TOKENS)
+            try:
+                return self._send(messages)
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == self.max_rate_limit_retries:
+                    raise
+                logger.warning("%s rate limited; backing off", self.model_name)
+                if self.rate_limiter is not None:
+                    self.rate_limiter.throttled(retry_after_seconds(e))
+                else:
+                    time.sleep(retry_after_seconds(e) or DEFAULT_BACKOFF_SECONDS)
+        
+    def _send(self, messages):
+        """Invoke the model, streaming its answer to the token listener if one is set."""
+        with token_stream(self.model_name) as emit:
+            if emit is None or not hasattr(self.llm, "stream"):
+                return self.llm.invoke(messages)
+                
+            response = None
+            for chunk in self.llm.stream(messages):
+                if chunk.content:
+                    emit(chunk.content)
+                # Adding chunks concatenates content and merges usage metadata
+                response = chunk if response is None else response + chunk
+        if response is None:
+            raise ValueError(f"{self.model_name} streamed an empty answer")
+        return response
+        
+    def _exceeds_budget(self, submission_text: str) -> bool:
+        """Whether a submission is too long to send in a single prompt."""
+        if self.max_submission_tokens is None:
+            return False
+        return self._over_budget(submission_text, self.max_submission_tokens)
+        
+    def _over_budget(self, text: str, budget: int) -> bool:
+        """Whether text has more than budget tokens."""
+        # Every token spans at least one UTF-8 byte, so text with no more
+        # bytes than the budget fits without tokenizing it; counting
+        # characters instead would miss dense text such as CJK or emoji
+        if len(text.encode("utf-8")) <= budget:
+            return False
+        return count_tokens(text, self.model_name) > budget
         
     def grade_submission(
         self,
         submission_text: str,
         criterion: GradingCriterion,
+        use_cache: bool = True
     ) -> GradingResult:
         """
         Grade a single submission against a specific criterion.
@@ -32,76 +322,405 @@ class AIGrader:
         Args:
             submission_text: The text content to grade
             criterion: The grading criterion to apply
+            use_cache: Set to False to always ask the model, e.g. when
+                measuring how consistent repeated gradings are
             
         Returns:
             GradingResult containing points, explanation, and confidence
         """
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are an expert grader. Grade the following submission according 
-            to the provided criterion. Be objective and thorough in your assessment."""),
-            ("user", """
-            Criterion: {criterion_name}
-            Description: {criterion_description}
-            Maximum Points: {max_points}
-            
-            Rubric:
-            {rubric}
+        if self.cache is None or not use_cache:
+            return self._grade_single(submission_text, criterion)
             
-            Submission:
-            {submission}
+        key = self._cache_key(self.prompt_version, criterion, submission_text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return GradingResult(**cached)
             
-            Grade this submission and provide:
-            1. Points awarded (between 0 and {max_points})
-            2. Detailed explanation
-            3. Confidence score (between 0 and 1)
-            
-            {format_instructions}
-            """)
-        ])
+        result = self._grade_single(submission_text, criterion)
+        self.cache.set(key, result.model_dump(), criterion)
+        return result
+        
+    @property
+    def prompt_version(self) -> str:
+        """Version of what a single-criterion call sends, for cache keys."""
+        if self.retrieval_top_k is None:
+            return PROMPT_VERSION
+        return f"{PROMPT_VERSION}+rag{self.retrieval_top_k}x{self.passage_tokens}"
+        
+    def _cache_key(
+        self,
+        prompt_version: str,
+        criterion: GradingCriterion,
+        submission_text: str
+    ) -> str:
+        return make_cache_key(
+            self.model_name,
+            self.temperature,
+            prompt_version,
+            criterion,
+            submission_text
+        )
+        
+    def _grade_single(
+        self,
+        submission_text: str,
+        criterion: GradingCriterion
+    ) -> GradingResult:
+        """Call the model for one criterion, bypassing the cache."""
+        if self._use_retrieval(submission_text):
+            return self._grade_text(
+                self._retrieve(submission_text, criterion),
+                criterion,
+                kind="retrieval"
+            )
+        if self._exceeds_budget(submission_text):
+            return self._grade_map_reduce(submission_text, criterion)
+        return self._grade_text(submission_text, criterion)
+        
+    def _use_retrieval(self, submission_text: str) -> bool:
+        """Retrieval only pays off when the submission outgrows the passages sent."""
+        if self.retrieval_top_k is None:
+            return False
+        return self._over_budget(submission_text, self.retrieval_top_k * self.passage_tokens)
+        
+    def _retrieve(self, submission_text: str, criterion: GradingCriterion) -> str:
+        """Select the submission passages most relevant to a criterion."""
+        index = index_for(submission_text, self.passage_tokens)
+        passages = index.top_passages(criterion_query(criterion), self.retrieval_top_k)
+        if not passages:
+            passages = index.passages[:self.retrieval_top_k]
+        excerpts = "\n\n[...]\n\n".join(passages)
+        return (
+            f"(Excerpts of the submission most relevant to this criterion, "
+            f"{len(passages)} of {len(index.passages)} passages, in order.)\n\n{excerpts}"
+        )
+        
+    def _grade_map_reduce(
+        self,
+        submission_text: str,
+        criterion: GradingCriterion
+    ) -> GradingResult:
+        """
+        Grade a long submission by summarising evidence per chunk, then
+        grading the combined evidence in a single final call.
+        """
+        chunks = chunk_text(
+            submission_text,
+            self.chunk_tokens,
+            lambda text: count_tokens(text, self.model_name)
+        )
+        futures = [
+            self.executor.submit(
+                contextvars.copy_context().run,
+                self._summarise_chunk, chunk, i + 1, len(chunks), criterion
+            )
+            for i, chunk in enumerate(chunks)
+        ]
+        notes = "\n\n".join(
+            f"Part {i + 1} of {len(chunks)}:\n{future.result()}"
+            for i, future in enumerate(futures)
+        )
+        evidence = (
+            "The submission was too long to grade in one pass. Below are evidence "
+            f"notes taken from each of its {len(chunks)} parts, in order.\n\n{notes}"
+        )
+        return self._grade_text(evidence, criterion, kind="reduce")
+        
+    def _summarise_chunk(
+        self,
+        chunk: str,
+        index: int,
+        total: int,
+        criterion: GradingCriterion
+    ) -> str:
+        """Map step: extract the evidence in one chunk relevant to a criterion."""
+        compiled = self.prompt_compiler.map(criterion, self.model_name)
+        formatted_prompt = compiled.render(f"Submission part {index} of {total}:\n{chunk}")
         
-        rubric_text = "\n".join([f"- {points}: {desc}" 
-                                for points, desc in criterion.rubric.items()])
+        return self._call("map", lambda: self._invoke(formatted_prompt, kind="map").content)
         
-        formatted_prompt = prompt.format_messages(
-            criterion_name=criterion.name,
-            criterion_description=criterion.description,
-            max_points=criterion.max_points,
-            rubric=rubric_text,
-            submission=submission_text,
-            format_instructions=self.output_parser.get_format_instructions()
+    def _grade_text(
+        self,
+        submission_text: str,
+        criterion: GradingCriterion,
+        kind: str = "single"
+    ) -> GradingResult:
+        """Grade text that fits in one prompt."""
+        compiled = self.prompt_compiler.single(criterion, self.output_parser, self.model_name)
+        formatted_prompt = compiled.render(submission_text)
+        
+        return self._call(
+            kind,
+            lambda: self.output_parser.parse(self._invoke(formatted_prompt, kind).content)
         )
         
-        response = self.llm.invoke(formatted_prompt)
-        return self.output_parser.parse(response.content)
+    def grade_criteria(
+        self,
+        submission_text: str,
+        criteria: List[GradingCriterion],
+        max_batch_attempts: int = 2,
+        use_cache: bool = True
+    ) -> List[GradingResult]:
+        """
+        Grade a submission against several criteria in a single request.
+        
+        Criteria whose grade is missing or malformed in the reply are sent
+        again as a smaller batch; whatever still fails after
+        max_batch_attempts is graded one criterion at a time. Submissions
+        long enough for retrieval or map-reduce skip batching, since each
+        criterion then needs its own view of the text.
+        
+        Args:
+            submission_text: The text content to grade
+            criteria: The grading criteria to apply
+            max_batch_attempts: Batched requests to try before splitting
+            use_cache: Set to False to always ask the model (see
+                grade_submission)
+            
+        Returns:
+            One GradingResult per criterion, in the order given
+        """
+        results: Dict[str, GradingResult] = {}
+        pending = list(criteria)
+        cache = self.cache if use_cache else None
+        
+        if cache is not None:
+            for criterion in criteria:
+                key = self._cache_key(BATCH_PROMPT_VERSION, criterion, submission_text)
+                cached = cache.get(key)
+                if cached is not None:
+                    results[criterion.name] = GradingResult(**cached)
+            pending = [c for c in pending if c.name not in results]
+        
+        if self._use_retrieval(submission_text) or self._exceeds_budget(submission_text):
+            max_batch_attempts = 0
+        
+        for _ in range(max_batch_attempts):
+            if len(pending) <= 1:
+                break
+            graded = self._grade_batch(submission_text, pending)
+            if cache is not None:
+                for criterion in pending:
+                    if criterion.name in graded:
+                        cache.set(
+                            self._cache_key(BATCH_PROMPT_VERSION, criterion, submission_text),
+                            graded[criterion.name].model_dump(),
+                            criterion
+                        )
+            results.update(graded)
+            pending = [c for c in pending if c.name not in results]
+            
+        for criterion in pending:
+            results[criterion.name] = self.grade_submission(submission_text, criterion, use_cache)
+            
+        return [results[criterion.name] for criterion in criteria]
+        
+    def _grade_batch(
+        self,
+        submission_text: str,
+        criteria: List[GradingCriterion]
+    ) -> Dict[str, GradingResult]:
+        """Send one batched request and return the grades that parsed cleanly."""
+        compiled = self.prompt_compiler.batch(criteria, self.batch_output_parser, self.model_name)
+        formatted_prompt = compiled.render(submission_text)
+        
+        response = self._call("batch", lambda: self._invoke(formatted_prompt, kind="batch"))
+        from langchain_core.exceptions import OutputParserException
+        from langchain_core.utils.json import parse_json_markdown
+        try:
+            parsed = parse_json_markdown(response.content)
+        except (OutputParserException, ValueError):
+            logger.warning("Model %s returned an unparseable batch", self.model_name)
+            return {}
+            
+        # Validate each entry on its own so one bad grade doesn't void the rest
+        wanted = {c.name for c in criteria}
+        grades: Dict[str, GradingResult] = {}
+        entries = parsed.get("grades", []) if isinstance(parsed, dict) else []
+        for entry in entries:
+            try:
+                grade = CriterionGrade.model_validate(entry)
+            except ValidationError:
+                continue
+            if grade.criterion_name in wanted:
+                grades[grade.criterion_name] = GradingResult(
+                    points=grade.points,
+                    explanation=grade.explanation,
+                    confidence=grade.confidence
+                )
+        return grades
 
 class ConsensusGrader:
     """Manages multiple AI models and determines consensus grades."""
     
-    def __init__(self, models: List[AIGrader]):
+    def __init__(
+        self,
+        models: List[AIGrader],
+        max_in_flight: Optional[int] = None,
+        quorum: Optional[int] = None,
+        quorum_grace: float = 0.0
+    ):
+        """
+        Args:
+            models: Graders whose answers are combined
+            max_in_flight: Maximum number of model calls running at once
+            quorum: Answers after which stragglers are no longer awaited
+                (None = wait for every model up to its timeout)
+            quorum_grace: Seconds stragglers still get once quorum is reached
+            
+        Raises:
+            ValueError: If two models share a name, since answers are
+                reported per model name
+        """
+        names = [model.model_name for model in models]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Consensus models must have distinct names: {', '.join(duplicates)}")
         self.models = models
+        self.max_in_flight = max_in_flight or DEFAULT_MAX_IN_FLIGHT
+        self.quorum = quorum
+        self.quorum_grace = quorum_grace
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
         
-    def grade_with_consensus(
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Shared worker pool used to fan out model calls."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_in_flight,
+                    thread_name_prefix="consensus"
+                )
+        return self._executor
+        
+    def close(self) -> None:
+        """Shut down the fan-out pool and those of every model."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+        for model in self.models:
+            model.close()
+        
+    def _fan_out(self, call, label: str) -> list:
+        """
+        Run call(model) for every model at once and wait for the answers.
+        
+        Each model's timeout is counted from the moment a worker starts its
+        call, so calls queued behind max_in_flight are not timed out before
+        they are sent, and the wait is bounded by the slowest model rather
+        than the sum. Once quorum models have answered, the rest get
+        quorum_grace more seconds. A model that fails counts as no answer.
+        A call that runs out of time is abandoned but keeps its worker until
+        the model's request timeout ends it.
+        
+        Returns:
+            One entry per model, in model order; None for models that timed
+            out, failed or were not awaited
+        """
+        starts: Dict[int, float] = {}
+        
+        def run(i: int, model: AIGrader):
+            starts[i] = time.monotonic()
+            return call(model)
+            
+        # Carry the caller's request priority into the worker threads
+        futures = [
+            self.executor.submit(contextvars.copy_context().run, run, i, model)
+            for i, model in enumerate(self.models)
+        ]
+        index = {future: i for i, future in enumerate(futures)}
+        cutoff = float("inf")
+        
+        def deadline(future) -> float:
+            i = index[future]
+            timeout = self.models[i].timeout
+            if timeout is None or i not in starts:
+                return cutoff
+            return min(starts[i] + timeout, cutoff)
+            
+        results = [None] * len(futures)
+        answered = 0
+        pending = set(futures)
+        while pending:
+            nearest = min(deadline(future) for future in pending)
+            timeout = None if nearest == float("inf") else max(0.0, nearest - time.monotonic())
+            if any(index[f] not in starts and self.models[index[f]].timeout is not None for f in pending):
+                # Look again soon so a call's timeout starts when it does
+                timeout = QUEUED_CALL_POLL_SECONDS if timeout is None else min(timeout, QUEUED_CALL_POLL_SECONDS)
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            
+            for future in done:
+                i = index[future]
+                try:
+                    results[i] = future.result()
+                    answered += 1
+                except Exception as e:
+                    logger.warning(
+                        "Model %s failed grading %s: %s", self.models[i].model_name, label, e
+                    )
+                    
+            if self.quorum is not None and answered >= self.quorum:
+                cutoff = min(cutoff, time.monotonic() + self.quorum_grace)
+                
+            now = time.monotonic()
+            for future in [f for f in pending if deadline(f) <= now]:
+                # Only frees the worker if the call is still queued
+                future.cancel()
+                pending.discard(future)
+                logger.warning(
+                    "Model %s did not answer in time grading %s",
+                    self.models[index[future]].model_name,
+                    label
+                )
+                
+        return results
+        
+    def collect_results(
         self,
         submission_text: str,
-        criterion: GradingCriterion,
-        min_confidence: float = 0.7
-    ) -> Optional[GradingResult]:
+        criterion: GradingCriterion
+    ) -> List[Optional[GradingResult]]:
         """
-        Grade submission using multiple models and determine consensus.
+        Send the criterion to every model at once and wait for the answers.
         
         Args:
             submission_text: Text to grade
             criterion: Grading criterion to apply
+            
+        Returns:
+            One entry per model, in model order; None for models that timed out
+        """
+        return self._fan_out(
+            lambda model: model.grade_submission(submission_text, criterion),
+            f"criterion {criterion.name!r}"
+        )
+        
+    def combine_results(
+        self,
+        results: List[Optional[GradingResult]],
+        min_confidence: float = 0.7
+    ) -> Optional[GradingResult]:
+        """
+        Combine per-model results into a single consensus grade.
+        
+        Args:
+            results: Per-model results; None entries are ignored
             min_confidence: Minimum confidence threshold
             
         Returns:
             Consensus GradingResult or None if no consensus reached
         """
-        results = []
-        for model in self.models:
-            result = model.grade_submission(submission_text, criterion)
-            if result.confidence >= min_confidence:
-                results.append(result)
+        # Results are in model order; keep every answer for bias analysis
+        model_points = {
+            model.model_name: r.points
+            for model, r in zip(self.models, results) if r is not None
+        }
+        results = [
+            r for r in results
+            if r is not None and r.confidence >= min_confidence
+        ]
                 
         if not results:
             return None
@@ -119,8 +738,268 @@ class ConsensusGrader:
         # Calculate overall confidence
         avg_confidence = sum(r.confidence for r in results) / len(results)
         
-        return GradingResult(
+        return ConsensusResult(
             points=round(weighted_points, 2),
             explanation=combined_explanation,
-            confidence=avg_confidence
-        ) 
\ No newline at end of file
+            confidence=avg_confidence,
+            model_points=model_points
+        )
+        
+    def grade_with_consensus(
+        self,
+        submission_text: str,
+        criterion: GradingCriterion,
+        min_confidence: float = 0.7
+    ) -> Optional[GradingResult]:
+        """
+        Grade submission using multiple models and determine consensus.
+        
+        All models are queried concurrently; see collect_results.
+        
+        Args:
+            submission_text: Text to grade
+            criterion: Grading criterion to apply
+            min_confidence: Minimum confidence threshold
+            
+        Returns:
+            Consensus GradingResult or None if no consensus reached
+        """
+        results = self.collect_results(submission_text, criterion)
+        return self.combine_results(results, min_confidence)
+        
+    def grade_criteria_with_consensus(
+        self,
+        submission_text: str,
+        criteria: List[GradingCriterion],
+        min_confidence: float = 0.7
+    ) -> List[Optional[GradingResult]]:
+        """
+        Grade all criteria with one batched request per model.
+        
+        Args:
+            submission_text: Text to grade
+            criteria: Grading criteria to apply
+            min_confidence: Minimum confidence threshold
+            
+        Returns:
+            Consensus result (or None) per criterion, in the order given
+        """
+        per_model = self._fan_out(
+            lambda model: model.grade_criteria(submission_text, criteria),
+            f"{len(criteria)} batched criteria"
+        )
+        return [
+            self.combine_results(
+                [results[i] if results is not None else None for results in per_model],
+                min_confidence
+            )
+            for i in range(len(criteria))
+        ]
+
+def rubric_levels(criterion: GradingCriterion) -> List[float]:
+    """The numeric point levels of a criterion's rubric, ascending."""
+    levels = []
+    for key in criterion.rubric:
+        try:
+            levels.append(float(key))
+        except ValueError:
+            continue
+    return sorted(levels)
+
+class AdaptiveConsensusGrader(ConsensusGrader):
+    """
+    Consensus that escalates from the cheapest model only when needed.
+    
+    Models are asked one at a time. Grading stops as soon as the answers
+    so far settle the grade: a single answer settles it when its
+    confidence reaches stop_confidence and its points sit clearly inside
+    a rubric band; several answers settle it when they agree on the band.
+    Clear-cut submissions therefore cost one call instead of one per model,
+    at the price of sequential latency for the ambiguous ones.
+    """
+    
+    def __init__(
+        self,
+        models: List[AIGrader],
+        max_in_flight: Optional[int] = None,
+        model_order: Optional[List[str]] = None,
+        stop_confidence: float = DEFAULT_STOP_CONFIDENCE,
+        min_agreeing: int = 1,
+        ambiguity_margin: float = DEFAULT_AMBIGUITY_MARGIN
+    ):
+        """
+        Args:
+            models: Graders whose answers are combined
+            max_in_flight: Maximum number of model calls running at once
+            model_order: Model names in the order to ask them; by default
+                models are ordered by prompt price, cheapest first
+            stop_confidence: Confidence at which a single answer is accepted
+            min_agreeing: Confident answers required before stopping
+            ambiguity_margin: Fraction of a rubric band's width, at either
+                edge, within which points are ambiguous between two bands
+        """
+        super().__init__(models, max_in_flight)
+        if model_order is not None:
+            rank = {name: i for i, name in enumerate(model_order)}
+            self.models = sorted(models, key=lambda m: rank.get(m.model_name, len(rank)))
+        else:
+            self.models = sorted(
+                models,
+                key=lambda m: MODEL_PRICING.get(m.model_name, (float("inf"),))[0]
+            )
+        self.stop_confidence = stop_confidence
+        self.min_agreeing = min_agreeing
+        self.ambiguity_margin = ambiguity_margin
+        self._stats = {"requests": 0, "model_calls": 0, "calls_saved": 0}
+        self._stats_lock = threading.Lock()
+        
+    def _ask(self, model: AIGrader, call, label: str):
+        """
+        Run call(model) with the model's timeout, counted from when the call
+        starts; None if it fails or times out.
+        """
+        future, started = submit_timed(self.executor, lambda: call(model))
+        try:
+            return result_within(future, started, model.timeout)
+        except Exception as e:
+            future.cancel()
+            logger.warning("Model %s gave no answer grading %s: %s", model.model_name, label, e)
+            return None
+            
+    def _band(self, points: float, levels: List[float]) -> Tuple[int, bool]:
+        """
+        Locate points among the rubric levels.
+        
+        Returns:
+            (index of the nearest level, whether points are near the
+            boundary with a neighbouring level)
+        """
+        nearest = min(range(len(levels)), key=lambda i: abs(levels[i] - points))
+        for neighbour in (nearest - 1, nearest + 1):
+            if 0 <= neighbour < len(levels):
+                midpoint = (levels[nearest] + levels[neighbour]) / 2
+                width = abs(levels[nearest] - levels[neighbour])
+                if abs(points - midpoint) < width * self.ambiguity_margin:
+                    return nearest, True
+        return nearest, False
+        
+    def is_settled(
+        self,
+        results: List[Optional[GradingResult]],
+        criterion: GradingCriterion,
+        min_confidence: float
+    ) -> bool:
+        """Whether the answers so far make asking further models unnecessary."""
+        valid = [r for r in results if r is not None and r.confidence >= min_confidence]
+        if len(valid) < self.min_agreeing:
+            return False
+            
+        levels = rubric_levels(criterion)
+        if len(levels) >= 2:
+            bands = set()
+            for result in valid:
+                band, ambiguous = self._band(result.points, levels)
+                if ambiguous:
+                    return False
+                bands.add(band)
+            if len(bands) > 1:
+                return False
+        elif len(valid) > 1:
+            # No usable bands: require answers within a tenth of the scale
+            spread = max(r.points for r in valid) - min(r.points for r in valid)
+            if spread > 0.1 * criterion.max_points:
+                return False
+                
+        return len(valid) >= 2 or min(r.confidence for r in valid) >= self.stop_confidence
+        
+    def _record(self, calls: int, possible: int) -> None:
+        with self._stats_lock:
+            self._stats["requests"] += 1
+            self._stats["model_calls"] += calls
+            self._stats["calls_saved"] += possible - calls
+            
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Model calls made and avoided by stopping early."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        possible = stats["model_calls"] + stats["calls_saved"]
+        stats["saved_fraction"] = stats["calls_saved"] / possible if possible else 0.0
+        return stats
+        
+    def collect_results(
+        self,
+        submission_text: str,
+        criterion: GradingCriterion,
+        min_confidence: float = 0.7
+    ) -> List[Optional[GradingResult]]:
+        """
+        Ask models in order until the grade is settled.
+        
+        Returns:
+            One entry per model asked, in the order asked
+        """
+        results: List[Optional[GradingResult]] = []
+        for model in self.models:
+            results.append(self._ask(
+                model,
+                lambda m: m.grade_submission(submission_text, criterion),
+                f"criterion {criterion.name!r}"
+            ))
+            if self.is_settled(results, criterion, min_confidence):
+                break
+        self._record(len(results), len(self.models))
+        return results
+        
+    def grade_with_consensus(
+        self,
+        submission_text: str,
+        criterion: GradingCriterion,
+        min_confidence: float = 0.7
+    ) -> Optional[GradingResult]:
+        """
+        Grade a submission, asking further models only while the grade is
+        unsettled (see is_settled).
+        
+        Args:
+            submission_text: Text to grade
+            criterion: Grading criterion to apply
+            min_confidence: Minimum confidence threshold
+            
+        Returns:
+            Consensus of the models asked, or None if no consensus reached
+        """
+        results = self.collect_results(submission_text, criterion, min_confidence)
+        return self.combine_results(results, min_confidence)
+        
+    def grade_criteria_with_consensus(
+        self,
+        submission_text: str,
+        criteria: List[GradingCriterion],
+        min_confidence: float = 0.7
+    ) -> List[Optional[GradingResult]]:
+        """
+        Grade all criteria with batched requests, sending only the criteria
+        not yet settled on to each further model.
+        """
+        answers: List[List[Optional[GradingResult]]] = [[] for _ in criteria]
+        open_criteria = list(range(len(criteria)))
+        for model in self.models:
+            subset = [criteria[i] for i in open_criteria]
+            graded = self._ask(
+                model,
+                lambda m: m.grade_criteria(submission_text, subset),
+                f"{len(subset)} batched criteria"
+            )
+            for position, i in enumerate(open_criteria):
+                answers[i].append(graded[position] if graded is not None else None)
+            open_criteria = [
+                i for i in open_criteria
+                if not self.is_settled(answers[i], criteria[i], min_confidence)
+            ]
+            if not open_criteria:
+                break
+                
+        for criterion_answers in answers:
+            self._record(len(criterion_answers), len(self.models))
+        return [self.combine_results(a, min_confidence) for a in answers]
\ No newline at end of file
@@ -0,0 +1,264 @@
+from typing import Dict, Optional
+from collections import OrderedDict
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from src.grading.criteria import GradingCriterion, GradingSchema
+
+def rubric_fingerprint(criterion: GradingCriterion) -> str:
+    """
+    Hash everything about a criterion that influences its grade.
+
+    Computed on every call, so a criterion edited in place gets a new
+    fingerprint and never reuses prompts or grades of its old rubric.
+    """
+    payload = json.dumps(
+        [criterion.name, criterion.description, criterion.max_points, criterion.rubric],
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def make_cache_key(
+    model_name: str,
+    temperature: float,
+    prompt_version: str,
+    criterion: GradingCriterion,
+    submission_text: str
+) -> str:
+    """Build the content-addressed key for a single grading call."""
+    digest = hashlib.sha256()
+    for part in (
+        model_name,
+        repr(float(temperature)),
+        prompt_version,
+        rubric_fingerprint(criterion),
+        submission_text
+    ):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+class GradingCache:
+    """
+    Two-tier cache of grading results: an in-memory LRU in front of SQLite.
+
+    Values are plain dicts (the serialized GradingResult). Entries older
+    than ttl seconds are treated as misses, and each tier is trimmed to its
+    size limit, oldest first.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_memory_entries: int = 4096,
+        max_disk_entries: Optional[int] = 500_000,
+        ttl: Optional[float] = None
+    ):
+        """
+        Args:
+            path: SQLite database file; None keeps the cache in memory only
+            max_memory_entries: Size of the in-memory LRU tier
+            max_disk_entries: Maximum rows kept on disk (None = unbounded)
+            ttl: Seconds an entry stays valid (None = forever)
+        """
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "memory_hits": 0, "disk_hits": 0, "evictions": 0}
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disk_count = 0
+        if path is not None:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS grading_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    criterion_name TEXT NOT NULL,
+                    rubric_hash TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_grading_cache_criterion "
+                "ON grading_cache (criterion_name, rubric_hash)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_grading_cache_created "
+                "ON grading_cache (created_at)"
+            )
+            self._conn.commit()
+            self._disk_count = self._conn.execute(
+                "SELECT COUNT(*) FROM grading_cache"
+            ).fetchone()[0]
+            # Rows that expired while the process was down are never read again
+            self.purge_expired()
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached value for key, or None on a miss."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if not self._expired(created_at):
+                    self._memory.move_to_end(key)
+                    self._stats["hits"] += 1
+                    self._stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, created_at FROM grading_cache WHERE key = ?",
+                    (key,)
+                ).fetchone()
+                if row is not None and not self._expired(row[1]):
+                    value = json.loads(row[0])
+                    self._remember(key, value, row[1])
+                    self._stats["hits"] += 1
+                    self._stats["disk_hits"] += 1
+                    return value
+                if row is not None:
+                    cursor = self._conn.execute("DELETE FROM grading_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                    self._disk_count -= cursor.rowcount
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key: str, value: Dict, criterion: GradingCriterion) -> None:
+        """Store value under key, recording the criterion it was graded with."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            if self._conn is None:
+                return
+
+            row = (json.dumps(value), criterion.name, rubric_fingerprint(criterion), now, key)
+            cursor = self._conn.execute(
+                "UPDATE grading_cache SET value = ?, criterion_name = ?, "
+                "rubric_hash = ?, created_at = ? WHERE key = ?",
+                row
+            )
+            if cursor.rowcount == 0:
+                self._conn.execute(
+                    "INSERT INTO grading_cache "
+                    "(value, criterion_name, rubric_hash, created_at, key) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    row
+                )
+                self._disk_count += 1
+            if self.max_disk_entries is not None and self._disk_count > self.max_disk_entries:
+                self._evict_disk(self._disk_count - self.max_disk_entries)
+            self._conn.commit()
+
+    def _remember(self, key: str, value: Dict, created_at: float) -> None:
+        """Insert into the LRU tier, evicting the least recently used entries."""
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _evict_disk(self, count: int) -> None:
+        cursor = self._conn.execute(
+            "DELETE FROM grading_cache WHERE key IN ("
+            "SELECT key FROM grading_cache ORDER BY created_at LIMIT ?)",
+            (count,)
+        )
+        self._disk_count -= cursor.rowcount
+        self._stats["evictions"] += cursor.rowcount
+
+    def invalidate_criterion(
+        self,
+        criterion: GradingCriterion,
+        previous: Optional[GradingCriterion] = None
+    ) -> int:
+        """
+        Drop entries graded with an outdated version of this criterion.
+
+        Keys already include the rubric, so a changed rubric never hits old
+        entries; this reclaims the space they occupy on disk.
+
+        Args:
+            criterion: Current version of the criterion
+            previous: The version it replaced; only entries graded with it
+                are dropped. Without it, entries of every other criterion
+                with this name go, including other assignments' criteria.
+
+        Returns:
+            Number of disk entries removed
+        """
+        with self._lock:
+            # Memory entries don't record their criterion, so drop the whole tier
+            self._memory.clear()
+            if self._conn is None:
+                return 0
+            if previous is not None:
+                cursor = self._conn.execute(
+                    "DELETE FROM grading_cache WHERE criterion_name = ? AND rubric_hash = ?",
+                    (previous.name, rubric_fingerprint(previous))
+                )
+            else:
+                cursor = self._conn.execute(
+                    "DELETE FROM grading_cache WHERE criterion_name = ? AND rubric_hash != ?",
+                    (criterion.name, rubric_fingerprint(criterion))
+                )
+            self._conn.commit()
+            self._disk_count -= cursor.rowcount
+            return cursor.rowcount
+
+    def schema_replaced(self, old: GradingSchema, new: GradingSchema) -> None:
+        """
+        Drop entries of criteria whose rubric changed when a schema was
+        replaced; registered as a SchemaRegistry listener.
+        """
+        current = {c.name: c for c in new.criteria}
+        for criterion in old.criteria:
+            replacement = current.get(criterion.name)
+            if replacement is None or rubric_fingerprint(replacement) != rubric_fingerprint(criterion):
+                self.invalidate_criterion(replacement or criterion, previous=criterion)
+
+    def purge_expired(self) -> int:
+        """Remove expired entries from disk and return how many were dropped."""
+        if self.ttl is None:
+            return 0
+        with self._lock:
+            if self._conn is None:
+                return 0
+            cursor = self._conn.execute(
+                "DELETE FROM grading_cache WHERE created_at < ?",
+                (time.time() - self.ttl,)
+            )
+            self._conn.commit()
+            self._disk_count -= cursor.rowcount
+            return cursor.rowcount
+
+    def clear(self) -> None:
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM grading_cache")
+                self._conn.commit()
+                self._disk_count = 0
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters plus current tier sizes."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            stats["disk_entries"] = self._disk_count
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0
+        return stats
@@ -0,0 +1,300 @@
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import logging
+import os
+import threading
+from src.grading.grader import AssignmentGrader
+from src.models.ai_models import AIGrader, AdaptiveConsensusGrader, ConsensusGrader
+from src.models.cache import GradingCache
+from src.models.rate_limit import rate_limiter_for
+from src.models.resilience import Resilience
+from src.models.tokens import UsageLedger, submission_token_budget
+
+if TYPE_CHECKING:  # httpx loads with the first grader, not on import
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+# Models every consensus asks
+DEFAULT_MODELS = ("gpt-4", "gpt-3.5-turbo")
+
+# Connections kept open per API key, and seconds an idle one stays open
+DEFAULT_MAX_CONNECTIONS = 32
+DEFAULT_KEEPALIVE_SECONDS = 120.0
+
+# Connections opened ahead of the first grading call
+DEFAULT_WARM_CONNECTIONS = 2
+
+# Seconds a model call may take before the consensus stops waiting for it
+DEFAULT_MODEL_TIMEOUT = 60.0
+
+# API keys whose grader is kept before the least recently used is closed
+DEFAULT_MAX_GRADERS = 64
+
+class GraderService:
+    """
+    Process-wide owner of the graders, shared by every session and request.
+
+    One AssignmentGrader is built per API key, the first time that key is
+    used, and reused afterwards; past max_graders keys, the least recently
+    used grader is closed. Its models send requests through one pooled
+    keep-alive HTTP client per key. The result cache, the usage
+    ledger, the prompt compiler and the per-model rate limiters are shared
+    by every key. Circuit breakers and latency tracking stay separate per
+    key, so a revoked key cannot trip the breaker for the others.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[GradingCache] = None,
+        usage: Optional[UsageLedger] = None,
+        model_names: Sequence[str] = DEFAULT_MODELS,
+        consensus_strategy: str = "all",
+        quorum: Optional[int] = None,
+        quorum_grace: float = 0.0,
+        consistency_iterations: int = 1,
+        retrieval_top_k: Optional[int] = None,
+        model_timeout: Optional[float] = DEFAULT_MODEL_TIMEOUT,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        keepalive_seconds: float = DEFAULT_KEEPALIVE_SECONDS,
+        max_graders: int = DEFAULT_MAX_GRADERS
+    ):
+        """
+        Args:
+            cache: Result cache shared by all graders
+            usage: Ledger shared by all graders
+            model_names: Models asked for every consensus grade
+            consensus_strategy: "all" or "adaptive" (cheapest model first)
+            quorum: Answers a non-adaptive consensus waits for (None = all)
+            quorum_grace: Seconds stragglers get once the quorum has answered
+            consistency_iterations: Gradings per criterion (1 = grade once)
+            retrieval_top_k: Passages sent per criterion for long submissions
+            model_timeout: Seconds each model call may take (None = no limit)
+            max_connections: Open connections per API key
+            keepalive_seconds: How long idle connections stay open
+            max_graders: API keys whose grader and connections are kept
+        """
+        self.cache = cache
+        self.usage = usage if usage is not None else UsageLedger()
+        self.model_names = tuple(model_names)
+        self.consensus_strategy = consensus_strategy
+        self.quorum = quorum
+        self.quorum_grace = quorum_grace
+        self.consistency_iterations = consistency_iterations
+        self.retrieval_top_k = retrieval_top_k
+        self.model_timeout = model_timeout
+        self.max_connections = max_connections
+        self.keepalive_seconds = keepalive_seconds
+        self.max_graders = max_graders
+        # Where warm-up requests go; the OpenAI client reads the same variable
+        self.base_url = (os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1").rstrip("/")
+        self._graders: "OrderedDict[str, AssignmentGrader]" = OrderedDict()
+        self._clients: Dict[str, "httpx.Client"] = {}
+        self._warmed = set()
+        self._counters = {"built": 0, "reused": 0, "evicted": 0, "warm_ups": 0, "warm_up_failures": 0}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, **overrides) -> "GraderService":
+        """Configure a service from the GRADING_* environment variables."""
+        settings = dict(
+            cache=GradingCache(os.getenv("GRADING_CACHE_PATH", "grading_cache.db")),
+            consensus_strategy=os.getenv("GRADING_CONSENSUS_STRATEGY", "all"),
+            quorum=int(os.getenv("GRADING_QUORUM", "0")) or None,
+            quorum_grace=float(os.getenv("GRADING_QUORUM_GRACE", "2.0")),
+            consistency_iterations=int(os.getenv("GRADING_CONSISTENCY_ITERATIONS", "1")),
+            retrieval_top_k=int(os.getenv("GRADING_RETRIEVAL_TOP_K", "0")) or None,
+            model_timeout=float(os.getenv("GRADING_MODEL_TIMEOUT", str(DEFAULT_MODEL_TIMEOUT))) or None,
+            max_connections=int(os.getenv("GRADING_MAX_CONNECTIONS", str(DEFAULT_MAX_CONNECTIONS))),
+            max_graders=int(os.getenv("GRADING_MAX_GRADERS", str(DEFAULT_MAX_GRADERS)))
+        )
+        settings.update(overrides)
+        return cls(**settings)
+
+    @staticmethod
+    def _key(api_key: Optional[str]) -> str:
+        # Graders are indexed by a digest so the key itself isn't kept twice
+        return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()
+
+    def grader(self, api_key: Optional[str] = None) -> AssignmentGrader:
+        """
+        The grader for an API key, built on first use.
+
+        Callers should fetch it again rather than keep it: an evicted
+        grader's connections are closed.
+
+        Args:
+            api_key: OpenAI API key (None = OPENAI_API_KEY)
+        """
+        key = self._key(api_key)
+        evicted = []
+        with self._lock:
+            grader = self._graders.get(key)
+            if grader is not None:
+                self._graders.move_to_end(key)
+                self._counters["reused"] += 1
+                return grader
+            grader = self._graders[key] = self._build(api_key, self._client(key))
+            self._counters["built"] += 1
+            while len(self._graders) > self.max_graders:
+                evicted.append(self._drop(next(iter(self._graders))))
+                self._counters["evicted"] += 1
+        for dropped in evicted:
+            self._close(*dropped)
+        return grader
+
+    def _client(self, key: str) -> "httpx.Client":
+        """The pooled HTTP client of an API key (lock held)."""
+        import httpx
+
+        client = self._clients.get(key)
+        if client is None:
+            client = self._clients[key] = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=self.keepalive_seconds
+                )
+            )
+        return client
+
+    def _build(self, api_key: Optional[str], client: "httpx.Client") -> AssignmentGrader:
+        models = [
+            AIGrader(
+                model_name=model_name,
+                timeout=self.model_timeout,
+                cache=self.cache,
+                max_submission_tokens=submission_token_budget(model_name),
+                usage=self.usage,
+                retrieval_top_k=self.retrieval_top_k,
+                rate_limiter=rate_limiter_for(model_name),
+                resilience=Resilience(),
+                api_key=api_key,
+                http_client=client
+            )
+            for model_name in self.model_names
+        ]
+        if self.consensus_strategy == "adaptive":
+            consensus_grader = AdaptiveConsensusGrader(models)
+        else:
+            consensus_grader = ConsensusGrader(
+                models,
+                quorum=self.quorum,
+                quorum_grace=self.quorum_grace
+            )
+        return AssignmentGrader(consensus_grader, consistency_iterations=self.consistency_iterations)
+
+    def warm_up(
+        self,
+        api_key: Optional[str] = None,
+        connections: int = DEFAULT_WARM_CONNECTIONS,
+        background: bool = True
+    ) -> Optional[threading.Thread]:
+        """
+        Get an API key's grader ready before its first grading call.
+
+        Loads the model backend, then sends cheap GET /models requests so
+        the TCP and TLS handshakes are done and the connections sit in the
+        pool. Keys already warmed are skipped. Failures are only logged;
+        grading loads the backend and opens connections itself if needed.
+
+        Args:
+            api_key: OpenAI API key (None = OPENAI_API_KEY)
+            connections: Connections to open, concurrently
+            background: Return at once and warm up on a daemon thread
+
+        Returns:
+            The warm-up thread when background and one was started, else None
+        """
+        grader = self.grader(api_key)
+        key = self._key(api_key)
+        with self._lock:
+            client = self._clients.get(key)
+            # Already warmed, or evicted by other keys in the meantime
+            if key in self._warmed or client is None:
+                return None
+            self._warmed.add(key)
+        token = api_key or os.getenv("OPENAI_API_KEY", "")
+
+        import httpx
+
+        def ping(_) -> None:
+            try:
+                client.get(
+                    f"{self.base_url}/models",
+                    headers={"Authorization": f"Bearer {token}"},
+                    timeout=10.0
+                ).close()
+                outcome = "warm_ups"
+            except httpx.HTTPError as e:
+                logger.warning("Connection warm-up failed: %s", e)
+                outcome = "warm_up_failures"
+            with self._lock:
+                self._counters[outcome] += 1
+
+        def run() -> None:
+            for model in grader.consensus_grader.models:
+                try:
+                    model.preload()
+                except Exception as e:
+                    logger.warning("Loading %s for warm-up failed: %s", model.model_name, e)
+                    with self._lock:
+                        self._counters["warm_up_failures"] += 1
+            with ThreadPoolExecutor(max_workers=connections, thread_name_prefix="warm-up") as pool:
+                list(pool.map(ping, range(connections)))
+
+        if not background:
+            run()
+            return None
+        thread = threading.Thread(target=run, name="warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def _drop(self, key: str) -> Tuple[Optional[AssignmentGrader], Optional["httpx.Client"]]:
+        """Remove a key's grader and client from the service (lock held)."""
+        self._warmed.discard(key)
+        return self._graders.pop(key, None), self._clients.pop(key, None)
+
+    @staticmethod
+    def _close(grader: Optional[AssignmentGrader], client: Optional["httpx.Client"]) -> None:
+        if grader is not None:
+            grader.close()
+        if client is not None:
+            client.close()
+
+    def forget(self, api_key: Optional[str] = None) -> None:
+        """Drop an API key's grader and close its pools and connections, e.g. after it is revoked."""
+        key = self._key(api_key)
+        with self._lock:
+            dropped = self._drop(key)
+        self._close(*dropped)
+
+    def close(self) -> None:
+        """Shut down every grader's worker pools and close every pooled connection."""
+        with self._lock:
+            dropped: List[Tuple] = [self._drop(key) for key in set(self._graders) | set(self._clients)]
+        for grader, client in dropped:
+            self._close(grader, client)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["api_keys"] = len(self._graders)
+        return stats
+
+# Created on first use, configured from the environment
+_shared_service: Optional[GraderService] = None
+_shared_lock = threading.Lock()
+
+def shared_service() -> GraderService:
+    """The process-wide grader service."""
+    global _shared_service
+    if _shared_service is not None:
+        return _shared_service
+    with _shared_lock:
+        if _shared_service is None:
+            _shared_service = GraderService.from_env()
+    return _shared_service
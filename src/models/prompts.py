@@ -0,0 +1,226 @@
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
+import threading
+from src.grading.criteria import GradingCriterion
+from src.models.cache import rubric_fingerprint
+from src.models.tokens import count_tokens
+
+# Bump whenever a prompt template changes so cached grades are not reused
+PROMPT_VERSION = "2"
+BATCH_PROMPT_VERSION = "batch-2"
+
+# Compiled prompts kept before the least recently used are dropped
+DEFAULT_MAX_COMPILED = 1024
+
+# Templates put everything that is the same for every submission first and
+# the submission last, so repeated calls share a prefix the provider can cache
+SINGLE_SYSTEM = (
+    "You are an expert grader. Grade the submission according to the provided "
+    "criterion. Be objective and thorough in your assessment."
+)
+SINGLE_PREFIX = """Criterion: {criterion_name}
+Description: {criterion_description}
+Maximum Points: {max_points}
+
+Rubric:
+{rubric}
+
+Grade the submission below and provide:
+1. Points awarded (between 0 and {max_points})
+2. Detailed explanation
+3. Confidence score (between 0 and 1)
+
+{format_instructions}
+
+Submission:
+"""
+
+MAP_SYSTEM = (
+    "You are an expert grader reviewing one part of a longer submission. "
+    "Extract the evidence relevant to the criterion; do not assign a grade."
+)
+MAP_PREFIX = """Criterion: {criterion_name}
+Description: {criterion_description}
+
+Rubric:
+{rubric}
+
+Concisely summarise the strengths, weaknesses and key evidence in the
+submission part below that bear on the criterion. Quote short passages
+where useful.
+
+"""
+
+BATCH_SYSTEM = (
+    "You are an expert grader. Grade the submission against each of the "
+    "provided criteria. Be objective and thorough in your assessment."
+)
+BATCH_PREFIX = """Criteria:
+{criteria}
+
+For every criterion above provide:
+1. The criterion name exactly as given
+2. Points awarded (between 0 and that criterion's maximum points)
+3. Detailed explanation
+4. Confidence score (between 0 and 1)
+
+{format_instructions}
+
+Submission:
+"""
+
+def rubric_text(criterion: GradingCriterion) -> str:
+    """The criterion's rubric as one bullet per level."""
+    return "\n".join(f"- {points}: {desc}" for points, desc in criterion.rubric.items())
+
+@dataclass(frozen=True)
+class CompiledPrompt:
+    """The static part of a prompt, built once and reused for every submission."""
+    version: str
+    system: str
+    prefix: str
+    prefix_tokens: int
+
+    def render(self, submission: str) -> List:
+        """Messages for one call: the cached prefix followed by the submission."""
+        # Imported here so that importing the graders doesn't load langchain
+        from langchain_core.messages import HumanMessage, SystemMessage
+        return [SystemMessage(content=self.system), HumanMessage(content=self.prefix + submission)]
+
+class PromptCompiler:
+    """
+    Builds each (criterion, prompt kind) prefix once and reuses it.
+
+    Compiled prompts are keyed by the rubric fingerprint, so a changed
+    criterion compiles a new prefix, and carry a version derived from the
+    template version and that fingerprint. The prefix comes before the
+    submission so providers that cache prompt prefixes (e.g. OpenAI) can
+    reuse it; stats reports how many prefix tokens were served again.
+    """
+
+    def __init__(self, max_compiled: int = DEFAULT_MAX_COMPILED):
+        """
+        Args:
+            max_compiled: Compiled prompts kept in memory
+        """
+        self.max_compiled = max_compiled
+        self._compiled: "OrderedDict[Tuple, CompiledPrompt]" = OrderedDict()
+        self._format_instructions: Dict[type, str] = {}
+        self._counters = {"compiled": 0, "reused": 0, "prefix_tokens_reused": 0}
+        self._lock = threading.Lock()
+
+    def single(self, criterion: GradingCriterion, parser, model_name: str) -> CompiledPrompt:
+        """Prompt grading one criterion; also used for retrieval and reduce calls."""
+        fingerprint = rubric_fingerprint(criterion)
+        return self._get(
+            ("single", model_name, parser.pydantic_object, fingerprint),
+            lambda: self._compile(
+                f"{PROMPT_VERSION}-{fingerprint[:12]}",
+                SINGLE_SYSTEM,
+                SINGLE_PREFIX.format(
+                    criterion_name=criterion.name,
+                    criterion_description=criterion.description,
+                    max_points=criterion.max_points,
+                    rubric=rubric_text(criterion),
+                    format_instructions=self._instructions(parser)
+                ),
+                model_name
+            )
+        )
+
+    def map(self, criterion: GradingCriterion, model_name: str) -> CompiledPrompt:
+        """Prompt extracting one criterion's evidence from a chunk."""
+        fingerprint = rubric_fingerprint(criterion)
+        return self._get(
+            ("map", model_name, fingerprint),
+            lambda: self._compile(
+                f"map-{PROMPT_VERSION}-{fingerprint[:12]}",
+                MAP_SYSTEM,
+                MAP_PREFIX.format(
+                    criterion_name=criterion.name,
+                    criterion_description=criterion.description,
+                    rubric=rubric_text(criterion)
+                ),
+                model_name
+            )
+        )
+
+    def batch(self, criteria: List[GradingCriterion], parser, model_name: str) -> CompiledPrompt:
+        """Prompt grading several criteria in one request."""
+        return self._get(
+            ("batch", model_name, parser.pydantic_object, tuple(rubric_fingerprint(c) for c in criteria)),
+            lambda: self._compile(
+                f"{BATCH_PROMPT_VERSION}-{len(criteria)}",
+                BATCH_SYSTEM,
+                BATCH_PREFIX.format(
+                    criteria="\n\n".join(
+                        f"Criterion: {c.name}\n"
+                        f"Description: {c.description}\n"
+                        f"Maximum Points: {c.max_points}\n"
+                        f"Rubric:\n{rubric_text(c)}"
+                        for c in criteria
+                    ),
+                    format_instructions=self._instructions(parser)
+                ),
+                model_name
+            )
+        )
+
+    def _instructions(self, parser) -> str:
+        """Format instructions, generated once per output model."""
+        instructions = self._format_instructions.get(parser.pydantic_object)
+        if instructions is None:
+            instructions = parser.get_format_instructions()
+            self._format_instructions[parser.pydantic_object] = instructions
+        return instructions
+
+    @staticmethod
+    def _compile(version: str, system: str, prefix: str, model_name: str) -> CompiledPrompt:
+        return CompiledPrompt(
+            version=version,
+            system=system,
+            prefix=prefix,
+            prefix_tokens=count_tokens(system, model_name) + count_tokens(prefix, model_name)
+        )
+
+    def _get(self, key: Tuple, build) -> CompiledPrompt:
+        with self._lock:
+            compiled = self._compiled.get(key)
+            if compiled is not None:
+                self._compiled.move_to_end(key)
+                self._counters["reused"] += 1
+                self._counters["prefix_tokens_reused"] += compiled.prefix_tokens
+                return compiled
+        # Compile outside the lock; two threads racing just build it twice
+        compiled = build()
+        with self._lock:
+            self._compiled[key] = compiled
+            self._counters["compiled"] += 1
+            if len(self._compiled) > self.max_compiled:
+                self._compiled.popitem(last=False)
+        return compiled
+
+    def clear(self) -> None:
+        """Drop every compiled prompt, e.g. after editing templates at runtime."""
+        with self._lock:
+            self._compiled.clear()
+            self._format_instructions.clear()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["cached_prompts"] = len(self._compiled)
+        return stats
+
+# Shared by every grader in the process unless one is given its own
+_shared_compiler = PromptCompiler()
+
+def shared_compiler() -> PromptCompiler:
+    """The process-wide prompt compiler."""
+    return _shared_compiler
+
+def prompt_statistics(compiler: Optional[PromptCompiler] = None) -> Dict[str, int]:
+    """Compilation and prefix reuse counters."""
+    return (compiler or _shared_compiler).stats
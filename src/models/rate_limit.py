@@ -0,0 +1,222 @@
+from typing import Dict, Iterator, Optional, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+import heapq
+import itertools
+import threading
+import time
+
+# Request priorities; lower values are served first
+INTERACTIVE = 0
+BULK = 1
+
+# Provider limits per model as (requests per minute, tokens per minute)
+MODEL_RATE_LIMITS: Dict[str, Tuple[int, int]] = {
+    "gpt-4": (500, 10_000),
+    "gpt-4-turbo": (500, 30_000),
+    "gpt-4o": (500, 30_000),
+    "gpt-4o-mini": (500, 200_000),
+    "gpt-3.5-turbo": (3_500, 200_000),
+}
+
+# Completion tokens reserved per call before the real count is known
+EXPECTED_COMPLETION_TOKENS = 300
+
+# Rate multiplier bounds for adaptive backoff
+MIN_RATE_FACTOR = 0.2
+RECOVERY_STEP = 0.02
+
+# Seconds of traffic the limiter lets through in one burst; providers
+# enforce per-minute limits over shorter windows too
+DEFAULT_BURST_SECONDS = 1.0
+
+# Pause after a 429 that carries no Retry-After hint
+DEFAULT_BACKOFF_SECONDS = 2.0
+
+_priority: ContextVar[int] = ContextVar("grading_priority", default=INTERACTIVE)
+
+@contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    """
+    Run model calls made in this context at the given priority.
+
+    Thread pools do not inherit context variables, so work handed to an
+    executor must be submitted through contextvars.copy_context().run.
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def current_priority() -> int:
+    return _priority.get()
+
+class TokenBucket:
+    """A bucket refilled continuously up to its capacity (not thread-safe)."""
+
+    def __init__(self, capacity: float, per_second: float):
+        self.capacity = capacity
+        self.per_second = per_second
+        self.level = capacity
+        self._updated = time.monotonic()
+
+    def refill(self, now: float, factor: float = 1.0) -> None:
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.per_second * factor)
+        self._updated = now
+
+    def wait_time(self, amount: float, factor: float = 1.0) -> float:
+        """Seconds until amount can be taken, assuming refill() was just called."""
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / (self.per_second * factor)
+
+class RateLimiter:
+    """
+    Paces calls to one model against its request and token limits.
+
+    Callers reserve one request and an estimate of their tokens before
+    calling, then reconcile the estimate with the real usage. Waiting
+    callers are served by priority, then arrival order. When the provider
+    still answers 429 the refill rate is cut multiplicatively and then
+    recovers gradually with every successful call.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        burst_seconds: float = DEFAULT_BURST_SECONDS
+    ):
+        """
+        Args:
+            requests_per_minute: Provider RPM limit
+            tokens_per_minute: Provider TPM limit
+            burst_seconds: Seconds of traffic allowed in one burst
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = TokenBucket(
+            max(1.0, requests_per_minute / 60 * burst_seconds), requests_per_minute / 60
+        )
+        self._tokens = TokenBucket(tokens_per_minute / 60 * burst_seconds, tokens_per_minute / 60)
+        self._factor = 1.0
+        self._paused_until = 0.0
+        self._waiters: list = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._stats = {"calls": 0, "waits": 0, "seconds_waited": 0.0, "throttled": 0}
+
+    def acquire(self, tokens: int, priority: Optional[int] = None) -> int:
+        """
+        Block until a request of about this many tokens may be sent.
+
+        Args:
+            tokens: Estimated prompt plus completion tokens
+            priority: Defaults to the priority of the current context
+
+        Returns:
+            The number of tokens reserved, to pass to reconcile()
+        """
+        entry = (current_priority() if priority is None else priority, next(self._sequence))
+        started = time.monotonic()
+        with self._condition:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = self._paused_until - now
+                    if self._waiters[0] == entry and wait <= 0:
+                        self._requests.refill(now, self._factor)
+                        self._tokens.refill(now, self._factor)
+                        wait = max(
+                            self._requests.wait_time(1, self._factor),
+                            # Calls bigger than a burst go into debt that later callers wait out
+                            self._tokens.wait_time(min(tokens, self._tokens.capacity), self._factor)
+                        )
+                        if wait <= 0:
+                            self._requests.level -= 1
+                            self._tokens.level -= tokens
+                            break
+                    self._condition.wait(wait if wait > 0 else None)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+
+            waited = time.monotonic() - started
+            self._stats["calls"] += 1
+            if waited > 0.001:
+                self._stats["waits"] += 1
+                self._stats["seconds_waited"] += waited
+        return tokens
+
+    def reconcile(self, reserved: int, used: int) -> None:
+        """Correct the token bucket once a call's real usage is known."""
+        with self._condition:
+            self._tokens.level = min(self._tokens.capacity, self._tokens.level + reserved - used)
+            self._factor = min(1.0, self._factor + RECOVERY_STEP)
+            self._condition.notify_all()
+
+    def throttled(self, retry_after: Optional[float] = None) -> None:
+        """
+        Back off after the provider rejected a call for exceeding its limits.
+
+        Args:
+            retry_after: Seconds the provider asked us to wait, if given
+        """
+        with self._condition:
+            self._stats["throttled"] += 1
+            self._factor = max(MIN_RATE_FACTOR, self._factor / 2)
+            pause = retry_after if retry_after is not None else DEFAULT_BACKOFF_SECONDS
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+            self._condition.notify_all()
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        with self._condition:
+            return {**self._stats, "rate_factor": self._factor, "waiting": len(self._waiters)}
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def rate_limiter_for(model_name: str) -> RateLimiter:
+    """
+    The process-wide limiter for a model, shared by every grader using it.
+
+    Models without known limits get the most conservative configured pair.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(model_name)
+        if limiter is None:
+            rpm, tpm = MODEL_RATE_LIMITS.get(model_name, MODEL_RATE_LIMITS["gpt-4"])
+            limiter = _limiters[model_name] = RateLimiter(rpm, tpm)
+        return limiter
+
+def configure_rate_limit(model_name: str, requests_per_minute: int, tokens_per_minute: int) -> RateLimiter:
+    """
+    Replace a model's shared limiter, e.g. to match the account's usage tier.
+
+    Graders keep the limiter they were built with, so call this first.
+    """
+    with _limiters_lock:
+        limiter = _limiters[model_name] = RateLimiter(requests_per_minute, tokens_per_minute)
+        return limiter
+
+def rate_limit_statistics() -> Dict[str, Dict[str, float]]:
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {model_name: limiter.stats for model_name, limiter in limiters.items()}
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Whether a provider error means a rate limit was exceeded."""
+    return getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError"
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """The Retry-After hint of a rate limit error, if the provider sent one."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,282 @@
+from typing import Callable, Dict, Optional, TypeVar
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+import contextvars
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Circuit breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Errors, matched by class name anywhere in their hierarchy so neither
+# openai nor httpx has to be imported, that mean the request never got an
+# answer: connection failures and timeouts
+TRANSIENT_ERROR_NAMES = frozenset({
+    "APIConnectionError", "APITimeoutError", "TransportError", "TimeoutException"
+})
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a model whose circuit breaker is open."""
+
+def is_transient_error(error: BaseException) -> bool:
+    """
+    Whether a failed call may succeed if repeated: a transport failure, a
+    timeout or a 5xx answer. Parse errors, 4xx answers (including 429,
+    which the rate limiter handles) and bugs are not.
+    """
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status >= 500
+    return any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(error).__mro__)
+
+@dataclass
+class RetryPolicy:
+    """Bounded retries with exponential backoff and full jitter."""
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to sleep after the given failed attempt (0-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+class LatencyTracker:
+    """Rolling window of call latencies."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        """
+        Args:
+            window: Most recent latencies kept
+            min_samples: Samples needed before percentiles are reported
+        """
+        self.min_samples = min_samples
+        self._samples: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """The q-th quantile (0-1) of recent latencies, or None if too few samples."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class CircuitBreaker:
+    """
+    Stops calling a model after repeated failures.
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    fail fast. Once reset_timeout has passed a single trial call is let
+    through; its success closes the circuit, its failure reopens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may be made now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.warning("Circuit opened after %d failures", self._failures)
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+
+class Resilience:
+    """
+    Retries, hedging and circuit breaking around calls to one model.
+
+    Only transient errors (see is_transient_error) are retried and count
+    towards opening the circuit; any other error is raised at once, and
+    counts as the model having answered.
+
+    A call slower than the hedge percentile of its kind's recent latencies
+    gets a duplicate request, and whichever answers first wins. Hedges cost
+    extra tokens, so they are limited to hedge_percentile's tail. While
+    hedging is active calls run on this object's worker pool so the caller
+    can stop waiting on a slow one. The losing request cannot be stopped
+    and holds its worker until it ends, so calls run unhedged on the
+    caller's thread while every worker is busy.
+    """
+
+    def __init__(
+        self,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        hedge_percentile: Optional[float] = 0.95,
+        max_workers: int = 32
+    ):
+        """
+        Args:
+            retry: Retry policy (defaults to RetryPolicy())
+            breaker: Circuit breaker (defaults to CircuitBreaker())
+            hedge_percentile: Latency quantile after which a hedge is sent
+                (None disables hedging)
+            max_workers: Size of the pool running hedged calls
+        """
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge_percentile = hedge_percentile
+        self.max_workers = max_workers
+        self._latencies: Dict[str, LatencyTracker] = {}
+        self._stats = {"calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "rejected": 0}
+        self._in_flight = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Worker pool running hedged requests."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="hedge"
+                )
+        return self._executor
+
+    def close(self) -> None:
+        """Shut down the hedging pool; a later call starts a new one."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _tracker(self, kind: str) -> LatencyTracker:
+        with self._lock:
+            tracker = self._latencies.get(kind)
+            if tracker is None:
+                tracker = self._latencies[kind] = LatencyTracker()
+            return tracker
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def call(self, kind: str, fn: Callable[[], T]) -> T:
+        """
+        Run fn with retries, hedging and the circuit breaker.
+
+        Args:
+            kind: Type of call; latencies are tracked per kind
+            fn: The model call, including parsing of its answer
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+            Exception: A non-transient error at once, or the last transient
+                error once every attempt failed
+        """
+        self._count("calls")
+        for attempt in range(self.retry.max_attempts):
+            if not self.breaker.allow():
+                self._count("rejected")
+                raise CircuitOpenError("Circuit breaker is open; call skipped")
+            try:
+                result = self._hedged(kind, fn)
+            except Exception as e:
+                if not is_transient_error(e):
+                    # The model is reachable; only its answer or our request was bad
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt == self.retry.max_attempts - 1:
+                    raise
+                self._count("retries")
+                logger.warning("%s call failed (%s); retrying", kind, e)
+                time.sleep(self.retry.delay(attempt))
+            else:
+                self.breaker.record_success()
+                return result
+
+    def _timed(self, kind: str, fn: Callable[[], T]) -> T:
+        started = time.monotonic()
+        result = fn()
+        self._tracker(kind).record(time.monotonic() - started)
+        return result
+
+    def _submit(self, kind: str, fn: Callable[[], T]) -> Optional[Future]:
+        """Start fn on the worker pool, or return None if every worker is busy."""
+        with self._lock:
+            if self._in_flight >= self.max_workers:
+                return None
+            self._in_flight += 1
+        future = self.executor.submit(contextvars.copy_context().run, self._timed, kind, fn)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def _hedged(self, kind: str, fn: Callable[[], T]) -> T:
+        threshold = None
+        if self.hedge_percentile is not None:
+            threshold = self._tracker(kind).percentile(self.hedge_percentile)
+        primary = self._submit(kind, fn) if threshold is not None else None
+        if primary is None:
+            return self._timed(kind, fn)
+
+        done, _ = wait([primary], timeout=threshold)
+        hedge = None if done else self._submit(kind, fn)
+        if hedge is None:
+            return primary.result()
+
+        self._count("hedges")
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._count("hedge_wins")
+                    for loser in pending:
+                        loser.cancel()
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    @property
+    def stats(self) -> Dict[str, object]:
+        """Call counters, circuit state and p95 latency per kind."""
+        with self._lock:
+            stats: Dict[str, object] = dict(self._stats)
+            trackers = dict(self._latencies)
+        stats["circuit"] = self.breaker.state
+        stats["p95_seconds"] = {kind: t.percentile(0.95) for kind, t in trackers.items()}
+        return stats
@@ -0,0 +1,67 @@
+from typing import Callable, Dict, Iterator, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+import itertools
+import threading
+
+# Called with (model_name, text, attempt) for every piece of a streamed
+# model answer; attempt changes when a retry starts the answer over
+TokenListener = Callable[[str, str, int], None]
+
+# Attempt numbers, unique within the process
+_attempts = itertools.count(1)
+
+class _TokenStream:
+    """A listener and the attempt currently streaming to it for each model."""
+
+    def __init__(self, listener: TokenListener):
+        self.listener = listener
+        self.streaming: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+_stream: ContextVar[Optional[_TokenStream]] = ContextVar("token_stream", default=None)
+
+@contextmanager
+def stream_tokens(listener: Optional[TokenListener]) -> Iterator[None]:
+    """
+    Stream the answers of model calls made in this context to listener.
+
+    Calls are streamed rather than invoked while a listener is set; cached
+    grades produce no tokens. Only one attempt per model streams at a
+    time: a hedged duplicate runs silently, and a retry after a failed
+    attempt streams under a new attempt number so the listener can discard
+    the partial answer. As with request_priority, work handed to an
+    executor must be submitted through contextvars.copy_context().run to
+    inherit it.
+    """
+    token = _stream.set(_TokenStream(listener) if listener is not None else None)
+    try:
+        yield
+    finally:
+        _stream.reset(token)
+
+@contextmanager
+def token_stream(model_name: str) -> Iterator[Optional[Callable[[str], None]]]:
+    """
+    Claim the stream for one attempt at a model call.
+
+    Yields a function sending a piece of the answer to the listener, or
+    None if no listener is set or another attempt of the model is already
+    streaming.
+    """
+    stream = _stream.get()
+    attempt = next(_attempts)
+    if stream is not None:
+        with stream.lock:
+            if model_name in stream.streaming:
+                stream = None
+            else:
+                stream.streaming[model_name] = attempt
+    if stream is None:
+        yield None
+        return
+    try:
+        yield lambda text: stream.listener(model_name, text, attempt)
+    finally:
+        with stream.lock:
+            del stream.streaming[model_name]
@@ -0,0 +1,107 @@
+from typing import Dict, List, Optional
+from dataclasses import dataclass
+from functools import lru_cache
+import logging
+import threading
+
+try:
+    import tiktoken
+except ImportError:  # Fall back to a character-based estimate
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# USD per 1K tokens as (prompt, completion)
+MODEL_PRICING: Dict[str, tuple] = {
+    "gpt-4": (0.03, 0.06),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4o": (0.005, 0.015),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+}
+
+# Context window sizes in tokens
+CONTEXT_WINDOWS: Dict[str, int] = {
+    "gpt-4": 8192,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+    "gpt-3.5-turbo": 16385,
+}
+
+# Share of the context window a submission may fill; the rest is left
+# for the rubric, format instructions and the model's answer
+SUBMISSION_WINDOW_SHARE = 0.6
+
+# Rough characters per token for English text when tiktoken is unavailable
+CHARS_PER_TOKEN = 4
+
+@lru_cache(maxsize=None)
+def _encoding(model_name: str):
+    """Load the model's tokenizer, or None if it cannot be loaded (e.g. offline)."""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        return _encoding("gpt-4")
+    except Exception:
+        logger.warning("Tokenizer for %s unavailable; estimating token counts", model_name)
+        return None
+
+def count_tokens(text: str, model_name: str = "gpt-4") -> int:
+    """Count the tokens text occupies for the given model."""
+    encoding = _encoding(model_name)
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+def submission_token_budget(model_name: str) -> Optional[int]:
+    """Largest submission, in tokens, that fits the model's context in one prompt."""
+    window = CONTEXT_WINDOWS.get(model_name)
+    return int(window * SUBMISSION_WINDOW_SHARE) if window else None
+
+def estimate_cost(model_name: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimate the USD cost of a call; unknown models are priced at zero."""
+    prompt_price, completion_price = MODEL_PRICING.get(model_name, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+
+@dataclass
+class UsageRecord:
+    """Token usage and cost of a single model call."""
+    model_name: str
+    kind: str  # "single", "batch", "map" or "reduce"
+    prompt_tokens: int
+    completion_tokens: int
+    cost: float
+    cached_prompt_tokens: int = 0  # prompt prefix the provider served from its cache
+
+class UsageLedger:
+    """Thread-safe log of model calls with running totals."""
+
+    def __init__(self, keep_records: int = 10_000):
+        """
+        Args:
+            keep_records: Most recent records retained for inspection
+        """
+        self.keep_records = keep_records
+        self.records: List[UsageRecord] = []
+        self._totals = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                        "cached_prompt_tokens": 0, "cost": 0.0}
+        self._lock = threading.Lock()
+
+    def record(self, record: UsageRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+            if len(self.records) > self.keep_records:
+                del self.records[:len(self.records) - self.keep_records]
+            self._totals["calls"] += 1
+            self._totals["prompt_tokens"] += record.prompt_tokens
+            self._totals["completion_tokens"] += record.completion_tokens
+            self._totals["cached_prompt_tokens"] += record.cached_prompt_tokens
+            self._totals["cost"] += record.cost
+
+    @property
+    def totals(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._totals)
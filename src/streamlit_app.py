@@ -4,19 +4,70 @@ from typing import Dict
 import tempfile
 from src.input.file_processor import FileProcessor
 from src.grading.schema_loader import load_grading_schema
-from src.models.ai_models import AIGrader, ConsensusGrader
-from src.grading.grader import AssignmentGrader
+from src.grading.schema_registry import default_registry
+from src.grading.grader import AssignmentGrader, TokenChunk
+from src.grading.batch import BatchGradingJob
+from src.models.cache import GradingCache
+from src.models.pool import GraderService
+from src.models.tokens import UsageLedger
+from src.input.extraction_cache import ExtractionCache
+
+@st.cache_resource
+def get_grader_service() -> GraderService:
+    """
+    Graders shared by every session of this process, one per API key.
+
+    Configured from the GRADING_* environment variables (consensus
+    strategy, consistency iterations, retrieval, cache path).
+    """
+    service = GraderService.from_env()
+    # Drop cached grades of criteria whose rubric is edited in place
+    default_registry().add_listener(service.cache.schema_replaced)
+    return service
+
+def get_grading_cache() -> GradingCache:
+    """Grading result cache shared by every session of this process."""
+    return get_grader_service().cache
+
+@st.cache_resource
+def get_extraction_cache() -> ExtractionCache:
+    """Extracted-text cache shared by every session of this process."""
+    return ExtractionCache(os.getenv("EXTRACTION_CACHE_PATH", "extraction_cache.db"))
+
+def get_usage_ledger() -> UsageLedger:
+    """Token usage ledger shared by every session of this process."""
+    return get_grader_service().usage
 
 def initialize_grading_system(api_key: str) -> AssignmentGrader:
-    """Initialize the grading system with the provided API key."""
-    os.environ["OPENAI_API_KEY"] = api_key
+    """
+    Get the shared grader for the provided API key.
     
-    models = [
-        AIGrader(model_name="gpt-4"),
-        AIGrader(model_name="gpt-3.5-turbo"),
-    ]
-    consensus_grader = ConsensusGrader(models)
-    return AssignmentGrader(consensus_grader)
+    Sessions using the same key share one grader and its connections;
+    the first session to use a key also opens connections in the
+    background so its first grade doesn't pay for the handshakes. The
+    service closes the graders of keys unused for a while, so sessions
+    call this each time they grade instead of keeping the grader.
+    """
+    service = get_grader_service()
+    service.warm_up(api_key)
+    return service.grader(api_key)
+
+def show_criterion(slot, criterion_name: str, grade, spread=None) -> None:
+    """Fill a criterion's slot with its grade."""
+    with slot.container(border=True):
+        st.markdown(f"**Criterion: {criterion_name}**")
+        if grade is None:
+            st.warning("No model produced a usable grade; needs manual review")
+            return
+        st.write(f"Points: {grade.points:.1f}")
+        st.write(f"Confidence: {grade.confidence:.2f}")
+        if spread is not None:
+            st.write(
+                f"Spread over {spread.iterations} gradings: "
+                f"std {spread.std_points:.1f}, range {spread.range_points:.1f}, "
+                f"model agreement {spread.model_agreement:.2f}"
+            )
+        st.write("Explanation:", grade.explanation)
 
 def main():
     st.title("Assignment Grading System")
@@ -24,7 +75,6 @@ def main():
     # API Key Input (with secure handling)
     if "openai_api_key" not in st.session_state:
         st.session_state.openai_api_key = ""
-        st.session_state.grader = None
     
     with st.sidebar:
         st.header("Configuration")
@@ -39,11 +89,10 @@ def main():
             st.session_state.openai_api_key = api_key
             if api_key:
                 try:
-                    st.session_state.grader = initialize_grading_system(api_key)
+                    initialize_grading_system(api_key)
                     st.success("API key configured successfully!")
                 except Exception as e:
                     st.error(f"Error configuring API key: {str(e)}")
-                    st.session_state.grader = None
     
     if not st.session_state.openai_api_key:
         st.warning("Please enter your OpenAI API key in the sidebar to continue.")
@@ -64,47 +113,141 @@ def main():
             zip_path = tmp_file.name
         
         try:
-            # Process the uploaded file
-            processor = FileProcessor()
-            contents = processor.extract_from_zip(zip_path)
-            
             # Display file contents and grade each submission
             st.header("Grading Results")
             
-            for filename, content in contents.items():
+            if st.button("Grade all submissions"):
+                # NumPy loads only once a batch is graded, not on startup
+                from src.grading.analytics import CohortResults
+                from src.grading.compact import CompactResults
+                job = BatchGradingJob(
+                    initialize_grading_system(st.session_state.openai_api_key),
+                    load_grading_schema("1"),
+                    extraction_cache=get_extraction_cache()
+                )
+                progress_bar = st.progress(0.0)
+                status = st.empty()
+                table = st.empty()
+                rows = []
+                cohort = CohortResults()
+                # Kept across reruns; explanations are spilled to disk
+                batch_results = CompactResults()
+                
+                def show_progress(outcome, progress):
+                    progress_bar.progress(progress.fraction)
+                    status.text(
+                        f"Graded {progress.completed}/{progress.total} submissions "
+                        f"({progress.failed} failed)"
+                    )
+                
+                for outcome in job.run(zip_path, on_progress=show_progress):
+                    grade = outcome.grade
+                    if grade is not None:
+                        cohort.add(outcome.filename, grade)
+                        batch_results.add(outcome.filename, grade)
+                    rows.append({
+                        "Assignment": outcome.filename,
+                        "Total Points": grade.total_points if grade else None,
+                        "Confidence": round(grade.overall_confidence, 2) if grade else None,
+                        "Needs Review": grade.needs_review if grade else True,
+                        "Error": outcome.error or ""
+                    })
+                    table.dataframe(rows)
+                
+                st.session_state.graded_count = (
+                    getattr(st.session_state, "graded_count", 0) + len(rows)
+                )
+                st.session_state.batch_results = batch_results
+                
+                if len(cohort):
+                    st.subheader("Cohort Analytics")
+                    st.dataframe([
+                        {"Criterion": name, **summary}
+                        for name, summary in cohort.criterion_summary().items()
+                    ])
+                    outliers = cohort.outliers()
+                    if outliers:
+                        st.write("Outlying grades")
+                        st.dataframe(outliers)
+                    st.download_button(
+                        "Download results (CSV)",
+                        data=cohort.csv_bytes(),
+                        file_name="grades.csv",
+                        mime="text/csv"
+                    )
+            
+            batch_results = st.session_state.get("batch_results")
+            if batch_results:
+                with st.expander("Review batch explanations"):
+                    graded = {grade.submission_id: grade for grade in batch_results}
+                    submission_id = st.selectbox("Submission", list(graded))
+                    grade = graded[submission_id]
+                    criterion_name = st.selectbox("Criterion", grade.criterion_names)
+                    # Loaded from disk only now that a reviewer asked for it
+                    st.write(grade.explanation(criterion_name))
+            
+            # Each submission is shown as soon as it is extracted, without
+            # holding the whole archive's text in memory
+            submissions = FileProcessor.iter_from_zip(
+                zip_path,
+                cache=get_extraction_cache(),
+                on_error=lambda filename, e: st.warning(f"Could not read {filename}: {e}")
+            )
+            for filename, content in submissions:
                 with st.expander(f"Assignment: {filename}"):
                     st.text_area("Content", content, height=200)
                     
                     if st.button(f"Grade {filename}"):
-                        with st.spinner("Grading submission..."):
-                            try:
-                                # Load schema (using assignment_id=1 for demo)
-                                schema = load_grading_schema("1")
-                                
-                                # Grade the submission
-                                grade_result = st.session_state.grader.grade_assignment(
-                                    content,
-                                    schema
-                                )
-                                
-                                # Display results
-                                st.subheader("Grading Results")
-                                st.metric("Total Points", f"{grade_result.total_points:.1f}/100")
+                        try:
+                            # Load schema (using assignment_id=1 for demo)
+                            schema = load_grading_schema("1")
+                            
+                            st.subheader("Grading Results")
+                            summary = st.empty()
+                            summary.info(f"Grading {len(schema.criteria)} criteria...")
+                            
+                            # One slot per criterion, filled as soon as it is graded
+                            st.subheader("Detailed Breakdown")
+                            slots = {criterion.name: st.empty() for criterion in schema.criteria}
+                            streamed: Dict[tuple, tuple] = {}
+                            grade_result = None
+                            grader = initialize_grading_system(st.session_state.openai_api_key)
+                            for update in grader.iter_grade_assignment(
+                                content, schema, stream=True
+                            ):
+                                if isinstance(update, TokenChunk):
+                                    key = (update.criterion_name, update.model_name)
+                                    attempt, text = streamed.get(key, (update.attempt, ""))
+                                    # A retry starts the answer over
+                                    if attempt != update.attempt:
+                                        text = ""
+                                    streamed[key] = (update.attempt, text + update.text)
+                                    slots[update.criterion_name].caption(
+                                        f"{update.criterion_name} - {update.model_name} is answering: "
+                                        f"...{streamed[key][1][-300:]}"
+                                    )
+                                    continue
+                                summary.info(f"Graded {update.completed}/{update.total} criteria...")
+                                show_criterion(slots[update.criterion_name], update.criterion_name, update.result)
+                                grade_result = update.grade
+                            
+                            with summary.container():
+                                st.metric("Total Points", f"{grade_result.total_points:.1f}/{schema.total_points:g}")
                                 st.metric("Confidence Score", f"{grade_result.overall_confidence:.2f}")
-                                
                                 if grade_result.needs_review:
                                     st.warning("This submission needs manual review")
-                                
-                                # Display individual criterion grades
-                                st.subheader("Detailed Breakdown")
+                            
+                            if grade_result.consistency:
                                 for criterion_name, grade in grade_result.criterion_grades.items():
-                                    with st.expander(f"Criterion: {criterion_name}"):
-                                        st.write(f"Points: {grade.points:.1f}")
-                                        st.write(f"Confidence: {grade.confidence:.2f}")
-                                        st.write("Explanation:", grade.explanation)
-                                
-                            except Exception as e:
-                                st.error(f"Error grading submission: {str(e)}")
+                                    show_criterion(
+                                        slots[criterion_name],
+                                        criterion_name,
+                                        grade,
+                                        grade_result.consistency[criterion_name]
+                                    )
+                            
+                        except Exception as e:
+                            st.error(f"Error grading submission: {str(e)}")
             
         except Exception as e:
             st.error(f"Error processing file: {str(e)}")
@@ -116,6 +259,25 @@ def main():
     if hasattr(st.session_state, 'graded_count'):
         st.sidebar.header("Statistics")
         st.sidebar.metric("Assignments Graded", st.session_state.graded_count)
+    
+    if st.session_state.get("batch_results"):
+        st.sidebar.metric(
+            "Memory per Graded Submission",
+            f"{st.session_state.batch_results.memory_per_submission():,.0f} bytes"
+        )
+    
+    cache_stats = get_grading_cache().stats
+    st.sidebar.header("Result Cache")
+    st.sidebar.metric("Cache Hits", cache_stats["hits"])
+    st.sidebar.metric("Cache Misses", cache_stats["misses"])
+    
+    extraction_stats = get_extraction_cache().stats
+    st.sidebar.metric("Parsing Time Saved", f"{extraction_stats['seconds_saved']:.1f}s")
+    
+    usage_totals = get_usage_ledger().totals
+    st.sidebar.header("Model Usage")
+    st.sidebar.metric("Tokens Used", f"{usage_totals['prompt_tokens'] + usage_totals['completion_tokens']:,}")
+    st.sidebar.metric("Estimated Cost", f"${usage_totals['cost']:.2f}")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
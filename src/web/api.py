@@ -1,28 +1,132 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Query, UploadFile, File
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
-from typing import List, Dict
+from starlette.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+import json
 import os
-from datetime import datetime
+import shutil
+import tempfile
+import zipfile
 
-from ..grading.grader import AssignmentGrader, AssignmentGrade
-from ..models.ai_models import ConsensusGrader, AIGrader
-from .models import ReviewSubmission, GradeAdjustment
+from ..grading.grader import AssignmentGrade, AssignmentGrader, CriterionGraded
+from ..grading.batch import BatchGradingJob, BatchProgress, SubmissionOutcome
+from ..input.extraction_cache import ExtractionCache
+from ..models.ai_models import AdaptiveConsensusGrader, ConsensusResult
+from ..models.pool import shared_service
+from ..models.rate_limit import rate_limit_statistics
+from ..models.prompts import prompt_statistics
+from .models import FlaggedPage, GradeAdjustment, BulkGradingRequest
+from .store import SQLiteReviewStore, PENDING, REVIEWED, STATISTICS_SCOPES
+from .jobs import Job, JobManager, JobQueueFull, SUCCEEDED
 from ..grading.schema_loader import load_grading_schema
+from ..grading.schema_registry import default_registry
 
-app = FastAPI(title="Assignment Grading System")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up once the server starts rather than on import, so the model
+    # backend does not load while the rest of the app is still importing
+    if os.getenv("GRADING_WARM_UP", "1") == "1":
+        grader_service.warm_up(os.getenv("OPENAI_API_KEY"))
+    yield
+
+app = FastAPI(title="Assignment Grading System", lifespan=lifespan)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-# Initialize grading components
-models = [
-    AIGrader(model_name="gpt-4"),
-    AIGrader(model_name="gpt-3.5-turbo"),
-]
-consensus_grader = ConsensusGrader(models)
-assignment_grader = AssignmentGrader(consensus_grader)
+# Initialize grading components from the process-wide grader service,
+# which owns the shared cache, usage ledger and pooled HTTP connections
+grader_service = shared_service()
+grading_cache = grader_service.cache
+usage_ledger = grader_service.usage
+
+# Rubric definitions, loaded at startup and reloaded when their files change
+schema_registry = default_registry()
+if grading_cache is not None:
+    # Drop cached grades of criteria whose rubric is edited in place
+    schema_registry.add_listener(grading_cache.schema_replaced)
+
+extraction_cache = ExtractionCache(os.getenv("EXTRACTION_CACHE_PATH", "extraction_cache.db"))
+
+# Persistent review storage, shared by every worker process
+review_store = SQLiteReviewStore(os.getenv("REVIEW_STORE_PATH", "reviews.db"))
+
+# Background grading jobs, run on worker threads off the event loop
+job_manager = JobManager(
+    max_workers=int(os.getenv("GRADING_JOB_WORKERS", "4")),
+    max_pending=int(os.getenv("GRADING_JOB_MAX_PENDING", "100"))
+)
+
+def current_grader() -> AssignmentGrader:
+    """
+    The grader for this process's API key.
+
+    Fetched from the service on every use: a grader evicted by other keys
+    has its connections closed.
+    """
+    return grader_service.grader(os.getenv("OPENAI_API_KEY"))
+
+def answering_models(grade_result: AssignmentGrade) -> List[str]:
+    """Models that answered for at least one criterion, in first-seen order."""
+    names: Dict[str, None] = {}
+    for result in grade_result.criterion_grades.values():
+        if isinstance(result, ConsensusResult):
+            names.update(dict.fromkeys(result.model_points))
+    return list(names)
+
+def flag_if_needed(submission_text: str, assignment_id: str, grade_result: AssignmentGrade) -> None:
+    """Add a graded submission to the review queue if it needs review."""
+    if grade_result.needs_review:
+        review_store.add_flagged(
+            submission_text=submission_text,
+            original_grade=grade_result.total_points,
+            confidence_score=grade_result.overall_confidence,
+            assignment_id=assignment_id,
+            # Adjustments are attributed to the models whose answers made the grade
+            models=answering_models(grade_result)
+        )
+
+def grade_response(grade_result: AssignmentGrade) -> Dict:
+    return {
+        "grade": grade_result.total_points,
+        "confidence": grade_result.overall_confidence,
+        "needs_review": grade_result.needs_review,
+        "criterion_grades": grade_result.criterion_grades,
+        "consistency": grade_result.consistency
+    }
 
-# In-memory storage (replace with database in production)
-flagged_submissions: Dict[str, ReviewSubmission] = {}
-grade_adjustments: List[GradeAdjustment] = []
+def grade_and_flag(submission_text: str, assignment_id: str, on_criterion=None) -> Dict:
+    """
+    Grade a submission and flag it for review if needed (blocking).
+    
+    Args:
+        submission_text: The submission to grade
+        assignment_id: Assignment whose schema applies
+        on_criterion: Optional callback receiving each CriterionGraded as
+            soon as that criterion is graded
+    """
+    # Load grading schema for this assignment (implement this)
+    schema = load_grading_schema(assignment_id)
+    
+    # Grade the submission
+    assignment_grader = current_grader()
+    if on_criterion is None:
+        grade_result = assignment_grader.grade_assignment(submission_text, schema)
+    else:
+        grade_result = None
+        for update in assignment_grader.iter_grade_assignment(submission_text, schema):
+            on_criterion(update)
+            if update.grade is not None:
+                grade_result = update.grade
+        if grade_result is None:
+            # A schema without criteria yields no updates
+            grade_result = assignment_grader.grade_assignment(submission_text, schema)
+    
+    # If needs review, add to flagged submissions
+    flag_if_needed(submission_text, assignment_id, grade_result)
+    
+    return grade_response(grade_result)
 
 @app.post("/grade")
 async def grade_submission(
@@ -30,73 +134,299 @@ async def grade_submission(
     assignment_id: str,
     token: str = Depends(oauth2_scheme)
 ):
-    """Grade a new submission."""
+    """Grade a new submission and wait for the result."""
     try:
-        # Load grading schema for this assignment (implement this)
-        schema = load_grading_schema(assignment_id)
-        
-        # Grade the submission
-        grade_result = assignment_grader.grade_assignment(submission_text, schema)
-        
-        # If needs review, add to flagged submissions
-        if grade_result.needs_review:
-            submission_id = f"sub_{len(flagged_submissions) + 1}"
-            flagged_submissions[submission_id] = ReviewSubmission(
-                submission_id=submission_id,
-                submission_text=submission_text,
-                original_grade=grade_result.total_points,
-                confidence_score=grade_result.overall_confidence
-            )
-        
-        return {
-            "grade": grade_result.total_points,
-            "confidence": grade_result.overall_confidence,
-            "needs_review": grade_result.needs_review,
-            "criterion_grades": grade_result.criterion_grades
-        }
+        # Run in a worker thread so other requests are served meanwhile
+        return await run_in_threadpool(grade_and_flag, submission_text, assignment_id)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _get_job(job_id: str) -> Job:
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.post("/jobs", status_code=202)
+async def submit_grading_job(
+    submission_text: str,
+    assignment_id: str,
+    token: str = Depends(oauth2_scheme)
+):
+    """Queue a submission for grading and return its job ID immediately."""
+    def run(job: Job) -> Dict:
+        job.publish({"event": "progress", "stage": "grading"})
+        
+        def publish_criterion(update: CriterionGraded) -> None:
+            # Stops grading the remaining criteria once the job is cancelled
+            job.check_cancelled()
+            job.publish(jsonable_encoder({
+                "event": "criterion",
+                "criterion": update.criterion_name,
+                "completed": update.completed,
+                "total": update.total,
+                "result": update.result
+            }))
+            
+        return grade_and_flag(submission_text, assignment_id, publish_criterion)
+
+    return _submit_job("grade", run)
+
+def _submit_job(kind: str, run, cleanup=None) -> Dict:
+    try:
+        job = job_manager.submit(kind, run, cleanup)
+    except JobQueueFull:
+        if cleanup is not None:
+            cleanup()
+        raise HTTPException(
+            status_code=429,
+            detail="Too many grading jobs pending; retry later",
+            headers={"Retry-After": "5"}
+        )
+    return {"job_id": job.job_id, "status": job.status}
+
+def grade_bulk(job: Job, assignment_id: str, source) -> Dict:
+    """
+    Grade many submissions to one assignment as a single pipelined batch.
+
+    Every submission goes through the shared grader, so they share its
+    result cache, model executors and concurrency limits.
+
+    Args:
+        job: Job receiving one progress event per graded submission
+        assignment_id: Assignment whose schema applies to every submission
+        source: Called with the BatchGradingJob and progress callback;
+            returns the iterator of outcomes
+    """
+    schema = load_grading_schema(assignment_id)
+    batch = BatchGradingJob(
+        current_grader(),
+        schema,
+        extraction_workers=int(os.getenv("GRADING_BULK_EXTRACTION_WORKERS", "2")),
+        grading_workers=int(os.getenv("GRADING_BULK_WORKERS", "4")),
+        extraction_cache=extraction_cache
+    )
+    job.on_cancel(batch.cancel)
+
+    results = []
+    # Imported here so NumPy only loads once a bulk job runs
+    from ..grading.analytics import CohortResults
+    cohort = CohortResults()
+
+    def report(outcome: SubmissionOutcome, progress: BatchProgress) -> None:
+        result = {"submission_id": outcome.filename, "error": outcome.error}
+        if outcome.grade is not None:
+            flag_if_needed(outcome.text, assignment_id, outcome.grade)
+            result.update(grade_response(outcome.grade))
+            cohort.add(outcome.filename, outcome.grade)
+        results.append(result)
+        job.publish({
+            "event": "progress",
+            "completed": progress.completed,
+            "failed": progress.failed,
+            "total": progress.total,
+            "submission": result
+        })
+
+    for _ in source(batch, report):
+        pass
+    job.check_cancelled()
+    return {
+        "total": len(results),
+        "failed": sum(1 for r in results if r["error"]),
+        "results": results,
+        "analytics": cohort.report()
+    }
+
+@app.post("/jobs/bulk", status_code=202)
+async def submit_bulk_grading_job(
+    request: BulkGradingRequest,
+    token: str = Depends(oauth2_scheme)
+):
+    """Queue many submissions to one assignment as a single grading job."""
+    submissions = [(s.submission_id, s.submission_text) for s in request.submissions]
+    return _submit_job(
+        "bulk",
+        lambda job: grade_bulk(
+            job, request.assignment_id, lambda batch, report: batch.run_texts(submissions, report)
+        )
+    )
+
+def _save_upload(upload: UploadFile) -> str:
+    """Copy an uploaded archive to a temporary file in fixed-size chunks."""
+    with tempfile.NamedTemporaryFile(suffix=".zip", delete=False) as tmp:
+        try:
+            shutil.copyfileobj(upload.file, tmp, 1024 * 1024)
+        except BaseException:
+            # delete=False leaves the file behind unless removed here
+            tmp.close()
+            os.remove(tmp.name)
+            raise
+    if not zipfile.is_zipfile(tmp.name):
+        os.remove(tmp.name)
+        raise HTTPException(status_code=400, detail="Upload is not a ZIP archive")
+    return tmp.name
+
+@app.post("/jobs/bulk-zip", status_code=202)
+async def submit_zip_grading_job(
+    assignment_id: str,
+    file: UploadFile = File(...),
+    token: str = Depends(oauth2_scheme)
+):
+    """Queue every submission in an uploaded ZIP archive as a single grading job."""
+    zip_path = await run_in_threadpool(_save_upload, file)
+    return _submit_job(
+        "bulk",
+        lambda job: grade_bulk(job, assignment_id, lambda batch, report: batch.run(zip_path, report)),
+        cleanup=lambda: os.remove(zip_path)
+    )
+
+@app.get("/jobs/{job_id}")
+async def get_grading_job(
+    job_id: str,
+    token: str = Depends(oauth2_scheme)
+):
+    """Poll a job's status, and its result once finished."""
+    return _get_job(job_id).summary()
+
+@app.get("/jobs/{job_id}/events")
+async def stream_grading_job(
+    job_id: str,
+    token: str = Depends(oauth2_scheme)
+):
+    """Stream a job's progress as server-sent events until it finishes."""
+    job = _get_job(job_id)
+
+    async def events():
+        async for event in job_manager.stream(job):
+            if event.get("event") == "status" and event.get("status") == SUCCEEDED:
+                event = {**event, "result": job.result}
+            yield f"data: {json.dumps(jsonable_encoder(event))}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@app.delete("/jobs/{job_id}")
+async def cancel_grading_job(
+    job_id: str,
+    token: str = Depends(oauth2_scheme)
+):
+    """Cancel a queued or running job; a running job's result is discarded."""
+    job = _get_job(job_id)
+    job_manager.cancel(job_id)
+    return {"job_id": job.job_id, "status": job.status, "cancel_requested": True}
+
+# The review endpoints are plain functions so FastAPI runs their blocking
+# SQLite calls in its threadpool instead of on the event loop
 @app.get("/flagged-submissions")
-async def get_flagged_submissions(
+def get_flagged_submissions(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    assignment_id: Optional[str] = None,
+    reviewer: Optional[str] = None,
+    status: Optional[str] = Query(None, pattern=f"^({PENDING}|{REVIEWED})$"),
     token: str = Depends(oauth2_scheme)
-) -> List[ReviewSubmission]:
-    """Get all submissions that need review."""
-    return list(flagged_submissions.values())
+) -> FlaggedPage:
+    """
+    Get one page of submissions flagged for review; pass the page's
+    next_cursor to get the next one.
+    """
+    try:
+        return review_store.list_flagged(
+            limit=limit,
+            cursor=cursor,
+            assignment_id=assignment_id,
+            reviewer=reviewer,
+            status=status
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/review-submission")
-async def review_submission(
+def review_submission(
     adjustment: GradeAdjustment,
     token: str = Depends(oauth2_scheme)
 ):
     """Submit a grade adjustment after review."""
-    if adjustment.submission_id not in flagged_submissions:
+    try:
+        # Record the adjustment and update the review status together
+        review_store.record_adjustment(adjustment)
+    except KeyError:
         raise HTTPException(status_code=404, detail="Submission not found")
-        
-    # Record the adjustment
-    grade_adjustments.append(adjustment)
-    
-    # Update the review status
-    submission = flagged_submissions[adjustment.submission_id]
-    submission.reviewed_at = datetime.now()
-    submission.reviewed_by = adjustment.reviewer
-    submission.review_notes = adjustment.adjustment_reason
     
     return {"message": "Grade adjustment recorded successfully"}
 
 @app.get("/review-statistics")
-async def get_review_statistics(
+def get_review_statistics(
     token: str = Depends(oauth2_scheme)
 ):
     """Get statistics about the review process."""
-    total_flagged = len(flagged_submissions)
-    total_reviewed = len([s for s in flagged_submissions.values() if s.reviewed_at])
-    total_adjustments = len(grade_adjustments)
-    
+    return review_store.statistics()
+
+@app.get("/review-statistics/{scope}")
+def get_review_statistics_breakdown(
+    scope: str,
+    limit: int = Query(100, ge=1, le=1000),
+    token: str = Depends(oauth2_scheme)
+):
+    """Get review statistics per assignment, criterion, model, hour or day."""
+    if scope not in STATISTICS_SCOPES:
+        raise HTTPException(status_code=404, detail=f"Unknown breakdown: {scope}")
+    return review_store.statistics_breakdown(scope, limit)
+
+@app.get("/schemas")
+async def get_schemas(
+    token: str = Depends(oauth2_scheme)
+):
+    """Get the schema versions registered for each assignment."""
+    return schema_registry.available()
+
+@app.get("/cache-statistics")
+async def get_cache_statistics(
+    token: str = Depends(oauth2_scheme)
+):
+    """Get hit/miss counters for the grading result cache, or {"enabled": False} without one."""
+    if grading_cache is None:
+        return {"enabled": False}
+    return grading_cache.stats
+
+@app.get("/usage-statistics")
+async def get_usage_statistics(
+    token: str = Depends(oauth2_scheme)
+):
+    """Get token usage and estimated cost of all model calls."""
+    return usage_ledger.totals
+
+@app.get("/rate-limit-statistics")
+async def get_rate_limit_statistics(
+    token: str = Depends(oauth2_scheme)
+):
+    """Get pacing, waiting and throttling counters per model."""
+    return rate_limit_statistics()
+
+@app.get("/prompt-statistics")
+async def get_prompt_statistics(
+    token: str = Depends(oauth2_scheme)
+):
+    """Get how often compiled prompt prefixes were reused, and their tokens."""
+    return prompt_statistics()
+
+@app.get("/model-health")
+async def get_model_health(
+    token: str = Depends(oauth2_scheme)
+):
+    """Get retry, hedging and circuit breaker state per model ({"enabled": False} without resilience)."""
     return {
-        "total_flagged": total_flagged,
-        "total_reviewed": total_reviewed,
-        "total_adjustments": total_adjustments,
-        "review_completion_rate": total_reviewed / total_flagged if total_flagged > 0 else 0
-    } 
\ No newline at end of file
+        model.model_name: model.resilience.stats if model.resilience is not None else {"enabled": False}
+        for model in current_grader().consensus_grader.models
+    }
+
+@app.get("/consensus-statistics")
+async def get_consensus_statistics(
+    token: str = Depends(oauth2_scheme)
+):
+    """Get model calls made and saved by adaptive consensus."""
+    consensus_grader = current_grader().consensus_grader
+    if not isinstance(consensus_grader, AdaptiveConsensusGrader):
+        raise HTTPException(status_code=404, detail="Adaptive consensus is not enabled")
+    return consensus_grader.stats
\ No newline at end of file
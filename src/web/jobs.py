@@ -0,0 +1,201 @@
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+import asyncio
+import logging
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = {SUCCEEDED, FAILED, CANCELLED}
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are already queued or running."""
+
+class JobCancelled(Exception):
+    """Raised inside a job function to stop after a cancellation request."""
+
+@dataclass
+class Job:
+    """A unit of background work and the events it has published."""
+    job_id: str
+    kind: str
+    status: str = QUEUED
+    created_at: datetime = field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+    result: Any = None
+    error: Optional[str] = None
+    events: List[Dict] = field(default_factory=list)
+    cancel_requested: threading.Event = field(default_factory=threading.Event)
+    _future: Optional[Future] = field(default=None, repr=False)
+    _subscribers: List = field(default_factory=list, repr=False)
+    _cancel_callbacks: List[Callable[[], None]] = field(default_factory=list, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def publish(self, event: Dict) -> None:
+        """Record an event and push it to every live stream of this job."""
+        with self._lock:
+            self.events.append(event)
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    def on_cancel(self, callback: Callable[[], None]) -> None:
+        """Call callback when cancellation is requested, e.g. to stop a batch early."""
+        with self._lock:
+            self._cancel_callbacks.append(callback)
+        if self.cancel_requested.is_set():
+            callback()
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self.cancel_requested.is_set():
+                return
+            self.cancel_requested.set()
+            callbacks = list(self._cancel_callbacks)
+        for callback in callbacks:
+            callback()
+
+    def check_cancelled(self) -> None:
+        """Raise JobCancelled if cancellation was requested; call between steps."""
+        if self.cancel_requested.is_set():
+            raise JobCancelled()
+
+    def summary(self) -> Dict:
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error
+        }
+
+class JobManager:
+    """
+    Runs jobs on a worker pool off the event loop.
+
+    Jobs live in this process's memory; each uvicorn worker has its own
+    manager, so clients must poll the worker that accepted the job.
+    """
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 100, keep_finished: int = 1000):
+        """
+        Args:
+            max_workers: Jobs running at the same time
+            max_pending: Queued plus running jobs accepted before refusing more
+            keep_finished: Finished jobs retained for polling
+        """
+        self.max_pending = max_pending
+        self.keep_finished = keep_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jobs")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        kind: str,
+        fn: Callable[[Job], Any],
+        cleanup: Optional[Callable[[], None]] = None
+    ) -> Job:
+        """
+        Queue fn(job) to run in the background.
+
+        Args:
+            kind: Label reported with the job's status
+            fn: Work to run; receives the job to publish events and check cancellation
+            cleanup: Called once the job finishes, even if it never started
+
+        Raises:
+            JobQueueFull: If max_pending jobs are already queued or running
+        """
+        job = Job(job_id=uuid.uuid4().hex, kind=kind)
+        with self._lock:
+            if self._active >= self.max_pending:
+                raise JobQueueFull()
+            self._active += 1
+            self._jobs[job.job_id] = job
+            self._trim()
+        job.publish({"event": "status", "status": QUEUED})
+        job._future = self._executor.submit(self._run, job, fn, cleanup)
+        return job
+
+    def _run(self, job: Job, fn: Callable[[Job], Any], cleanup: Optional[Callable[[], None]]) -> None:
+        try:
+            job.check_cancelled()
+            job.status = RUNNING
+            job.publish({"event": "status", "status": RUNNING})
+            result = fn(job)
+            # Cancelled while running: the work finished but nobody wants it
+            job.check_cancelled()
+            job.result = result
+            job.status = SUCCEEDED
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = datetime.now()
+            with self._lock:
+                self._active -= 1
+            if cleanup is not None:
+                # A failing cleanup must not keep the job looking unfinished
+                try:
+                    cleanup()
+                except Exception:
+                    logger.exception("Cleanup of job %s failed", job.job_id)
+            job.publish({"event": "status", "status": job.status, "error": job.error})
+
+    def _trim(self) -> None:
+        """Forget the oldest finished jobs beyond keep_finished (lock held)."""
+        finished = [j for j in self._jobs.values() if j.status in FINISHED_STATES]
+        for job in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job.job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Request cancellation; queued jobs never start, running ones stop at their next check."""
+        job = self._jobs.get(job_id)
+        if job is not None and job.status not in FINISHED_STATES:
+            job.cancel()
+        return job
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"active": self._active, "max_pending": self.max_pending, "tracked": len(self._jobs)}
+
+    async def stream(self, job: Job) -> AsyncIterator[Dict]:
+        """Yield the job's past events, then new ones until it finishes."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        with job._lock:
+            backlog = list(job.events)
+            job._subscribers.append((loop, queue))
+        try:
+            for event in backlog:
+                yield event
+            if job.status in FINISHED_STATES and backlog and backlog[-1].get("status") == job.status:
+                return
+            while True:
+                event = await queue.get()
+                yield event
+                if event.get("event") == "status" and event.get("status") in FINISHED_STATES:
+                    return
+        finally:
+            with job._lock:
+                job._subscribers.remove((loop, queue))
@@ -6,12 +6,19 @@ class ReviewSubmission(BaseModel):
     """Model for submissions that need review."""
     submission_id: str
     submission_text: str
+    assignment_id: Optional[str] = None
+    models: List[str] = []
     original_grade: float
     confidence_score: float
     review_notes: Optional[str] = None
     reviewed_at: Optional[datetime] = None
     reviewed_by: Optional[str] = None
     
+class FlaggedPage(BaseModel):
+    """One page of flagged submissions."""
+    submissions: List[ReviewSubmission]
+    next_cursor: Optional[str] = None
+    
 class GradeAdjustment(BaseModel):
     """Model for grade adjustments made during review."""
     submission_id: str
@@ -19,4 +26,14 @@ class GradeAdjustment(BaseModel):
     original_points: float
     adjusted_points: float
     adjustment_reason: str
-    reviewer: str 
\ No newline at end of file
+    reviewer: str 
+
+class BulkSubmission(BaseModel):
+    """One submission in a bulk grading request."""
+    submission_id: str
+    submission_text: str
+
+class BulkGradingRequest(BaseModel):
+    """Model for grading many submissions to one assignment in a single job."""
+    assignment_id: str
+    submissions: List[BulkSubmission]
\ No newline at end of file
@@ -0,0 +1,442 @@
+from typing import Dict, List, Optional
+from abc import ABC, abstractmethod
+from datetime import datetime
+import sqlite3
+import threading
+from .models import FlaggedPage, ReviewSubmission, GradeAdjustment
+
+# Review states stored with each flagged submission
+PENDING = "pending"
+REVIEWED = "reviewed"
+
+# Breakdowns kept by the running review statistics
+STATISTICS_SCOPES = ("assignment", "criterion", "model", "hour", "day")
+
+class ReviewStore(ABC):
+    """Persistence interface for flagged submissions and grade adjustments."""
+
+    @abstractmethod
+    def add_flagged(
+        self,
+        submission_text: str,
+        original_grade: float,
+        confidence_score: float,
+        assignment_id: Optional[str] = None,
+        models: Optional[List[str]] = None
+    ) -> ReviewSubmission:
+        """Store a submission that needs review and assign it a unique ID."""
+
+    @abstractmethod
+    def get_submission(self, submission_id: str) -> Optional[ReviewSubmission]:
+        """Return a flagged submission, or None if it doesn't exist."""
+
+    @abstractmethod
+    def list_flagged(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        assignment_id: Optional[str] = None,
+        reviewer: Optional[str] = None,
+        status: Optional[str] = None
+    ) -> FlaggedPage:
+        """
+        Return one page of flagged submissions, oldest first.
+
+        Args:
+            limit: Submissions per page
+            cursor: next_cursor of the previous page (None = first page)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+
+    @abstractmethod
+    def record_adjustment(self, adjustment: GradeAdjustment) -> ReviewSubmission:
+        """
+        Record a grade adjustment and mark its submission as reviewed.
+
+        Raises:
+            KeyError: If the submission doesn't exist
+        """
+
+    @abstractmethod
+    def statistics(self) -> Dict[str, float]:
+        """Counts of flagged, reviewed and adjusted submissions."""
+
+    @abstractmethod
+    def statistics_breakdown(self, scope: str, limit: int = 100) -> Dict[str, Dict[str, float]]:
+        """Statistics per key of a scope (see STATISTICS_SCOPES)."""
+
+class SQLiteReviewStore(ReviewStore):
+    """
+    ReviewStore backed by SQLite.
+
+    The database file can be shared by several worker processes; IDs come
+    from SQLite's autoincrement inside a write transaction, so they never
+    collide. Review statistics are kept as running aggregates updated in
+    the same transaction as each flag or review, so reading them never
+    scans the submissions. Hour and day windows count reviews and
+    adjustments under the time the submission was flagged, so a window's
+    completion rate is the share of its flags reviewed so far.
+    """
+
+    def __init__(self, path: str = "reviews.db"):
+        """
+        Args:
+            path: SQLite database file (":memory:" for a throwaway store)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path,
+            check_same_thread=False,
+            isolation_level=None,
+            timeout=30
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS flagged_submissions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                submission_id TEXT UNIQUE,
+                assignment_id TEXT,
+                submission_text TEXT NOT NULL,
+                original_grade REAL NOT NULL,
+                confidence_score REAL NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                models TEXT,
+                flagged_at TEXT,
+                review_notes TEXT,
+                reviewed_at TEXT,
+                reviewed_by TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_flagged_assignment
+                ON flagged_submissions (assignment_id, id);
+            CREATE INDEX IF NOT EXISTS idx_flagged_reviewer
+                ON flagged_submissions (reviewed_by, id);
+            CREATE INDEX IF NOT EXISTS idx_flagged_status
+                ON flagged_submissions (status, id);
+
+            CREATE TABLE IF NOT EXISTS grade_adjustments (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                submission_id TEXT NOT NULL,
+                criterion_name TEXT NOT NULL,
+                original_points REAL NOT NULL,
+                adjusted_points REAL NOT NULL,
+                adjustment_reason TEXT NOT NULL,
+                reviewer TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_adjustments_submission
+                ON grade_adjustments (submission_id);
+            CREATE INDEX IF NOT EXISTS idx_adjustments_reviewer
+                ON grade_adjustments (reviewer);
+            """
+        )
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(flagged_submissions)")}
+        if "models" not in columns:
+            self._conn.execute("ALTER TABLE flagged_submissions ADD COLUMN models TEXT")
+        if "flagged_at" not in columns:
+            # Submissions flagged before this column existed stay out of the time windows
+            self._conn.execute("ALTER TABLE flagged_submissions ADD COLUMN flagged_at TEXT")
+
+        has_statistics = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'review_statistics'"
+        ).fetchone()
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS review_statistics (
+                scope TEXT NOT NULL,
+                key TEXT NOT NULL,
+                flagged INTEGER NOT NULL DEFAULT 0,
+                reviewed INTEGER NOT NULL DEFAULT 0,
+                adjustments INTEGER NOT NULL DEFAULT 0,
+                absolute_adjustment REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (scope, key)
+            )"""
+        )
+        if not has_statistics:
+            self.rebuild_statistics()
+
+    @staticmethod
+    def _to_submission(row: sqlite3.Row) -> ReviewSubmission:
+        return ReviewSubmission(
+            submission_id=row["submission_id"],
+            models=row["models"].split(",") if row["models"] else [],
+            assignment_id=row["assignment_id"],
+            submission_text=row["submission_text"],
+            original_grade=row["original_grade"],
+            confidence_score=row["confidence_score"],
+            review_notes=row["review_notes"],
+            reviewed_at=row["reviewed_at"],
+            reviewed_by=row["reviewed_by"]
+        )
+
+    def add_flagged(
+        self,
+        submission_text: str,
+        original_grade: float,
+        confidence_score: float,
+        assignment_id: Optional[str] = None,
+        models: Optional[List[str]] = None
+    ) -> ReviewSubmission:
+        models = models or []
+        flagged_at = datetime.now()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute(
+                    "INSERT INTO flagged_submissions "
+                    "(assignment_id, submission_text, original_grade, confidence_score, models, "
+                    "flagged_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (assignment_id, submission_text, original_grade, confidence_score,
+                     ",".join(models), flagged_at.isoformat())
+                )
+                submission_id = f"sub_{cursor.lastrowid}"
+                self._conn.execute(
+                    "UPDATE flagged_submissions SET submission_id = ? WHERE id = ?",
+                    (submission_id, cursor.lastrowid)
+                )
+                for scope, key in self._flag_keys(assignment_id, models, flagged_at):
+                    self._bump(scope, key, flagged=1)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return ReviewSubmission(
+            submission_id=submission_id,
+            assignment_id=assignment_id,
+            submission_text=submission_text,
+            original_grade=original_grade,
+            confidence_score=confidence_score,
+            models=models
+        )
+
+    def get_submission(self, submission_id: str) -> Optional[ReviewSubmission]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM flagged_submissions WHERE submission_id = ?",
+                (submission_id,)
+            ).fetchone()
+        return self._to_submission(row) if row is not None else None
+
+    def list_flagged(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        assignment_id: Optional[str] = None,
+        reviewer: Optional[str] = None,
+        status: Optional[str] = None
+    ) -> FlaggedPage:
+        clauses, params = [], []
+        if cursor is not None:
+            # The cursor is the row ID of the previous page's last submission
+            try:
+                after = int(cursor)
+            except ValueError:
+                raise ValueError(f"Invalid cursor: {cursor!r}") from None
+            clauses.append("id > ?")
+            params.append(after)
+        for column, value in (
+            ("assignment_id", assignment_id),
+            ("reviewed_by", reviewer),
+            ("status", status)
+        ):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        # Seeking past the last ID reads only this page, however deep it is;
+        # one extra row tells whether another page follows
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM flagged_submissions {where} ORDER BY id LIMIT ?",
+                (*params, limit + 1)
+            ).fetchall()
+        return FlaggedPage(
+            submissions=[self._to_submission(row) for row in rows[:limit]],
+            next_cursor=str(rows[limit - 1]["id"]) if len(rows) > limit else None
+        )
+
+    def record_adjustment(self, adjustment: GradeAdjustment) -> ReviewSubmission:
+        reviewed_at = datetime.now()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                previous = self._conn.execute(
+                    "SELECT status, assignment_id, models, flagged_at FROM flagged_submissions "
+                    "WHERE submission_id = ?",
+                    (adjustment.submission_id,)
+                ).fetchone()
+                cursor = self._conn.execute(
+                    "UPDATE flagged_submissions SET status = ?, reviewed_at = ?, "
+                    "reviewed_by = ?, review_notes = ? WHERE submission_id = ?",
+                    (REVIEWED, reviewed_at.isoformat(), adjustment.reviewer,
+                     adjustment.adjustment_reason, adjustment.submission_id)
+                )
+                if cursor.rowcount == 0:
+                    raise KeyError(adjustment.submission_id)
+                self._conn.execute(
+                    "INSERT INTO grade_adjustments (submission_id, criterion_name, "
+                    "original_points, adjusted_points, adjustment_reason, reviewer, "
+                    "created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (adjustment.submission_id, adjustment.criterion_name,
+                     adjustment.original_points, adjustment.adjusted_points,
+                     adjustment.adjustment_reason, adjustment.reviewer,
+                     reviewed_at.isoformat())
+                )
+                self._record_review_statistics(
+                    adjustment,
+                    first_review=previous["status"] == PENDING,
+                    assignment_id=previous["assignment_id"],
+                    models=previous["models"].split(",") if previous["models"] else [],
+                    flagged_at=self._flag_time(previous)
+                )
+                row = self._conn.execute(
+                    "SELECT * FROM flagged_submissions WHERE submission_id = ?",
+                    (adjustment.submission_id,)
+                ).fetchone()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self._to_submission(row)
+
+    @staticmethod
+    def _flag_time(row: Optional[sqlite3.Row]) -> Optional[datetime]:
+        return datetime.fromisoformat(row["flagged_at"]) if row is not None and row["flagged_at"] else None
+
+    @staticmethod
+    def _flag_keys(assignment_id: Optional[str], models: List[str], flagged_at: Optional[datetime]):
+        """
+        Statistics rows touched by an event on a submission flagged at a
+        given time (None = unknown, which leaves out the time windows).
+        """
+        keys = [("global", "")]
+        if flagged_at is not None:
+            keys += [("hour", flagged_at.strftime("%Y-%m-%dT%H")),
+                     ("day", flagged_at.strftime("%Y-%m-%d"))]
+        if assignment_id is not None:
+            keys.append(("assignment", assignment_id))
+        # Adjustments are attributed to the models that produced the grade
+        keys += [("model", model) for model in models]
+        return keys
+
+    def _bump(
+        self,
+        scope: str,
+        key: str,
+        flagged: int = 0,
+        reviewed: int = 0,
+        adjustments: int = 0,
+        absolute_adjustment: float = 0.0
+    ) -> None:
+        """Add to one row of the running statistics (caller holds a transaction)."""
+        self._conn.execute(
+            "INSERT INTO review_statistics "
+            "(scope, key, flagged, reviewed, adjustments, absolute_adjustment) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (scope, key) DO UPDATE SET "
+            "flagged = flagged + excluded.flagged, "
+            "reviewed = reviewed + excluded.reviewed, "
+            "adjustments = adjustments + excluded.adjustments, "
+            "absolute_adjustment = absolute_adjustment + excluded.absolute_adjustment",
+            (scope, key, flagged, reviewed, adjustments, absolute_adjustment)
+        )
+
+    def _record_review_statistics(
+        self,
+        adjustment: GradeAdjustment,
+        first_review: bool,
+        assignment_id: Optional[str],
+        models: List[str],
+        flagged_at: Optional[datetime]
+    ) -> None:
+        delta = abs(adjustment.adjusted_points - adjustment.original_points)
+        keys = self._flag_keys(assignment_id, models, flagged_at) + [
+            ("criterion", adjustment.criterion_name)
+        ]
+        for scope, key in keys:
+            # Criteria aren't known at flag time, so they only count adjustments
+            self._bump(
+                scope,
+                key,
+                reviewed=1 if first_review and scope != "criterion" else 0,
+                adjustments=1,
+                absolute_adjustment=delta
+            )
+
+    def rebuild_statistics(self) -> None:
+        """Recompute the running statistics from scratch (one full scan)."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM review_statistics")
+                submissions = {}
+                for row in self._conn.execute(
+                    "SELECT submission_id, assignment_id, models, flagged_at FROM flagged_submissions"
+                ).fetchall():
+                    submissions[row["submission_id"]] = row
+                    models = row["models"].split(",") if row["models"] else []
+                    for scope, key in self._flag_keys(row["assignment_id"], models, self._flag_time(row)):
+                        self._bump(scope, key, flagged=1)
+
+                seen = set()
+                for row in self._conn.execute(
+                    "SELECT * FROM grade_adjustments ORDER BY id"
+                ).fetchall():
+                    submission = submissions.get(row["submission_id"])
+                    if submission is None:
+                        continue
+                    self._record_review_statistics(
+                        GradeAdjustment(**{
+                            field: row[field] for field in (
+                                "submission_id", "criterion_name", "original_points",
+                                "adjusted_points", "adjustment_reason", "reviewer"
+                            )
+                        }),
+                        first_review=row["submission_id"] not in seen,
+                        assignment_id=submission["assignment_id"],
+                        models=submission["models"].split(",") if submission["models"] else [],
+                        flagged_at=self._flag_time(submission)
+                    )
+                    seen.add(row["submission_id"])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _summarise(row: Optional[sqlite3.Row]) -> Dict[str, float]:
+        flagged = row["flagged"] if row else 0
+        reviewed = row["reviewed"] if row else 0
+        adjustments = row["adjustments"] if row else 0
+        absolute = row["absolute_adjustment"] if row else 0.0
+        return {
+            "total_flagged": flagged,
+            "total_reviewed": reviewed,
+            "total_adjustments": adjustments,
+            "review_completion_rate": reviewed / flagged if flagged > 0 else 0,
+            "mean_absolute_adjustment": absolute / adjustments if adjustments > 0 else 0
+        }
+
+    def statistics(self) -> Dict[str, float]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM review_statistics WHERE scope = 'global' AND key = ''"
+            ).fetchone()
+        return self._summarise(row)
+
+    def statistics_breakdown(self, scope: str, limit: int = 100) -> Dict[str, Dict[str, float]]:
+        if scope not in STATISTICS_SCOPES:
+            raise ValueError(f"Unknown statistics scope: {scope}")
+        # Time windows are returned most recent first
+        order = "key DESC" if scope in ("hour", "day") else "key"
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM review_statistics WHERE scope = ? ORDER BY {order} LIMIT ?",
+                (scope, limit)
+            ).fetchall()
+        return {row["key"]: self._summarise(row) for row in rows}
@@ -0,0 +1,11 @@
+import os
+import sys
+
+# Tests import the application as "src.…", the way run.sh starts it
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Building a grader needs a key even though tests never reach the API
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("GRADING_WARM_UP", "0")
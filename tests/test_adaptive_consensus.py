@@ -0,0 +1,55 @@
+from benchmarks.fake_llm import FakeLLM
+from src.grading.criteria import GradingCriterion
+from src.models.ai_models import AdaptiveConsensusGrader, AIGrader, ConsensusGrader
+
+CRITERION = GradingCriterion(
+    name="Clarity", description="", max_points=10, rubric={"0": "unclear", "5": "mostly clear", "10": "clear"}
+)
+
+def models(cheap: FakeLLM, expensive: FakeLLM):
+    # Listed expensive first; adaptive consensus asks the cheaper one first
+    return [AIGrader(model_name="gpt-4", llm=expensive), AIGrader(model_name="gpt-3.5-turbo", llm=cheap)]
+
+def test_confident_clear_cut_answer_skips_the_second_model():
+    cheap, expensive = FakeLLM(latency=0, points=10, confidence=0.95), FakeLLM(latency=0, points=10)
+    grader = AdaptiveConsensusGrader(models(cheap, expensive))
+
+    result = grader.grade_with_consensus("essay", CRITERION)
+
+    assert result.points == 10
+    assert (cheap.calls, expensive.calls) == (1, 0)
+    assert grader.stats["calls_saved"] == 1
+
+def test_unsure_answer_escalates():
+    cheap, expensive = FakeLLM(latency=0, points=10, confidence=0.75), FakeLLM(latency=0, points=10)
+    grader = AdaptiveConsensusGrader(models(cheap, expensive))
+
+    grader.grade_with_consensus("essay", CRITERION)
+
+    assert (cheap.calls, expensive.calls) == (1, 1)
+
+def test_answer_near_a_band_edge_escalates():
+    # 7.4 is close to the midpoint between the 5 and 10 levels
+    cheap, expensive = FakeLLM(latency=0, points=7.4, confidence=0.95), FakeLLM(latency=0, points=5)
+    grader = AdaptiveConsensusGrader(models(cheap, expensive))
+
+    grader.grade_with_consensus("essay", CRITERION)
+
+    assert (cheap.calls, expensive.calls) == (1, 1)
+
+def test_clear_cut_submissions_need_fewer_calls_than_full_consensus():
+    criteria = [
+        GradingCriterion(name=f"C{i}", description="", max_points=10, rubric=CRITERION.rubric) for i in range(4)
+    ]
+    full = [FakeLLM(latency=0, points=10, confidence=0.95) for _ in range(2)]
+    adaptive = [FakeLLM(latency=0, points=10, confidence=0.95) for _ in range(2)]
+    plain_grader = ConsensusGrader(models(*full))
+    adaptive_grader = AdaptiveConsensusGrader(models(*adaptive))
+
+    for criterion in criteria:
+        assert plain_grader.grade_with_consensus("essay", criterion).points == 10
+        assert adaptive_grader.grade_with_consensus("essay", criterion).points == 10
+
+    assert sum(llm.calls for llm in full) == 8
+    assert sum(llm.calls for llm in adaptive) == 4
+    assert adaptive_grader.stats["saved_fraction"] == 0.5
@@ -0,0 +1,17 @@
+from src.grading.analytics import CohortResults
+from src.grading.grader import AssignmentGrade
+from src.models.ai_models import ConsensusResult
+
+def grade(points: float) -> AssignmentGrade:
+    result = ConsensusResult(points=points, explanation="", confidence=0.9, model_points={"gpt-4": points})
+    return AssignmentGrade(
+        total_points=points, criterion_grades={"Clarity": result}, overall_confidence=0.9, needs_review=False
+    )
+
+def test_csv_bytes_match_the_csv_file(tmp_path):
+    cohort = CohortResults.from_grades({"s1": grade(7.5), "s2": grade(31.5)})
+    path = tmp_path / "grades.csv"
+    cohort.to_csv(str(path))
+
+    assert cohort.csv_bytes() == path.read_bytes()
+    assert b"31.5" in cohort.csv_bytes()
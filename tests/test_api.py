@@ -0,0 +1,51 @@
+import asyncio
+import importlib
+import pytest
+from fastapi.testclient import TestClient
+
+AUTH = {"Authorization": "Bearer test"}
+
+@pytest.fixture(scope="module")
+def api(tmp_path_factory):
+    # The API opens its databases on import; keep them out of the working tree
+    folder = tmp_path_factory.mktemp("api")
+    with pytest.MonkeyPatch.context() as patch:
+        for name in ("REVIEW_STORE_PATH", "EXTRACTION_CACHE_PATH", "GRADING_CACHE_PATH"):
+            patch.setenv(name, str(folder / f"{name.lower()}.db"))
+        patch.setenv("GRADING_SCHEMA_DIR", str(folder / "schemas"))
+        yield importlib.import_module("src.web.api")
+
+def off_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return True
+    return False
+
+def test_review_store_is_called_off_the_event_loop(api, monkeypatch):
+    calls = []
+    monkeypatch.setattr(api.review_store, "statistics", lambda: calls.append(off_event_loop()) or {})
+    monkeypatch.setattr(
+        api.review_store, "statistics_breakdown", lambda scope, limit: calls.append(off_event_loop()) or []
+    )
+    client = TestClient(api.app)
+
+    assert client.get("/review-statistics", headers=AUTH).status_code == 200
+    assert client.get("/review-statistics/model", headers=AUTH).status_code == 200
+    assert client.get("/flagged-submissions", headers=AUTH).status_code == 200
+
+    assert calls == [True, True]
+
+def test_statistics_without_a_cache_or_resilience_report_disabled(api, monkeypatch):
+    monkeypatch.setattr(api, "grading_cache", None)
+    models = api.current_grader().consensus_grader.models
+    for model in models:
+        monkeypatch.setattr(model, "resilience", None)
+    client = TestClient(api.app)
+
+    cache = client.get("/cache-statistics", headers=AUTH)
+    health = client.get("/model-health", headers=AUTH)
+
+    assert cache.status_code == 200 and cache.json() == {"enabled": False}
+    assert health.status_code == 200
+    assert health.json() == {model.model_name: {"enabled": False} for model in models}
@@ -0,0 +1,32 @@
+from src.grading.batch import BatchGradingJob
+from src.web.jobs import Job
+
+class CountingGrader:
+    """Stands in for an AssignmentGrader and counts the submissions it grades."""
+
+    def __init__(self):
+        self.graded = 0
+
+    def grade_assignment(self, text, schema):
+        self.graded += 1
+
+def test_cancel_requested_before_the_run_stops_it():
+    grader = CountingGrader()
+    batch = BatchGradingJob(grader, schema=None, grading_workers=2)
+    job = Job(job_id="1", kind="bulk")
+    job.cancel()
+    # The job's worker registers the batch only after the cancel arrived
+    job.on_cancel(batch.cancel)
+
+    outcomes = list(batch.run_texts([(f"s{i}", "essay") for i in range(20)]))
+
+    assert batch.cancelled
+    assert outcomes == [] and grader.graded == 0
+
+def test_uncancelled_batch_grades_everything():
+    grader = CountingGrader()
+    batch = BatchGradingJob(grader, schema=None, grading_workers=2)
+
+    outcomes = list(batch.run_texts([(f"s{i}", "essay") for i in range(20)]))
+
+    assert len(outcomes) == 20 and grader.graded == 20
@@ -0,0 +1,82 @@
+import json
+from benchmarks.fake_llm import FakeLLM
+from src.grading.criteria import BATCHED, GradingCriterion, GradingSchema
+from src.grading.grader import AssignmentGrader
+from src.models.ai_models import AIGrader, ConsensusGrader
+
+POINTS = {"Clarity": 4, "Accuracy": 3, "Structure": 5}
+
+def schema() -> GradingSchema:
+    schema = GradingSchema(name="Essay", total_points=15, grading_mode=BATCHED)
+    for name in POINTS:
+        schema.add_criterion(GradingCriterion(name=name, description="", max_points=5, rubric={"5": "good"}))
+    return schema
+
+class Replies:
+    """Answers batched prompts with replies[i] for the i-th batch, single prompts directly."""
+
+    def __init__(self, *batch_replies):
+        self.batch_replies = list(batch_replies)
+        self.batches = []
+        self.singles = []
+
+    def __call__(self, messages) -> str:
+        prompt = messages[-1].content
+        names = [line.split(": ", 1)[1] for line in prompt.splitlines() if line.startswith("Criterion: ")]
+        if not prompt.startswith("Criteria:"):
+            self.singles.append(names[0])
+            return json.dumps({"points": POINTS[names[0]], "explanation": "single", "confidence": 0.9})
+        self.batches.append(names)
+        reply = self.batch_replies[min(len(self.batches), len(self.batch_replies)) - 1]
+        return reply(names) if callable(reply) else reply
+
+def grades(names, skip=()) -> str:
+    """A batched reply, listing the criteria in reverse order."""
+    return json.dumps({"grades": [
+        {"criterion_name": name, "points": POINTS[name], "explanation": "batched", "confidence": 0.9}
+        for name in reversed(names) if name not in skip
+    ]})
+
+def grade(*batch_replies):
+    """Grade the schema with two models that reply alike."""
+    repliers = [Replies(*batch_replies) for _ in range(2)]
+    llms = [FakeLLM(latency=0, responder=replier) for replier in repliers]
+    consensus = ConsensusGrader([AIGrader(model_name=f"m{i}", llm=llm) for i, llm in enumerate(llms)])
+    return AssignmentGrader(consensus).grade_assignment("essay", schema()), llms, repliers
+
+def test_one_request_per_model_grades_every_criterion_in_schema_order():
+    grade_result, llms, repliers = grade(grades)
+
+    assert [llm.calls for llm in llms] == [1, 1]
+    assert all(replier.singles == [] for replier in repliers)
+    # The reply lists criteria in reverse; grades are still mapped by name
+    assert list(grade_result.criterion_grades) == list(POINTS)
+    assert {name: result.points for name, result in grade_result.criterion_grades.items()} == POINTS
+    assert grade_result.total_points == 12
+
+def test_unparseable_batch_is_sent_again():
+    grade_result, llms, repliers = grade("not json", grades)
+
+    assert [len(replier.batches) for replier in repliers] == [2, 2]
+    assert all(replier.singles == [] for replier in repliers)
+    assert grade_result.total_points == 12
+
+def test_missing_criteria_are_retried_then_graded_one_at_a_time():
+    def without_two(names):
+        return grades(names, skip={"Structure", "Accuracy"})
+
+    grade_result, llms, repliers = grade(without_two)
+
+    replier = repliers[0]
+    # The second batch holds only the criteria the first one missed
+    assert replier.batches == [list(POINTS), ["Accuracy", "Structure"]]
+    assert sorted(replier.singles) == ["Accuracy", "Structure"]
+    assert list(grade_result.criterion_grades) == list(POINTS)
+    assert grade_result.total_points == 12
+
+def test_batches_that_never_parse_fall_back_to_single_requests():
+    grade_result, llms, repliers = grade("not json")
+
+    assert [len(replier.batches) for replier in repliers] == [2, 2]
+    assert repliers[0].singles == list(POINTS)
+    assert grade_result.total_points == 12
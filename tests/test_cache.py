@@ -0,0 +1,51 @@
+import time
+from src.grading.schema_registry import SchemaRegistry
+from src.models.cache import GradingCache
+
+def definition(rubric_text: str) -> dict:
+    return {
+        "assignment_id": "essay",
+        "name": "Essay",
+        "total_points": 10,
+        "criteria": [
+            {"name": "Clarity", "description": "", "max_points": 10, "rubric": {"10": rubric_text}}
+        ]
+    }
+
+def disk_rows(cache: GradingCache) -> int:
+    return cache._conn.execute("SELECT COUNT(*) FROM grading_cache").fetchone()[0]
+
+def test_expired_rows_are_deleted_when_read(tmp_path):
+    path = str(tmp_path / "cache.db")
+    criterion = SchemaRegistry().register(definition("clear")).criteria[0]
+    GradingCache(path).set("k", {"points": 1}, criterion)
+
+    cache = GradingCache(path, ttl=60)
+    cache._conn.execute("UPDATE grading_cache SET created_at = ?", (time.time() - 120,))
+    cache._memory.clear()
+
+    assert cache.get("k") is None
+    assert disk_rows(cache) == 0 and cache.stats["disk_entries"] == 0
+
+def test_expired_rows_are_purged_on_startup(tmp_path):
+    path = str(tmp_path / "cache.db")
+    criterion = SchemaRegistry().register(definition("clear")).criteria[0]
+    cache = GradingCache(path)
+    cache.set("k", {"points": 1}, criterion)
+    cache._conn.execute("UPDATE grading_cache SET created_at = ?", (time.time() - 120,))
+    cache._conn.commit()
+
+    assert disk_rows(GradingCache(path, ttl=60)) == 0
+
+def test_replacing_a_schema_drops_grades_of_changed_criteria(tmp_path):
+    cache = GradingCache(str(tmp_path / "cache.db"))
+    registry = SchemaRegistry()
+    registry.add_listener(cache.schema_replaced)
+    old = registry.register(definition("clear")).criteria[0]
+    cache.set("k", {"points": 1}, old)
+
+    registry.register(definition("clear"))
+    assert disk_rows(cache) == 1
+
+    registry.register(definition("clear and concise"))
+    assert disk_rows(cache) == 0
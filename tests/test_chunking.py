@@ -0,0 +1,33 @@
+from src.input.chunking import chunk_text
+from src.models.ai_models import AIGrader
+
+def quarter(text: str) -> int:
+    """About four characters per token, like English prose."""
+    return -(-len(text) // 4)
+
+def test_oversized_lines_keep_their_place():
+    text = "A\nB\n" + "X" * 400 + "\nC"
+
+    chunks = chunk_text(text, max_tokens=50, counter=quarter)
+
+    assert "".join(chunks).replace("\n", "") == "AB" + "X" * 400 + "C"
+    assert chunks[0].startswith("A\nB")
+    assert chunks[-1].endswith("C")
+
+def test_slices_of_dense_text_stay_within_budget():
+    # One token per character, far denser than the default estimate
+    chunks = chunk_text("Z" * 100, max_tokens=10, counter=len)
+
+    assert "".join(chunks) == "Z" * 100
+    assert all(len(chunk) <= 10 for chunk in chunks)
+
+def test_dense_text_is_measured_in_tokens_not_characters(monkeypatch):
+    # CJK text often takes more than one token per character
+    monkeypatch.setattr("src.models.ai_models.count_tokens", lambda text, model_name: 2 * len(text))
+    model = AIGrader(llm=object(), max_submission_tokens=150, retrieval_top_k=1, passage_tokens=150)
+    essay = "漢字" * 50
+
+    assert len(essay) <= 150
+    assert model._exceeds_budget(essay)
+    assert model._use_retrieval(essay)
+    assert not model._exceeds_budget("漢字" * 20)
@@ -0,0 +1,23 @@
+import sys
+from src.grading.compact import CompactResults
+from src.grading.grader import AssignmentGrade
+from src.models.ai_models import GradingResult
+
+def grade(explanation: str) -> AssignmentGrade:
+    return AssignmentGrade(
+        total_points=5,
+        criterion_grades={"Clarity": GradingResult(points=5, explanation=explanation, confidence=0.9)},
+        overall_confidence=0.9,
+        needs_review=False
+    )
+
+def test_memory_per_submission_counts_the_explanation_ids_and_names():
+    results = CompactResults()
+    for i in range(100):
+        results.add(f"s{i}", grade(f"explanation {i}"))
+
+    own = sum(g.nbytes() + sys.getsizeof(g.submission_id) for g in results) + sys.getsizeof(results.grades)
+    shared = results.memory_per_submission() * len(results) - own
+
+    assert shared >= results.store.nbytes() > 0
+    assert results.grades[0].explanation("Clarity") == "explanation 0"
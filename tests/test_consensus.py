@@ -0,0 +1,42 @@
+import time
+import pytest
+from src.grading.criteria import GradingCriterion
+from src.models.ai_models import ConsensusGrader, GradingResult
+
+CRITERION = GradingCriterion(name="Clarity", description="", max_points=10, rubric={"10": "clear"})
+
+class SlowModel:
+    """Answers after a fixed delay; stands in for an AIGrader."""
+
+    def __init__(self, model_name: str, latency: float, timeout: float):
+        self.model_name = model_name
+        self.latency = latency
+        self.timeout = timeout
+
+    def grade_submission(self, submission_text, criterion):
+        time.sleep(self.latency)
+        return GradingResult(points=5, explanation=self.model_name, confidence=0.9)
+
+def test_queued_calls_are_not_timed_out_while_waiting_for_a_worker():
+    # One worker: the second call waits 0.2s in the queue, then runs 0.2s,
+    # which is past 0.3s from submission but within its own timeout
+    models = [SlowModel("a", 0.2, 0.3), SlowModel("b", 0.2, 0.3)]
+    grader = ConsensusGrader(models, max_in_flight=1)
+
+    results = grader.collect_results("essay", CRITERION)
+
+    assert [r.explanation for r in results] == ["a", "b"]
+
+def test_running_calls_still_time_out():
+    models = [SlowModel("fast", 0.01, 1.0), SlowModel("slow", 1.0, 0.1)]
+    grader = ConsensusGrader(models)
+
+    started = time.monotonic()
+    results = grader.collect_results("essay", CRITERION)
+
+    assert results[0].explanation == "fast" and results[1] is None
+    assert time.monotonic() - started < 0.5
+
+def test_models_with_the_same_name_are_rejected():
+    with pytest.raises(ValueError, match="gpt-4"):
+        ConsensusGrader([SlowModel("gpt-4", 0, 1), SlowModel("gpt-4", 0, 1), SlowModel("other", 0, 1)])
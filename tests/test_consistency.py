@@ -0,0 +1,57 @@
+import dataclasses
+import json
+import time
+from benchmarks.fake_llm import FakeLLM
+from src.grading.consistency import ConsistencyEngine
+from src.grading.criteria import BATCHED, GradingCriterion, GradingSchema
+from src.models.ai_models import AIGrader, ConsensusGrader
+
+def schema(grading_mode: str = "per_criterion") -> GradingSchema:
+    schema = GradingSchema(name="Essay", total_points=20, grading_mode=grading_mode)
+    for name in ("Clarity", "Accuracy", "Structure"):
+        schema.add_criterion(GradingCriterion(name=name, description="", max_points=20 / 3, rubric={"5": "good"}))
+    return schema
+
+def batch_answer(messages) -> str:
+    names = [line.split(": ", 1)[1] for line in messages[-1].content.splitlines() if line.startswith("Criterion: ")]
+    return json.dumps({"grades": [
+        {"criterion_name": name, "points": 5, "explanation": "fine", "confidence": 0.9} for name in names
+    ]})
+
+def test_criteria_without_confident_answers_report_none():
+    llms = [FakeLLM(latency=0, confidence=0.2) for _ in range(2)]
+    consensus = ConsensusGrader([AIGrader(model_name=f"m{i}", llm=llm) for i, llm in enumerate(llms)])
+    engine = ConsistencyEngine(consensus, iterations=3)
+
+    report = engine.evaluate("essay", schema())
+
+    spread = report.criteria["Clarity"]
+    assert report.grades["Clarity"] is None
+    assert (spread.mean_points, spread.std_points, spread.range_points) == (None, None, None)
+    assert not spread.consistent and report.needs_review
+    # Serialises as strict JSON, which rejects NaN
+    json.dumps([dataclasses.asdict(c) for c in report.criteria.values()], allow_nan=False)
+
+def test_batched_schemas_send_one_request_per_model_and_iteration():
+    llms = [FakeLLM(latency=0, responder=batch_answer) for _ in range(2)]
+    consensus = ConsensusGrader([AIGrader(model_name=f"m{i}", llm=llm) for i, llm in enumerate(llms)])
+    engine = ConsistencyEngine(consensus, iterations=3, min_iterations=3)
+
+    report = engine.evaluate("essay", schema(BATCHED))
+
+    assert [llm.calls for llm in llms] == [3, 3]
+    assert all(c.consistent and c.iterations == 3 for c in report.criteria.values())
+    assert report.grades["Structure"].points == 5
+
+def test_slow_models_time_out_once_not_once_per_call():
+    # Every call outlives the timeout; waiting on the calls one after
+    # another used to stretch the wait until the late answers arrived
+    llms = [FakeLLM(latency=0.6) for _ in range(2)]
+    consensus = ConsensusGrader([AIGrader(model_name=f"m{i}", llm=llm, timeout=0.2) for i, llm in enumerate(llms)])
+    engine = ConsistencyEngine(consensus, iterations=3, min_iterations=3, max_workers=32)
+
+    started = time.monotonic()
+    report = engine.evaluate("essay", schema())
+
+    assert time.monotonic() - started < 0.5
+    assert report.grades["Clarity"] is None and report.needs_review
@@ -0,0 +1,42 @@
+import zipfile
+from src.input.extraction_cache import ExtractionCache
+from src.input.file_processor import FileProcessor
+
+def write_zip(path, members: dict) -> str:
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, text in members.items():
+            archive.writestr(name, text)
+    return str(path)
+
+def test_members_with_the_same_checksum_and_size_are_not_confused(tmp_path):
+    # Equally long texts with the same CRC32
+    one, two = "essay 09685295", "essay 12060020"
+    cache = ExtractionCache()
+    first = write_zip(tmp_path / "first.zip", {"a.txt": one})
+    second = write_zip(tmp_path / "second.zip", {"a.txt": two})
+
+    assert dict(FileProcessor.iter_from_zip(first, cache=cache)) == {"a.txt": one}
+    assert dict(FileProcessor.iter_from_zip(second, cache=cache)) == {"a.txt": two}
+    assert cache.stats["hits"] == 0
+
+def test_identical_content_is_reused_across_archives_and_names(tmp_path):
+    cache = ExtractionCache()
+    FileProcessor.extract_from_zip(write_zip(tmp_path / "first.zip", {"a.txt": "essay"}), cache=cache)
+
+    contents = FileProcessor.extract_from_zip(write_zip(tmp_path / "second.zip", {"b.txt": "essay"}), cache=cache)
+
+    assert contents == {"b.txt": "essay"}
+    assert cache.stats["hits"] == 1
+
+def test_oldest_extractions_are_evicted(tmp_path):
+    cache = ExtractionCache(str(tmp_path / "extractions.db"), max_entries=2)
+    path = write_zip(tmp_path / "three.zip", {f"{i}.txt": f"essay {i}" for i in range(3)})
+
+    FileProcessor.extract_from_zip(path, max_workers=1, cache=cache)
+
+    assert cache.stats["evictions"] == 1
+    # Reopening counts the rows already on disk
+    reopened = ExtractionCache(str(tmp_path / "extractions.db"), max_entries=2)
+    FileProcessor.extract_from_zip(path, max_workers=1, cache=reopened)
+    assert reopened.stats["hits"] == 2
+    assert reopened._count == 2
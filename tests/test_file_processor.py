@@ -0,0 +1,34 @@
+import zipfile
+from pypdf import PdfWriter
+from src.input.file_processor import FileProcessor
+
+def write_pdf(path, pages: int) -> str:
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=200)
+    with open(path, "wb") as f:
+        writer.write(f)
+    return str(path)
+
+def test_extraction_of_a_pdf_without_pages(tmp_path):
+    assert FileProcessor._process_pdf(write_pdf(tmp_path / "empty.pdf", 0)) == ""
+
+def test_extraction_with_no_pages_requested(tmp_path):
+    path = write_pdf(tmp_path / "blank.pdf", 3)
+    assert FileProcessor._process_pdf(path, max_pages=0) == ""
+
+def test_extraction_stops_at_the_character_budget(tmp_path):
+    path = write_pdf(tmp_path / "blank.pdf", 3)
+    assert FileProcessor._process_pdf(path) == "\n\n\n"
+    assert FileProcessor._process_pdf(path, max_chars=2) == "\n\n"
+
+def test_archive_is_extracted_by_worker_processes(tmp_path):
+    path = tmp_path / "submissions.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        for i in range(3):
+            archive.writestr(f"student{i}.txt", f"essay {i}")
+        archive.writestr("notes.bin", "skipped")
+
+    extracted = dict(FileProcessor.iter_from_zip(str(path), max_workers=2))
+
+    assert extracted == {f"student{i}.txt": f"essay {i}" for i in range(3)}
@@ -0,0 +1,52 @@
+import json
+import threading
+import time
+from benchmarks.fake_llm import FakeLLM
+from src.grading.criteria import GradingCriterion, GradingSchema
+from src.grading.grader import AssignmentGrader
+from src.models.ai_models import AIGrader, ConsensusGrader
+
+NAMES = ["Clarity", "Accuracy", "Structure", "Evidence"]
+POINTS = {"Clarity": 4, "Accuracy": 3.5, "Structure": 5, "Evidence": 2}
+# One unsure answer, so the grade needs review
+CONFIDENCE = {"Clarity": 0.9, "Accuracy": 0.95, "Structure": 0.9, "Evidence": 0.5}
+
+def schema() -> GradingSchema:
+    schema = GradingSchema(name="Essay", total_points=20)
+    for name in NAMES:
+        schema.add_criterion(GradingCriterion(name=name, description="", max_points=5, rubric={"5": "good"}))
+    return schema
+
+def reverse_order_llm(finished: list) -> FakeLLM:
+    """Answers the first criterion last: each one waits longer than the next."""
+    lock = threading.Lock()
+
+    def respond(messages) -> str:
+        name = messages[-1].content.split("Criterion: ", 1)[1].split("\n", 1)[0]
+        time.sleep(0.05 * (len(NAMES) - NAMES.index(name)))
+        with lock:
+            finished.append(name)
+        return json.dumps({"points": POINTS[name], "explanation": name, "confidence": CONFIDENCE[name]})
+
+    return FakeLLM(latency=0, responder=respond)
+
+def grade(max_concurrent_criteria: int, finished: list):
+    consensus = ConsensusGrader([AIGrader(model_name="m", llm=reverse_order_llm(finished))])
+    grader = AssignmentGrader(consensus, max_concurrent_criteria=max_concurrent_criteria)
+    return grader.grade_assignment("essay", schema())
+
+def test_concurrent_grade_matches_the_sequential_one():
+    sequential_order, concurrent_order = [], []
+    sequential = grade(1, sequential_order)
+    concurrent = grade(4, concurrent_order)
+
+    # The calls really did finish in reverse order
+    assert sequential_order == NAMES
+    assert concurrent_order == NAMES[::-1]
+
+    # Evidence has no confident answer, so it gets no grade either way
+    assert list(concurrent.criterion_grades) == ["Clarity", "Accuracy", "Structure"]
+    assert concurrent.criterion_grades == sequential.criterion_grades
+    assert concurrent.total_points == sequential.total_points == 12.5
+    assert concurrent.overall_confidence == sequential.overall_confidence
+    assert concurrent.needs_review and sequential.needs_review
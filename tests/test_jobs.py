@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import pytest
+from src.web.jobs import CANCELLED, FAILED, QUEUED, SUCCEEDED, JobManager, JobQueueFull
+
+def collect(manager: JobManager, job) -> list:
+    """Every event the job's SSE stream yields, until it ends."""
+    async def run():
+        return [event async for event in manager.stream(job)]
+    return asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+def test_submitted_job_can_be_polled_for_its_result():
+    manager = JobManager(max_workers=1)
+
+    job = manager.submit("grade", lambda job: {"grade": 18})
+    job._future.result(timeout=5)
+
+    polled = manager.get(job.job_id).summary()
+    assert polled["status"] == SUCCEEDED
+    assert polled["result"] == {"grade": 18}
+    assert polled["finished_at"] is not None
+    assert manager.stats["active"] == 0
+
+def test_queued_job_cancelled_before_it_starts_never_runs():
+    manager = JobManager(max_workers=1)
+    release = threading.Event()
+    ran = []
+    blocker = manager.submit("grade", lambda job: release.wait(5))
+    queued = manager.submit("grade", lambda job: ran.append(job.job_id))
+
+    assert queued.status == QUEUED
+    manager.cancel(queued.job_id)
+    release.set()
+    queued._future.result(timeout=5)
+    blocker._future.result(timeout=5)
+
+    assert queued.status == CANCELLED
+    assert ran == []
+
+def test_running_job_stops_at_its_next_check():
+    manager = JobManager(max_workers=1)
+    started = threading.Event()
+
+    def work(job):
+        started.set()
+        while True:
+            job.check_cancelled()
+            job.cancel_requested.wait(0.01)
+
+    job = manager.submit("grade", work)
+    assert started.wait(5)
+    manager.cancel(job.job_id)
+    job._future.result(timeout=5)
+
+    assert job.status == CANCELLED
+
+def test_event_stream_ends_with_the_final_status():
+    manager = JobManager(max_workers=1)
+    release = threading.Event()
+
+    def work(job):
+        job.publish({"event": "progress", "completed": 1})
+        release.wait(5)
+        return "done"
+
+    job = manager.submit("grade", work)
+    threading.Timer(0.1, release.set).start()
+    events = collect(manager, job)
+
+    assert events[0] == {"event": "status", "status": QUEUED}
+    assert {"event": "progress", "completed": 1} in events
+    assert events[-1] == {"event": "status", "status": SUCCEEDED, "error": None}
+    # A stream opened after the job finished replays it and ends too
+    assert collect(manager, job) == events
+
+def test_failing_cleanup_still_finishes_the_job():
+    manager = JobManager(max_workers=1, max_pending=1)
+
+    def cleanup():
+        raise FileNotFoundError("already removed")
+
+    job = manager.submit("bulk", lambda job: 1 / 0, cleanup=cleanup)
+    job._future.result(timeout=5)
+
+    assert job.status == FAILED
+    assert job.finished_at is not None
+    assert collect(manager, job)[-1]["status"] == FAILED
+    # The slot was released, so the next job is accepted
+    manager.submit("bulk", lambda job: None)._future.result(timeout=5)
+
+def test_submit_refuses_jobs_beyond_max_pending():
+    manager = JobManager(max_workers=1, max_pending=1)
+    release = threading.Event()
+    manager.submit("grade", lambda job: release.wait(5))
+
+    with pytest.raises(JobQueueFull):
+        manager.submit("grade", lambda job: None)
+    release.set()
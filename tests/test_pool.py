@@ -0,0 +1,70 @@
+from src.models.pool import DEFAULT_MODEL_TIMEOUT, GraderService
+
+def started(grader):
+    """Create every worker pool a grader owns, as grading does."""
+    pools = [grader.executor, grader.consensus_grader.executor]
+    for model in grader.consensus_grader.models:
+        pools += [model.executor, model.resilience.executor]
+    return pools
+
+def test_least_recently_used_grader_is_closed():
+    service = GraderService(max_graders=2)
+    first = service.grader("key-1")
+    pools = started(first)
+    service.grader("key-2")
+    service.grader("key-1")
+    service.grader("key-3")
+
+    # key-1 was used again, so key-2 is the one dropped
+    assert service.grader("key-1") is first
+    assert service.stats["api_keys"] == 2
+    assert service.stats["evicted"] == 1
+    assert not any(pool._shutdown for pool in pools)
+    service.close()
+
+def test_forget_shuts_down_the_worker_pools():
+    service = GraderService()
+    grader = service.grader("key")
+    pools = started(grader)
+
+    service.forget("key")
+
+    assert all(pool._shutdown for pool in pools)
+    assert service.stats["api_keys"] == 0
+    # A grader still held by a caller starts new pools if used again
+    assert grader.executor not in pools
+
+def test_close_shuts_down_every_grader():
+    service = GraderService()
+    pools = started(service.grader("key-1")) + started(service.grader("key-2"))
+
+    service.close()
+
+    assert all(pool._shutdown for pool in pools)
+    assert service.stats["api_keys"] == 0
+
+def test_warm_up_survives_a_failing_backend(monkeypatch):
+    def preload(self):
+        raise ImportError("no backend")
+
+    monkeypatch.setattr("src.models.ai_models.AIGrader.preload", preload)
+    service = GraderService(model_names=("gpt-4",))
+    # Nothing listens here, so the connection warm-up fails too
+    service.base_url = "http://127.0.0.1:9"
+
+    service.warm_up("key", connections=1, background=False)
+
+    assert service.stats["warm_up_failures"] == 2
+    assert service.stats["warm_ups"] == 0
+    service.close()
+
+def test_models_get_the_configured_timeout(monkeypatch):
+    monkeypatch.setenv("GRADING_MODEL_TIMEOUT", "12.5")
+    monkeypatch.setenv("GRADING_CACHE_PATH", ":memory:")
+    service = GraderService.from_env()
+
+    models = service.grader("key").consensus_grader.models
+
+    assert [model.timeout for model in models] == [12.5] * len(models)
+    assert GraderService().grader("key").consensus_grader.models[0].timeout == DEFAULT_MODEL_TIMEOUT
+    service.close()
@@ -0,0 +1,38 @@
+from src.grading.criteria import GradingCriterion
+from src.models.ai_models import BatchGradingResult, GradingResult, output_parser_for
+from src.models.cache import make_cache_key, rubric_fingerprint
+from src.models.prompts import PromptCompiler
+
+def criterion(name: str, rubric_text: str = "clear") -> GradingCriterion:
+    return GradingCriterion(name=name, description="", max_points=10, rubric={"10": rubric_text})
+
+def test_fingerprint_differs_between_rubrics():
+    clear = criterion("Clarity")
+    assert rubric_fingerprint(clear) == rubric_fingerprint(criterion("Clarity"))
+    assert rubric_fingerprint(clear) != rubric_fingerprint(criterion("Clarity", "concise"))
+
+def test_rubric_edited_in_place_gets_a_new_key_and_prompt():
+    compiler = PromptCompiler()
+    parser = output_parser_for(GradingResult)
+    clarity = criterion("Clarity")
+    key = make_cache_key("gpt-4", 0.0, "1", clarity, "essay")
+    prompt = compiler.single(clarity, parser, "gpt-4")
+
+    clarity.rubric["10"] = "concise"
+
+    assert make_cache_key("gpt-4", 0.0, "1", clarity, "essay") != key
+    edited = compiler.single(clarity, parser, "gpt-4")
+    assert edited is not prompt
+    assert "concise" in edited.prefix
+
+def test_batch_prompts_are_compiled_once():
+    compiler = PromptCompiler()
+    parser = output_parser_for(BatchGradingResult)
+    criteria = [criterion("Clarity"), criterion("Accuracy")]
+
+    first = compiler.batch(criteria, parser, "gpt-4")
+    again = compiler.batch([criterion("Clarity"), criterion("Accuracy")], parser, "gpt-4")
+
+    assert again is first
+    assert "Criterion: Accuracy" in first.prefix
+    assert compiler.stats["compiled"] == 1 and compiler.stats["reused"] == 1
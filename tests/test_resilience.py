@@ -0,0 +1,73 @@
+import time
+import pytest
+from src.models.resilience import CLOSED, OPEN, CircuitBreaker, Resilience, RetryPolicy
+
+class StatusError(Exception):
+    """An API error carrying an HTTP status, like openai.APIStatusError."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+class APIConnectionError(Exception):
+    """Named like openai's, which is matched by class name."""
+
+def failing(error: Exception):
+    calls = []
+
+    def fn():
+        calls.append(1)
+        raise error
+    return fn, calls
+
+def resilience() -> Resilience:
+    return Resilience(
+        retry=RetryPolicy(max_attempts=3, base_delay=0),
+        breaker=CircuitBreaker(failure_threshold=3),
+        hedge_percentile=None
+    )
+
+@pytest.mark.parametrize("error", [StatusError(503), APIConnectionError(), TimeoutError()])
+def test_transient_errors_are_retried_and_trip_the_breaker(error):
+    layer = resilience()
+    fn, calls = failing(error)
+
+    with pytest.raises(type(error)):
+        layer.call("grade", fn)
+
+    assert len(calls) == 3
+    assert layer.breaker.state == OPEN
+
+@pytest.mark.parametrize("error", [ValueError("Failed to parse"), StatusError(400), StatusError(401), StatusError(429)])
+def test_other_errors_fail_fast_without_tripping_the_breaker(error):
+    layer = resilience()
+    fn, calls = failing(error)
+
+    for _ in range(5):
+        with pytest.raises(type(error)):
+            layer.call("grade", fn)
+
+    assert len(calls) == 5
+    assert layer.breaker.state == CLOSED
+
+def test_half_open_trial_answered_with_a_parse_error_closes_the_breaker():
+    layer = resilience()
+    layer.breaker.reset_timeout = 0.0
+    for _ in range(3):
+        layer.breaker.record_failure()
+
+    fn, _ = failing(ValueError("Failed to parse"))
+    with pytest.raises(ValueError):
+        layer.call("grade", fn)
+
+    assert layer.breaker.state == CLOSED
+
+def test_calls_run_unhedged_while_every_worker_is_busy():
+    layer = Resilience(hedge_percentile=0.5, max_workers=1)
+    for _ in range(20):
+        layer._tracker("grade").record(0.01)
+
+    started = time.monotonic()
+    assert layer.call("grade", lambda: time.sleep(0.1) or "ok") == "ok"
+    assert time.monotonic() - started < 0.5
+    assert layer.stats["hedges"] == 0
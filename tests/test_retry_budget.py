@@ -0,0 +1,58 @@
+from langchain_core.messages import HumanMessage
+import pytest
+from src.models.ai_models import AIGrader
+from src.models.rate_limit import RateLimiter
+from src.models.resilience import Resilience, RetryPolicy
+
+class StatusError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = None
+
+class FailingLLM:
+    """Fails every call with the given status; the first failures may be 429s."""
+
+    def __init__(self, status_code: int, rate_limited: int = 0):
+        self.status_code = status_code
+        self.rate_limited = rate_limited
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        if self.calls <= self.rate_limited:
+            raise StatusError(429)
+        raise StatusError(self.status_code)
+
+def grader(llm, rate_limiter=None) -> AIGrader:
+    return AIGrader(
+        llm=llm,
+        rate_limiter=rate_limiter,
+        max_rate_limit_retries=2,
+        resilience=Resilience(retry=RetryPolicy(max_attempts=3, base_delay=0), hedge_percentile=None)
+    )
+
+def send(model: AIGrader):
+    messages = [HumanMessage(content="grade this")]
+    return model._call("grade", lambda: model._invoke_paced(messages, 10))
+
+def test_rate_limits_are_retried_by_one_layer_only(monkeypatch):
+    monkeypatch.setattr("src.models.ai_models.DEFAULT_BACKOFF_SECONDS", 0)
+    llm = FailingLLM(429)
+
+    with pytest.raises(StatusError):
+        send(grader(llm))
+
+    # max_rate_limit_retries + 1, not multiplied by the resilience attempts
+    assert llm.calls == 3
+
+def test_server_errors_are_retried_by_resilience():
+    llm = FailingLLM(503)
+
+    with pytest.raises(StatusError):
+        send(grader(llm, RateLimiter(requests_per_minute=10_000, tokens_per_minute=10_000_000)))
+
+    assert llm.calls == 3
+
+def test_client_retries_are_turned_off():
+    assert AIGrader(api_key="test").llm.max_retries == 0
@@ -0,0 +1,56 @@
+import pytest
+from src.web.store import ReviewStore, SQLiteReviewStore
+
+def test_review_store_is_abstract():
+    with pytest.raises(TypeError):
+        ReviewStore()
+
+def test_flagged_submissions_are_paged_with_a_cursor():
+    store = SQLiteReviewStore(":memory:")
+    for i in range(5):
+        store.add_flagged(f"essay {i}", 5.0, 0.4, assignment_id="a" if i % 2 else "b")
+
+    first = store.list_flagged(limit=2)
+    second = store.list_flagged(limit=2, cursor=first.next_cursor)
+    last = store.list_flagged(limit=2, cursor=second.next_cursor)
+
+    pages = [first, second, last]
+    assert [s.submission_text for page in pages for s in page.submissions] == [f"essay {i}" for i in range(5)]
+    assert last.next_cursor is None
+
+    filtered = store.list_flagged(limit=1, assignment_id="a")
+    following = store.list_flagged(limit=1, cursor=filtered.next_cursor, assignment_id="a")
+    assert [filtered.submissions[0].submission_text, following.submissions[0].submission_text] == ["essay 1", "essay 3"]
+    assert following.next_cursor is None
+
+def test_malformed_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        SQLiteReviewStore(":memory:").list_flagged(cursor="sub_1")
+
+def review(store, submission_id):
+    from src.web.models import GradeAdjustment
+    store.record_adjustment(GradeAdjustment(
+        submission_id=submission_id, criterion_name="Clarity", original_points=5,
+        adjusted_points=7, adjustment_reason="too harsh", reviewer="ta"
+    ))
+
+def test_time_windows_count_reviews_under_the_flag_time():
+    store = SQLiteReviewStore(":memory:")
+    flagged = store.add_flagged("essay", 5.0, 0.4, models=["gpt-4"])
+    store.add_flagged("other essay", 5.0, 0.4, models=["gpt-4"])
+    # Reviewed in a later hour than it was flagged
+    store._conn.execute(
+        "UPDATE flagged_submissions SET flagged_at = '2026-01-01T09:30:00' WHERE submission_id = ?",
+        (flagged.submission_id,)
+    )
+    store.rebuild_statistics()
+    review(store, flagged.submission_id)
+
+    window = store.statistics_breakdown("hour")["2026-01-01T09"]
+    assert window["total_flagged"] == 1 and window["review_completion_rate"] == 1
+
+    store.rebuild_statistics()
+    windows = store.statistics_breakdown("hour")
+    assert windows["2026-01-01T09"]["review_completion_rate"] == 1
+    assert sum(w["total_flagged"] for w in windows.values()) == 2
+    assert all(w["review_completion_rate"] <= 1 for w in windows.values())
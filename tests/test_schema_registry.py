@@ -0,0 +1,78 @@
+import json
+import os
+import time
+from src.grading import schema_registry
+from src.grading.schema_registry import SchemaRegistry
+
+def definition(rubric: str = "clear", version: str = "1", max_points: float = 10) -> dict:
+    return {
+        "name": "Essay",
+        "version": version,
+        "total_points": 10,
+        "criteria": [{"name": "Clarity", "description": "", "max_points": max_points, "rubric": {"10": rubric}}]
+    }
+
+def write(path, data: dict) -> None:
+    """Write a schema file with a newer mtime than before, as an editor would."""
+    previous = os.stat(path).st_mtime_ns if os.path.exists(path) else 0
+    path.write_text(json.dumps(data), encoding="utf-8")
+    later = max(os.stat(path).st_mtime_ns, previous + 1_000_000)
+    os.utime(path, ns=(later, later))
+
+def rubric(registry: SchemaRegistry) -> str:
+    return registry.get("essay").criteria[0].rubric["10"]
+
+def test_invalid_edit_keeps_serving_the_previous_schema(tmp_path):
+    path = tmp_path / "essay.json"
+    write(path, definition())
+    registry = SchemaRegistry(str(tmp_path))
+    registry.refresh()
+
+    # Criterion points no longer add up to the total
+    write(path, definition("concise", max_points=20))
+
+    assert not registry.refresh()
+    assert rubric(registry) == "clear"
+
+def test_reloaded_rubric_notifies_listeners(tmp_path):
+    path = tmp_path / "essay.json"
+    write(path, definition())
+    registry = SchemaRegistry(str(tmp_path))
+    registry.refresh()
+    replaced = []
+    registry.add_listener(lambda old, new: replaced.append((old, new)))
+
+    write(path, definition("concise"))
+
+    assert registry.refresh()
+    assert rubric(registry) == "concise"
+    [(old, new)] = replaced
+    assert old.criteria[0].rubric["10"] == "clear"
+    assert new is registry.get("essay")
+
+def test_watcher_picks_up_file_edits(tmp_path):
+    path = tmp_path / "essay.json"
+    write(path, definition())
+    registry = SchemaRegistry(str(tmp_path))
+    registry.refresh()
+    registry.watch(interval=0.02)
+    try:
+        write(path, definition("concise"))
+        write(tmp_path / "essay-v2.json", {**definition("brief", version="2"), "assignment_id": "essay"})
+        deadline = time.monotonic() + 5
+        while registry.available().get("essay") != ["1", "2"] and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        registry.stop()
+
+    assert registry.available()["essay"] == ["1", "2"]
+    assert registry.get("essay", "1").criteria[0].rubric["10"] == "concise"
+    assert rubric(registry) == "brief"
+
+def test_default_registry_does_not_watch_a_missing_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(schema_registry, "_default_registry", None)
+    monkeypatch.setenv("GRADING_SCHEMA_DIR", str(tmp_path / "missing"))
+
+    registry = schema_registry.default_registry()
+
+    assert registry._watcher is None
@@ -0,0 +1,47 @@
+import json
+from langchain_core.messages import AIMessageChunk
+from src.grading.criteria import GradingCriterion
+from src.models.ai_models import AIGrader
+from src.models.resilience import Resilience, RetryPolicy
+from src.models.streaming import stream_tokens, token_stream
+
+ANSWER = json.dumps({"points": 8, "explanation": "streamed", "confidence": 0.9})
+
+class FlakyStreamingLLM:
+    """Streams the answer in pieces; the first stream breaks off halfway."""
+
+    def __init__(self):
+        self.streams = 0
+
+    def stream(self, messages):
+        self.streams += 1
+        for i in range(0, len(ANSWER), 8):
+            if self.streams == 1 and i >= len(ANSWER) // 2:
+                raise ConnectionError("connection reset")
+            yield AIMessageChunk(content=ANSWER[i:i + 8])
+
+def test_only_one_attempt_per_model_streams_at_a_time():
+    chunks = []
+    with stream_tokens(lambda model, text, attempt: chunks.append((model, text, attempt))):
+        with token_stream("gpt-4") as primary, token_stream("gpt-4") as hedge:
+            assert primary is not None and hedge is None
+            primary("a")
+        with token_stream("gpt-4") as retry:
+            retry("b")
+
+    assert [text for _, text, _ in chunks] == ["a", "b"]
+    assert chunks[0][2] != chunks[1][2]
+
+def test_a_retried_call_streams_under_a_new_attempt():
+    grader = AIGrader(
+        llm=FlakyStreamingLLM(),
+        resilience=Resilience(retry=RetryPolicy(max_attempts=2, base_delay=0), hedge_percentile=None)
+    )
+    criterion = GradingCriterion(name="Clarity", description="", max_points=10, rubric={"10": "clear"})
+    chunks = []
+    with stream_tokens(lambda model, text, attempt: chunks.append((attempt, text))):
+        result = grader.grade_submission("essay", criterion)
+
+    attempts = list(dict.fromkeys(attempt for attempt, _ in chunks))
+    assert result.points == 8 and len(attempts) == 2
+    assert "".join(text for attempt, text in chunks if attempt == attempts[-1]) == ANSWER